@@ -5,10 +5,13 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from msme_app.config import get_driver, load_config
+from msme_app.schema import ensure_schema
 from msme_app.services.graph_service import (
     fetch_categories_detailed,
     fetch_mse_by_id,
-    fetch_recent_mses,
+    fetch_mse_counts,
+    fetch_mses_page,
+    fetch_recommendations,
     fetch_snps_detailed,
     fetch_analytics_summary,
 )
@@ -24,11 +27,15 @@ from msme_app.ui import (
 
 configure_page()
 
+_MSE_PAGE_SIZE = 50
+
 @st.cache_resource
 def _get_driver():
     return get_driver(load_config())
 
 driver = _get_driver()
+if schema_error := ensure_schema(driver):
+    st.warning(schema_error)
 
 apply_styles()
 render_header()
@@ -121,21 +128,14 @@ try:
         and (analytics.get("total_snps") or 0) == 0
         and (analytics.get("total_categories") or 0) == 0
     ):
-        st.info("Run seed_graph.py to populate the database, then restart the app.")
+        st.info("Run `python -m utils.seed_graph` to populate the database, then restart the app.")
 
     tab1, tab2, tab3 = st.tabs(["MSEs", "SNPs", "Categories"])
     
     with tab1:
-        mses = fetch_recent_mses(driver)
-        normalized = []
-        for row in mses:
-            props = row.get("props") or {}
-            props["id"] = row.get("id")
-            props["category_code"] = row.get("category_code")
-            props["category_name"] = row.get("category_name")
-            normalized.append(props)
-        mses_df = pd.DataFrame(normalized)
-        if mses_df.empty:
+        # Aggregates come from the server; the table itself is paged below
+        mse_counts = fetch_mse_counts(driver)
+        if not mse_counts["total"]:
             st.info("No MSEs yet. Add MSE to create MSEs.")
         else:
             def render_mse_details(mse_id):
@@ -305,15 +305,26 @@ try:
 {addr_section}
 """, unsafe_allow_html=True)
 
+                recs = fetch_recommendations(driver, mse_id)
+                if recs:
+                    _medals = ["&#129351;", "&#129352;", "&#129353;"]
+                    _rec_cells = "".join(
+                        f'<div class="mdet-cell mdet-full"><div class="mdet-val">'
+                        f'{_medals[i] if i < 3 else i + 1} <b>{r["snp"]}</b> · {r["location"]} · '
+                        f'Match {r["score"]:.0f}%</div></div>'
+                        for i, r in enumerate(recs)
+                    )
+                    st.markdown(
+                        f'<div class="mdet-sec">&#127919; Recommended SNPs</div>'
+                        f'<div class="mdet-grid">{_rec_cells}</div>',
+                        unsafe_allow_html=True,
+                    )
+
             # ── MSE Insights: City Distribution + Activity Breakdown ───────────
             city_col, act_col = st.columns([3, 2])
 
             with city_col:
-                _city_s = mses_df["city"].fillna("").str.strip()
-                _city_counts = (
-                    _city_s[_city_s != ""].value_counts().reset_index()
-                )
-                _city_counts.columns = ["City", "MSEs"]
+                _city_counts = pd.DataFrame(mse_counts["by_city"], columns=["City", "MSEs"])
                 _max_c = _city_counts["MSEs"].max() or 1
                 _c_medals = ["🥇", "🥈", "🥉"]
                 _city_rows_html = ""
@@ -347,11 +358,8 @@ try:
 
             with act_col:
                 # MSEs by Category — scrollable leaderboard card (scales to 100s of categories)
-                _cat_s = mses_df["category_name"].fillna("").str.strip()
-                _cat_s = _cat_s[_cat_s != ""]
-                if not _cat_s.empty:
-                    _cat_counts = _cat_s.value_counts().reset_index()
-                    _cat_counts.columns = ["Category", "MSEs"]
+                _cat_counts = pd.DataFrame(mse_counts["by_category"], columns=["Category", "MSEs"])
+                if not _cat_counts.empty:
                     _max_cat = _cat_counts["MSEs"].max() or 1
                     # Blue gradient palette indexed by rank for visual variety
                     _cat_colors = ["#1d4ed8", "#2563eb", "#3b82f6", "#60a5fa", "#93c5fd"]
@@ -392,18 +400,29 @@ try:
             # ── Filters + Table ───────────────────────────────────────────────
             filt_c1, filt_c2 = st.columns(2)
             with filt_c1:
-                _mse_cities = ["All"] + sorted(
-                    mses_df["city"].fillna("").str.strip().replace("", None).dropna().unique().tolist()
-                )
+                _mse_cities = ["All"] + sorted(c for c, _ in mse_counts["by_city"])
                 mse_city_filt = st.selectbox("Filter by City", _mse_cities, key="mse_city_filter")
             with filt_c2:
-                _mse_cats = ["All"] + sorted(
-                    mses_df["category_name"].fillna("").str.strip().replace("", None).dropna().unique().tolist()
-                )
+                _mse_cats = ["All"] + sorted(c for c, _ in mse_counts["by_category"])
                 mse_cat_filt = st.selectbox("Filter by Category", _mse_cats, key="mse_cat_filter")
 
+            # Keyset paging: a stack of cursors, reset whenever the filters change
+            _filters = (mse_city_filt, mse_cat_filt)
+            if st.session_state.get("dash_mse_filters") != _filters:
+                st.session_state["dash_mse_filters"] = _filters
+                st.session_state["dash_mse_cursors"] = [None]
+            _cursors = st.session_state["dash_mse_cursors"]
+            page_rows, next_cursor = fetch_mses_page(
+                driver,
+                page_size=_MSE_PAGE_SIZE,
+                cursor=_cursors[-1],
+                city=None if mse_city_filt == "All" else mse_city_filt,
+                category_name=None if mse_cat_filt == "All" else mse_cat_filt,
+            )
+
             display_rows = []
-            for row in mses_df.fillna("").to_dict(orient="records"):
+            for row in page_rows:
+                row = {k: ("" if v is None else v) for k, v in row.items()}
                 category_label = ""
                 if row.get("category_name") or row.get("category_code"):
                     category_label = f"{row.get('category_name', '')} ({row.get('category_code', '')})".strip()
@@ -415,21 +434,26 @@ try:
                     "Business":  row.get("name", ""),
                     "City":      row.get("city", ""),
                     "Category":  category_label,
-                    "_cat_name": row.get("category_name", ""),
                     "Products":  products_val,
                 })
 
-            display_df = pd.DataFrame(display_rows)
-
-            if mse_city_filt != "All":
-                display_df = display_df[display_df["City"] == mse_city_filt]
-            if mse_cat_filt != "All":
-                display_df = display_df[display_df["_cat_name"] == mse_cat_filt]
-            display_df = display_df.drop(columns=["_cat_name"])
+            display_df = pd.DataFrame(
+                display_rows, columns=["ID", "Business", "City", "Category", "Products"]
+            )
 
             n_shown = len(display_df)
+            page_no = len(_cursors)
+            if mse_city_filt == "All" and mse_cat_filt == "All":
+                _of_total = f" of {mse_counts['total']}"
+            elif mse_cat_filt == "All":
+                _of_total = f" of {dict(mse_counts['by_city']).get(mse_city_filt, 0)}"
+            elif mse_city_filt == "All":
+                _of_total = f" of {dict(mse_counts['by_category']).get(mse_cat_filt, 0)}"
+            else:
+                _of_total = ""
             st.caption(
-                f"Showing {n_shown} MSE{'s' if n_shown != 1 else ''} · newest first · click any row for details"
+                f"Page {page_no} · showing {n_shown} MSE{'s' if n_shown != 1 else ''}"
+                f"{_of_total} · newest first · click any row for details"
             )
 
             # Generation counter: bumped on each selection so the dataframe
@@ -452,6 +476,18 @@ try:
                 st.session_state["dash_mse_df_gen"] = df_gen + 1
                 st.rerun()
 
+            prev_col, _, next_col = st.columns([1, 4, 1])
+            with prev_col:
+                if st.button("← Newer", disabled=page_no == 1, use_container_width=True,
+                             key="mse_page_prev"):
+                    _cursors.pop()
+                    st.rerun()
+            with next_col:
+                if st.button("Older →", disabled=next_cursor is None, use_container_width=True,
+                             key="mse_page_next"):
+                    _cursors.append(next_cursor)
+                    st.rerun()
+
             # Phase 2: pending_id already removed from state before dialog opens,
             # so dialog close rerun finds nothing and shows a clean empty table.
             pending_id = st.session_state.pop("dash_mse_pending_id", None)
@@ -471,7 +507,7 @@ try:
         snps = fetch_snps_detailed(driver, limit=None)
         
         if not snps:
-            st.info("No SNPs found. Run seed_graph.py to populate SNPs.")
+            st.info("No SNPs found. Run `python -m utils.seed_graph` to populate SNPs.")
         else:
             # Create display dataframe with rich metadata
             snp_rows = []
@@ -670,7 +706,7 @@ try:
         cats = fetch_categories_detailed(driver, limit=None)
 
         if not cats:
-            st.info("No categories found. Run seed_graph.py to populate categories.")
+            st.info("No categories found. Run `python -m utils.seed_graph` to populate categories.")
         else:
             # Build dataframe
             cat_rows = []
@@ -826,6 +862,6 @@ try:
 
 except Exception as e:
     st.error(f"Error loading dashboard: {str(e)}")
-    st.info("Run seed_graph.py to populate the database, then restart the app.")
+    st.info("Run `python -m utils.seed_graph` to populate the database, then restart the app.")
 
 render_footer()
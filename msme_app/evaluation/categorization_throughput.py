@@ -0,0 +1,96 @@
+"""
+Throughput of batch categorization (categorize_many) by worker count.
+
+Synthetic Udyam-style records are built from the graph's category keywords
+(a few keywords mixed with generic product words and a business name), then
+categorized with the BM25 scorer in-process and with process pools of
+increasing size. Every run
+must produce the same results as the single-process one.
+
+    python -m msme_app.evaluation.categorization_throughput
+    python -m msme_app.evaluation.categorization_throughput --records 500000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import random
+import time
+
+from msme_app.services.categorization import (
+    _normalize_keywords,
+    categorize_many,
+    load_categories,
+)
+from msme_app.services.category_scorer import BM25CategoryScorer
+
+_FILLER = [
+    "handmade", "premium", "wholesale", "export quality", "organic", "custom",
+    "small batch", "assorted", "set of 6", "industrial", "traditional", "eco friendly",
+]
+_SUFFIXES = ["Enterprises", "Industries", "Traders", "Udyog", "Works", "Pvt Ltd"]
+
+
+def synthetic_records(categories, n, seed=7):
+    """Yield `n` records of 3–8 product strings drawn from category keywords and filler words."""
+    rng = random.Random(seed)
+    keywords = [kw for row in categories for kw in _normalize_keywords(row.get("keywords"))]
+    if not keywords:
+        raise ValueError("categories have no keywords")
+    for i in range(n):
+        products = [
+            f"{rng.choice(_FILLER)} {rng.choice(keywords)}" if rng.random() < 0.7 else rng.choice(_FILLER)
+            for _ in range(rng.randint(3, 8))
+        ]
+        yield {
+            "mse_id": f"BENCH-{i}",
+            "products": products,
+            "name": f"{rng.choice(keywords).title()} {rng.choice(_SUFFIXES)}",
+        }
+
+
+def benchmark_throughput(categories, n_records=100_000, workers=(1, 2, 4), chunk_size=500):
+    scorer = BM25CategoryScorer(categories)
+    records = list(synthetic_records(categories, n_records))
+    rows, baseline = [], None
+    for w in workers:
+        start = time.perf_counter()
+        results = [(r["code"], r["score"]) for r in categorize_many(records, scorer, workers=w,
+                                                                    chunk_size=chunk_size)]
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = results
+        rows.append({
+            "workers": w,
+            "seconds": elapsed,
+            "per_sec": len(results) / elapsed if elapsed else 0.0,
+            "matches_baseline": results == baseline,
+        })
+
+    print(f"\n{'=' * 64}")
+    print(f"BATCH CATEGORIZATION — {n_records:,} records, {len(categories)} categories, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'-' * 64}")
+    print(f"{'Workers':>8}{'Seconds':>10}{'Records/s':>14}{'Speedup':>10}{'Same results':>16}")
+    for r in rows:
+        print(
+            f"{r['workers']:>8}{r['seconds']:>10.2f}{r['per_sec']:>14,.0f}"
+            f"{r['per_sec'] / rows[0]['per_sec']:>9.2f}x{'yes' if r['matches_baseline'] else 'NO':>16}"
+        )
+    print(f"{'=' * 64}\n")
+    return rows
+
+
+if __name__ == "__main__":
+    from msme_app.config import get_driver, load_config
+
+    parser = argparse.ArgumentParser(description="Benchmark categorize_many() throughput")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    driver = get_driver(load_config())
+    try:
+        categories = load_categories(driver)
+    finally:
+        driver.close()
+    benchmark_throughput(categories, args.records, args.workers, args.chunk_size)
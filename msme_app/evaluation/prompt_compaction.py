@@ -0,0 +1,81 @@
+"""
+Answer-prompt size and latency before/after result compaction.
+
+For each sample question the Cypher is generated and executed once, then the
+answer is formatted twice — from the raw str(rows) payload and from the
+compact table — recording estimated prompt tokens and LLM latency for each.
+
+    python -m msme_app.evaluation.prompt_compaction
+"""
+import time
+
+from msme_app.services.graphrag_service import (
+    _answer_messages,
+    execute_cypher,
+    format_answer,
+    generate_cypher,
+)
+from msme_app.services.result_compactor import estimate_tokens
+
+SAMPLE_QUESTIONS = [
+    "Which SNPs are export-ready?",
+    "Top 5 SNPs by rating?",
+    "MSEs in food processing?",
+    "Show all MSEs in Mumbai with their products",
+    "Which SNPs serve the textiles category and what certifications do they have?",
+    "List MSEs that make leather goods",
+]
+
+
+def _prompt_tokens(question, results, compact):
+    return sum(estimate_tokens(m["content"]) for m in _answer_messages(question, results, compact))
+
+
+def _timed_answer(question, results, compact):
+    start = time.perf_counter()
+    format_answer(question, results, compact=compact)
+    return (time.perf_counter() - start) * 1000
+
+
+def evaluate_compaction(driver, questions=SAMPLE_QUESTIONS):
+    rows = []
+    for question in questions:
+        try:
+            results = execute_cypher(driver, generate_cypher(question))
+        except Exception as e:
+            print(f"  skipped {question!r}: {e}")
+            continue
+        rows.append({
+            "question": question,
+            "rows": len(results),
+            "raw_tokens": _prompt_tokens(question, results, compact=False),
+            "compact_tokens": _prompt_tokens(question, results, compact=True),
+            "raw_ms": _timed_answer(question, results, compact=False),
+            "compact_ms": _timed_answer(question, results, compact=True),
+        })
+
+    print(f"\n{'=' * 96}")
+    print(f"{'Question':<52}{'Rows':>5}{'Tokens raw→compact':>22}{'Latency ms raw→compact':>17}")
+    print(f"{'-' * 96}")
+    for r in rows:
+        print(
+            f"{r['question'][:50]:<52}{r['rows']:>5}"
+            f"{r['raw_tokens']:>11,} → {r['compact_tokens']:<8,}"
+            f"{r['raw_ms']:>9,.0f} → {r['compact_ms']:<6,.0f}"
+        )
+    if rows:
+        raw_t = sum(r["raw_tokens"] for r in rows)
+        compact_t = sum(r["compact_tokens"] for r in rows)
+        raw_ms = sum(r["raw_ms"] for r in rows) / len(rows)
+        compact_ms = sum(r["compact_ms"] for r in rows) / len(rows)
+        print(f"{'-' * 96}")
+        print(f"Prompt tokens: {raw_t:,} → {compact_t:,} ({100 * (1 - compact_t / raw_t):.1f}% smaller)")
+        print(f"Mean answer latency: {raw_ms:,.0f} ms → {compact_ms:,.0f} ms")
+    print(f"{'=' * 96}\n")
+    return rows
+
+
+if __name__ == "__main__":
+    from msme_app.config import get_driver, load_config
+
+    evaluate_compaction(get_driver(load_config()))
@@ -0,0 +1,147 @@
+"""
+Keyword-hit vs BM25 categorization on the evaluation suite.
+
+Both scorers run against the graph's categories on the held-out half of
+benchmark.test_cases (benchmark.split_cases); BM25's temperature and null
+logit are first fitted with calibrate() on the tuning half, so no reported
+figure comes from the cases it was fitted on. Accuracy counts an "unknown"
+BM25 outcome as correct only for cases with no expected category (the
+hit-count scorer always answers, falling back to TX001). Latency is the
+mean per record over repeated passes; confidence quality is reported as the
+expected calibration error (ECE) of BM25's top candidate.
+check_seed_keywords() classifies every category keyword on its own and
+lists the ones that do not come back as their own category.
+
+    python -m msme_app.evaluation.scorer_comparison
+"""
+import time
+
+import numpy as np
+
+from msme_app.evaluation.benchmark import split_cases, test_cases
+from msme_app.services.categorization import (
+    KeywordMatcher,
+    _normalize_keywords,
+    _rank,
+    load_categories,
+)
+from msme_app.services.category_scorer import BM25CategoryScorer, _terms
+
+_REPEATS = 200
+
+
+def _text(case):
+    return " ".join(case["products"])
+
+
+def _timed(fn, texts):
+    start = time.perf_counter()
+    for _ in range(_REPEATS):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) * 1e6 / (_REPEATS * len(texts))
+
+
+def expected_calibration_error(confidences, correct, bins=10):
+    confidences, correct = np.asarray(confidences, dtype=float), np.asarray(correct, dtype=float)
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    ece = 0.0
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        mask = (confidences > lo) & (confidences <= hi)
+        if mask.any():
+            ece += mask.mean() * abs(confidences[mask].mean() - correct[mask].mean())
+    return ece
+
+
+def check_seed_keywords(categories, scorer=None):
+    """
+    Classify each category keyword alone. A keyword owned by one category
+    must classify to it; one shared by several (after plural folding) may
+    come back as any owner or as unknown. Returns the failures as
+    (keyword, owner codes, predicted code).
+    """
+    scorer = scorer or BM25CategoryScorer(categories)
+    owners = {}
+    for row in categories:
+        for keyword in _normalize_keywords(row.get("keywords")):
+            owners.setdefault(" ".join(_terms(keyword)), set()).add(row["code"])
+
+    failures, checked = [], 0
+    for row in categories:
+        for keyword in _normalize_keywords(row.get("keywords")):
+            codes = owners[" ".join(_terms(keyword))]
+            predicted = scorer.classify(keyword)["code"]
+            checked += 1
+            if predicted not in codes and (len(codes) == 1 or predicted is not None):
+                failures.append((keyword, sorted(codes), predicted))
+
+    print(f"Seed keywords classified to their own category: "
+          f"{checked - len(failures)} / {checked}")
+    for keyword, codes, predicted in failures:
+        print(f"  {keyword:<30} owner {'/'.join(codes):<14} bm25 {predicted or 'unknown'}")
+    return failures
+
+
+def compare_scorers(categories, cases=test_cases):
+    tuning, held_out = split_cases(cases)
+    matcher = KeywordMatcher(categories)
+    scorer = BM25CategoryScorer(categories)
+    temperature, null_logit = scorer.calibrate(
+        [_text(c) for c in tuning], [c["expected"] for c in tuning]
+    )
+    texts = [_text(c) for c in held_out]
+    expected = [c["expected"] for c in held_out]
+
+    hit_codes = [_rank(matcher, t)[0] for t in texts]
+    bm25 = [scorer.classify(t) for t in texts]
+    bm25_codes = [r["code"] for r in bm25]
+    unknown_cases = sum(e is None for e in expected)
+
+    answered = [(r["confidence"], r["code"] == e) for r, e in zip(bm25, expected) if not r["unknown"]]
+    rows = [
+        {
+            "scorer": "keyword hits",
+            "accuracy": np.mean([p == e for p, e in zip(hit_codes, expected)]),
+            "unknown_caught": 0,
+            "us_per_record": _timed(lambda t: _rank(matcher, t), texts),
+        },
+        {
+            "scorer": "BM25",
+            "accuracy": np.mean([p == e for p, e in zip(bm25_codes, expected)]),
+            "unknown_caught": sum(r["unknown"] and e is None for r, e in zip(bm25, expected)),
+            "us_per_record": _timed(scorer.classify, texts),
+        },
+    ]
+
+    print(f"\n{'=' * 72}")
+    print(f"SCORER COMPARISON — {len(held_out)} held-out cases ({unknown_cases} with no category), "
+          f"{len(categories)} categories")
+    print(f"BM25 calibrated on the other {len(tuning)} cases: "
+          f"temperature {temperature:.3f}, null logit {null_logit:.2f}")
+    print(f"{'-' * 72}")
+    print(f"{'Scorer':<16}{'Accuracy':>10}{'Unknown caught':>18}{'µs / record':>14}")
+    for r in rows:
+        print(f"{r['scorer']:<16}{100 * r['accuracy']:>9.1f}%"
+              f"{r['unknown_caught']:>11} / {unknown_cases:<4}{r['us_per_record']:>14.1f}")
+    if answered:
+        confidences, correct = zip(*answered)
+        print(f"BM25 ECE (answered cases): {expected_calibration_error(confidences, correct):.3f}")
+    print(f"{'-' * 72}")
+    for case, h, r in zip(held_out, hit_codes, bm25):
+        if h != case["expected"] or r["code"] != case["expected"]:
+            print(f"  {', '.join(case['products'])[:40]:<42} expected {case['expected'] or 'unknown':<8}"
+                  f" hits {h:<6} bm25 {r['code'] or 'unknown'} ({r['confidence']:.2f})")
+    print(f"{'=' * 72}\n")
+    return rows
+
+
+if __name__ == "__main__":
+    from msme_app.config import get_driver, load_config
+
+    driver = get_driver(load_config())
+    try:
+        categories = load_categories(driver)
+    finally:
+        driver.close()
+    compare_scorers(categories)
+    check_seed_keywords(categories)
@@ -0,0 +1,110 @@
+"""
+Vector and hybrid categorization vs keyword scoring on the evaluation suite.
+
+Reports the category index build time (embedding + writing the float16
+matrix) and the memory-mapped reload time, mean query latency per backend,
+and accuracy on the held-out half of benchmark.test_cases
+(benchmark.split_cases) — overall and on the romanized Hindi / Devanagari
+cases (marked "hindi"). The vector and hybrid MIN_SCORE / MIN_MARGIN and
+BM25's calibration are fitted on the tuning half first. "Unknown" counts as
+correct only for cases with no expected category.
+
+    python -m msme_app.evaluation.vector_categorization
+    python -m msme_app.evaluation.vector_categorization --embedder st:paraphrase-multilingual-MiniLM-L12-v2
+"""
+import argparse
+import tempfile
+import time
+
+from msme_app.evaluation.benchmark import split_cases, test_cases
+from msme_app.services import category_vectors
+from msme_app.services.categorization import KeywordMatcher, _rank, load_categories
+from msme_app.services.category_scorer import BM25CategoryScorer
+
+_REPEATS = 50
+
+
+def evaluate_vectors(categories, cases=test_cases, embedder=None):
+    embedder = embedder or category_vectors.get_embedder()
+    tuning, cases = split_cases(cases)
+    with tempfile.TemporaryDirectory() as path:
+        built = category_vectors.build_index(categories, path, embedder)
+        start = time.perf_counter()
+        index = category_vectors.load_index(categories, path, embedder)
+        load_ms = (time.perf_counter() - start) * 1000
+        matcher = KeywordMatcher(categories)
+        bm25 = BM25CategoryScorer(categories)
+
+        # Every threshold is fitted on the tuning half; figures are on the held-out half
+        labels = [c["expected"] for c in tuning]
+        bm25.calibrate([" ".join(c["products"]) for c in tuning], labels)
+        thresholds = {
+            mode: category_vectors.fit_thresholds(
+                [c["products"] for c in tuning], labels, index, matcher, mode
+            )
+            for mode in ("vector", "hybrid")
+        }
+
+        def _vector(mode):
+            min_score, min_margin = thresholds[mode]
+            return lambda c: category_vectors.classify(
+                c["products"], index, matcher, mode, min_score=min_score, min_margin=min_margin
+            )["code"]
+
+        backends = {
+            "keyword hits": lambda c: _rank(matcher, " ".join(c["products"]))[0],
+            "BM25": lambda c: bm25.classify(" ".join(c["products"]))["code"],
+            "vector": _vector("vector"),
+            "hybrid": _vector("hybrid"),
+        }
+        hindi = [bool(c.get("hindi")) for c in cases]
+        rows = []
+        for name, predict in backends.items():
+            predictions = [predict(c) for c in cases]
+            start = time.perf_counter()
+            for _ in range(_REPEATS):
+                for case in cases:
+                    predict(case)
+            latency_us = (time.perf_counter() - start) * 1e6 / (_REPEATS * len(cases))
+            correct = [p == c["expected"] for p, c in zip(predictions, cases)]
+            rows.append({
+                "backend": name,
+                "accuracy": sum(correct) / len(cases),
+                "hindi_accuracy": (
+                    sum(ok for ok, h in zip(correct, hindi) if h) / sum(hindi) if any(hindi) else 0.0
+                ),
+                "us_per_record": latency_us,
+            })
+
+        print(f"\n{'=' * 72}")
+        print(f"VECTOR CATEGORIZATION — {embedder.name}, {len(categories)} categories, "
+              f"{built.vectors.shape[0]} rows × {built.vectors.shape[1]} ({built.vectors.dtype})")
+        print(f"Index build: {built.build_ms:,.1f} ms   mmap reload: {load_ms:,.1f} ms   "
+              f"on disk: {built.vectors.nbytes / 1024:,.0f} KiB")
+        print(f"{'-' * 72}")
+        print(f"{'Backend':<16}{'Accuracy':>10}{'Hindi / translit.':>20}{'µs / record':>14}")
+        for r in rows:
+            print(f"{r['backend']:<16}{100 * r['accuracy']:>9.1f}%"
+                  f"{100 * r['hindi_accuracy']:>19.1f}%{r['us_per_record']:>14.1f}")
+        print(f"{'-' * 72}")
+        print(f"{len(cases)} held-out cases, {sum(hindi)} Hindi / transliterated; "
+              f"thresholds fitted on {len(tuning)} others:")
+        for mode, (min_score, min_margin) in thresholds.items():
+            print(f"  {mode:<8} min score {min_score:.3f}   min margin {min_margin:.3f}")
+        print(f"{'=' * 72}\n")
+    return {"build_ms": built.build_ms, "load_ms": load_ms, "rows": rows, "thresholds": thresholds}
+
+
+if __name__ == "__main__":
+    from msme_app.config import get_driver, load_config
+
+    parser = argparse.ArgumentParser(description="Evaluate vector / hybrid categorization")
+    parser.add_argument("--embedder", help="'hashed' (default) or 'st:<sentence-transformers model>'")
+    args = parser.parse_args()
+
+    driver = get_driver(load_config())
+    try:
+        categories = load_categories(driver)
+    finally:
+        driver.close()
+    evaluate_vectors(categories, embedder=category_vectors.get_embedder(args.embedder))
@@ -0,0 +1,197 @@
+"""
+Versioned Neo4j schema migrations.
+
+Each migration is a numbered list of steps (Cypher strings or callables taking
+the driver). apply_migrations() runs those newer than the highest recorded
+(:SchemaMigration {version}) node and records each one as it completes.
+Steps are idempotent (IF NOT EXISTS / IF EXISTS), so a crash mid-migration is
+safe to re-run.
+
+Run them from the command line (utils/seed_graph.py also does):
+
+    python -m msme_app.schema
+
+The app calls ensure_schema() at startup, which runs them once per process
+and reports a failure instead of taking the page down.
+"""
+import threading
+
+from msme_app.services.graph_service import (
+    backfill_city_norm,
+    backfill_locations,
+    refresh_snp_profiles,
+)
+
+
+class MigrationError(RuntimeError):
+    """A migration step failed; the message names the migration and the cause."""
+
+
+def _require_unique(label, prop):
+    """Step that fails with the duplicate values that would block a uniqueness constraint."""
+    def check(driver):
+        with driver.session() as session:
+            rows = session.run(
+                f"""
+                MATCH (n:{label}) WHERE n.{prop} IS NOT NULL
+                WITH n.{prop} AS value, count(*) AS copies
+                WHERE copies > 1
+                RETURN value, copies ORDER BY copies DESC LIMIT 5
+                """
+            ).data()
+        if rows:
+            duplicates = ", ".join(f"{r['value']!r} ({r['copies']}×)" for r in rows)
+            raise MigrationError(
+                f"duplicate :{label}.{prop} values block its uniqueness constraint: "
+                f"{duplicates}. Merge or re-key those nodes, then re-run."
+            )
+
+    return check
+
+
+MIGRATIONS = [
+    (
+        1,
+        "uniqueness constraints",
+        [
+            # Plain range indexes from seed_graph.py would block the constraints
+            "DROP INDEX mse_id IF EXISTS",
+            "DROP INDEX snp_id IF EXISTS",
+            "DROP INDEX cat_code IF EXISTS",
+            _require_unique("MSE", "id"),
+            "CREATE CONSTRAINT mse_id_unique IF NOT EXISTS FOR (m:MSE) REQUIRE m.id IS UNIQUE",
+            _require_unique("SNP", "id"),
+            "CREATE CONSTRAINT snp_id_unique IF NOT EXISTS FOR (s:SNP) REQUIRE s.id IS UNIQUE",
+            _require_unique("Category", "code"),
+            "CREATE CONSTRAINT cat_code_unique IF NOT EXISTS FOR (c:Category) REQUIRE c.code IS UNIQUE",
+        ],
+    ),
+    (
+        2,
+        "range indexes",
+        [
+            "CREATE INDEX mse_city IF NOT EXISTS FOR (m:MSE) ON (m.city)",
+            "CREATE INDEX snp_city IF NOT EXISTS FOR (s:SNP) ON (s.city)",
+            "CREATE INDEX cat_sector IF NOT EXISTS FOR (c:Category) ON (c.sector)",
+            # A lookup index, not a uniqueness constraint: voice and manual
+            # entries have no URN, and the same certificate may be registered twice
+            "MATCH (m:MSE) WHERE trim(m.urn) = '' REMOVE m.urn",
+            "CREATE INDEX mse_urn IF NOT EXISTS FOR (m:MSE) ON (m.urn)",
+        ],
+    ),
+    (
+        3,
+        "normalized city",
+        [
+            "CREATE INDEX mse_city_norm IF NOT EXISTS FOR (m:MSE) ON (m.city_norm)",
+            "CREATE INDEX snp_city_norm IF NOT EXISTS FOR (s:SNP) ON (s.city_norm)",
+            backfill_city_norm,
+        ],
+    ),
+    (
+        4,
+        "geo points and SNP scoring profiles",
+        [
+            "CREATE POINT INDEX mse_location IF NOT EXISTS FOR (m:MSE) ON (m.location)",
+            "CREATE POINT INDEX snp_location IF NOT EXISTS FOR (s:SNP) ON (s.location)",
+            backfill_locations,
+            refresh_snp_profiles,
+        ],
+    ),
+    (
+        5,
+        "MSE (created_at, id) keyset index",
+        [
+            # Serves both the ORDER BY created_at DESC, id DESC and the
+            # created_at range seek of fetch_mses_page()
+            "CREATE INDEX mse_created_at_id IF NOT EXISTS FOR (m:MSE) ON (m.created_at, m.id)",
+            # Keyset pagination skips MSEs without created_at; legacy rows sort oldest
+            "MATCH (m:MSE) WHERE m.created_at IS NULL SET m.created_at = 0",
+        ],
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(driver):
+    with driver.session() as session:
+        record = session.run(
+            "MATCH (v:SchemaMigration) RETURN max(v.version) AS version"
+        ).single()
+        return (record["version"] if record else None) or 0
+
+
+def apply_migrations(driver):
+    """
+    Bring the graph schema up to LATEST_VERSION. Returns the applied versions;
+    raises MigrationError naming the migration whose step failed.
+    """
+    applied = []
+    version = current_version(driver)
+    for number, name, steps in MIGRATIONS:
+        if number <= version:
+            continue
+        try:
+            for step in steps:
+                if callable(step):
+                    step(driver)
+                else:
+                    with driver.session() as session:
+                        session.run(step)
+        except Exception as exc:
+            raise MigrationError(f"migration {number} ({name}) failed: {exc}") from exc
+        with driver.session() as session:
+            session.run(
+                """
+                MERGE (v:SchemaMigration {version: $version})
+                SET v.name = $name, v.applied_at = timestamp()
+                """,
+                version=number,
+                name=name,
+            )
+        applied.append(number)
+    return applied
+
+
+_ensure_lock = threading.Lock()
+_ensured = False
+_ensure_error = None
+
+
+def ensure_schema(driver):
+    """
+    Run apply_migrations() once per process (every page's cached driver calls
+    this). Returns None, or a message for the page to show when a migration
+    failed; the app keeps running on the previous schema version.
+    """
+    global _ensured, _ensure_error
+    with _ensure_lock:
+        if not _ensured:
+            _ensured = True
+            try:
+                apply_migrations(driver)
+            except Exception as exc:
+                _ensure_error = (
+                    f"Schema migration failed — {exc}. "
+                    "Fix the cause and run `python -m msme_app.schema`."
+                )
+                print(_ensure_error)
+        return _ensure_error
+
+
+if __name__ == "__main__":
+    from neo4j import GraphDatabase
+
+    from utils.seed_graph import load_config
+
+    cfg = load_config()
+    driver = GraphDatabase.driver(
+        cfg["NEO4J_URI"], auth=(cfg["NEO4J_USER"], cfg["NEO4J_PASSWORD"])
+    )
+    try:
+        applied = apply_migrations(driver)
+        print(f"Applied migrations: {applied}" if applied else "Schema is up to date.")
+        print(f"Schema version: {current_version(driver)} (latest {LATEST_VERSION})")
+    finally:
+        driver.close()
@@ -0,0 +1,77 @@
+"""
+In-memory cache of grounded answers for graphrag_service.
+
+Keyed by (normalized question, normalized Cypher + params, hash of the
+result rows) and stamped with query_cache.generation(), which every
+graph_service write bumps. A repeated question that runs the same query over
+unchanged data gets its answer back without another LLM call; a different
+question over the same rows ("how many SNPs in Pune?" vs "list SNPs in
+Pune") gets its own answer. After any write the stamp no longer matches and
+the answer is regenerated.
+"""
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from msme_app.services import cypher_cache, query_cache
+
+MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+_store = OrderedDict()  # key -> (generation, answer)
+_stats = {"hits": 0, "misses": 0, "stale": 0}
+
+
+def _key(question, cypher, params, results):
+    query = re.sub(r"\s+", " ", cypher or "").strip()
+    payload = json.dumps(
+        [cypher_cache.normalize(question), query, params or {}, results],
+        sort_keys=True, default=str, ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def get(question, cypher, params, results):
+    """Cached answer to `question` for these rows at the current graph generation, else None."""
+    key = _key(question, cypher, params, results)
+    with _lock:
+        entry = _store.get(key)
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        if entry[0] != query_cache.generation():
+            del _store[key]
+            _stats["stale"] += 1
+            _stats["misses"] += 1
+            return None
+        _store.move_to_end(key)
+        _stats["hits"] += 1
+        return entry[1]
+
+
+def put(question, cypher, params, results, answer):
+    if not answer:
+        return
+    key = _key(question, cypher, params, results)
+    with _lock:
+        _store[key] = (query_cache.generation(), answer)
+        _store.move_to_end(key)
+        while len(_store) > MAX_ENTRIES:
+            _store.popitem(last=False)
+
+
+def clear():
+    with _lock:
+        _store.clear()
+
+
+def stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "entries": len(_store),
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,191 @@
+"""
+Deterministic answers for simple GraphRAG result shapes.
+
+Counts and short SNP / MSE / Category lists are rendered locally following
+the formatting rules in graphrag_service._ANSWER_SYSTEM (count headline,
+bold names, ratings as percentages, first 10 items then "N more"), which
+saves the answer LLM round-trip. render() returns None for anything it does
+not fully recognise, and the caller falls back to the LLM. That includes
+empty results: the answer LLM says what the user was looking for and how to
+broaden it (_ANSWER_SYSTEM rule 2), which a canned reply cannot.
+"""
+import re
+
+MAX_ITEMS = 10
+
+# (column-name word prefix, singular, plural)
+_COUNT_LABELS = [
+    ("snp", "Seller Network Participant (SNP)", "Seller Network Participants (SNPs)"),
+    ("mse", "MSE", "MSEs"),
+    ("categor", "category", "categories"),
+    ("cit", "city", "cities"),
+]
+
+# Columns each entity may carry; anything else means the question wants
+# something this renderer does not show, so the LLM answers instead.
+_SNP_FIELDS = {"id", "name", "city", "rating", "rating_pct", "export_capable", "certifications",
+               "payment_terms", "specialization", "capacity", "languages"}
+_MSE_FIELDS = {"id", "name", "city", "products", "nic_activity", "activity", "state", "type",
+               "urn", "source"}
+_CATEGORY_FIELDS = {"code", "name", "sector", "ondc_l1", "ondc_l2", "ondc_l3"}
+
+# Optional SNP fields, shown only when the question asks about them
+_SNP_EXTRAS = [
+    (("certif", "iso", "bis"), "certifications", "Certifications"),
+    (("payment", "terms", "credit"), "payment_terms", "Payment"),
+    (("special", "focus"), "specialization", "Specialization"),
+    (("capacity", "volume"), "capacity", "Capacity"),
+    (("language",), "languages", "Languages"),
+]
+
+def _field(key):
+    """'s.name' → 'name', 'rating_pct' → 'rating_pct'."""
+    return key.split(".", 1)[1] if "." in key else key
+
+
+def _flatten(row):
+    """One result row → {field: value}; a single node column becomes its properties."""
+    if len(row) == 1:
+        value = next(iter(row.values()))
+        if hasattr(value, "labels"):
+            return dict(value), set(value.labels)
+    if any(hasattr(v, "labels") for v in row.values()):
+        return None, None
+    return {_field(k): v for k, v in row.items()}, set()
+
+
+def _present(value):
+    return value not in (None, "", [])
+
+
+def _join(value):
+    return ", ".join(str(v) for v in value) if isinstance(value, list) else str(value)
+
+
+def _rating(row):
+    if _present(row.get("rating_pct")):
+        return f"{float(row['rating_pct']):.0f}%"
+    if _present(row.get("rating")):
+        return f"{float(row['rating']) * 100:.0f}%"
+    return None
+
+
+def _snp_line(row, extras):
+    parts = [f"**{row.get('name') or row.get('id')}**"]
+    if _present(row.get("city")):
+        parts.append(str(row["city"]))
+    rating = _rating(row)
+    if rating:
+        parts.append(f"Rating: {rating}")
+    if row.get("export_capable") is not None:
+        parts.append(f"Export-Ready: {'Yes' if row['export_capable'] else 'No'}")
+    for field, label in extras:
+        if _present(row.get(field)):
+            parts.append(f"{label}: {_join(row[field])}")
+    return "- " + " | ".join(parts)
+
+
+def _mse_line(row):
+    parts = [f"**{row.get('name') or row.get('id')}**"]
+    if _present(row.get("city")):
+        parts.append(str(row["city"]))
+    if _present(row.get("products")):
+        parts.append(f"Products: {_join(row['products'])}")
+    elif _present(row.get("nic_activity")):
+        parts.append(f"Activity: {row['nic_activity']}")
+    return "- " + " | ".join(parts)
+
+
+def _category_line(row):
+    parts = [f"**{row.get('name') or row.get('code')}**"]
+    if _present(row.get("code")) and row.get("name"):
+        parts[0] += f" ({row['code']})"
+    if _present(row.get("sector")):
+        parts.append(f"Sector: {row['sector']}")
+    return "- " + " | ".join(parts)
+
+
+def _count_label(key, value):
+    """'mse_count' → 'MSEs'; None unless the column is clearly a count of a known entity."""
+    words = re.findall(r"[a-z]+", key.lower().replace("_", " "))
+    if not {"count", "total", "number", "num"} & set(words):
+        return None
+    for stem, singular, plural in _COUNT_LABELS:
+        if any(w.startswith(stem) for w in words):
+            return singular if value == 1 else plural
+    return None
+
+
+def _render_counts(row):
+    lines = []
+    for key, value in row.items():
+        if not isinstance(value, int) or isinstance(value, bool):
+            return None
+        label = _count_label(key, value)
+        if label is None:
+            return None
+        lines.append(f"There {'is' if value == 1 else 'are'} **{value:,}** {label}.")
+    if len(lines) == 1:
+        return lines[0]
+    return "Here are the totals:\n\n" + "\n".join(f"- {line}" for line in lines)
+
+
+def _kind(rows, labels):
+    fields = set().union(*(r.keys() for r in rows))
+    if "SNP" in labels or (
+        fields <= _SNP_FIELDS and "name" in fields and fields & {"rating", "rating_pct", "export_capable"}
+    ):
+        return "snp"
+    if "MSE" in labels or (
+        fields <= _MSE_FIELDS and "name" in fields and fields & {"products", "nic_activity", "urn"}
+    ):
+        return "mse"
+    if "Category" in labels or (fields <= _CATEGORY_FIELDS and {"name", "code"} <= fields):
+        return "category"
+    return None
+
+
+def render(question: str, results: list):
+    """Markdown answer for a recognised result shape, or None to defer to the LLM."""
+    if not results:
+        return None
+
+    if len(results) == 1 and len(results[0]) <= 3:
+        counts = _render_counts(results[0])
+        if counts:
+            return counts
+
+    rows, labels = [], set()
+    for record in results:
+        row, row_labels = _flatten(dict(record))
+        if row is None:
+            return None
+        rows.append(row)
+        labels |= row_labels
+    if len(labels) > 1:
+        return None
+
+    kind = _kind(rows, labels)
+    if kind is None:
+        return None
+
+    total = len(rows)
+    if kind == "snp":
+        words = (question or "").lower()
+        extras = [
+            (field, label) for triggers, field, label in _SNP_EXTRAS
+            if any(t in words for t in triggers)
+        ]
+        noun = "Seller Network Participant (SNP)" if total == 1 else "Seller Network Participants (SNPs)"
+        lines = [_snp_line(r, extras) for r in rows[:MAX_ITEMS]]
+    elif kind == "mse":
+        noun = "MSE" if total == 1 else "MSEs"
+        lines = [_mse_line(r) for r in rows[:MAX_ITEMS]]
+    else:
+        noun = "category" if total == 1 else "categories"
+        lines = [_category_line(r) for r in rows[:MAX_ITEMS]]
+
+    text = f"I found **{total:,}** {noun} matching your question:\n\n" + "\n".join(lines)
+    if total > MAX_ITEMS:
+        text += f"\n\n…and **{total - MAX_ITEMS:,}** more."
+    return text
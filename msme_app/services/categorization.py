@@ -1,6 +1,26 @@
+import collections
+import itertools
+import multiprocessing
+import os
 import re
+import threading
+import time
 
-_category_cache = None
+# Current categories + compiled matcher. Readers take one reference and use it
+# for the whole call, so a refresh swapping in a new snapshot never changes
+# the data under a categorization that is already running.
+_snapshot = None
+_version = 0  # bumped by invalidate_categories(); a snapshot of an older version is stale
+_load_lock = threading.Lock()
+_refresher = None
+
+# Seconds before a snapshot is reloaded even without an invalidation (picks up
+# edits made by other processes); 0 disables the TTL.
+CATEGORY_CACHE_TTL = float(os.getenv("CATEGORY_CACHE_TTL", "0") or 0)
+
+# "bm25" (default), "keywords" (hit count, always answers), or "vector" /
+# "hybrid" to try category_vectors first
+CATEGORIZATION_BACKEND = os.getenv("CATEGORIZATION_BACKEND", "bm25")
 
 
 def _normalize(text):
@@ -35,47 +55,336 @@ def _normalize_keywords(keywords):
     return []
 
 
+class KeywordMatcher:
+    """
+    Token trie over every category's normalized keywords, built once per
+    category snapshot (see _Snapshot). hit_counts() normalizes the text once
+    and walks the trie from each token position, so all categories are scored
+    in a single pass instead of one regex-normalization per (category, keyword).
+
+    Counts match _has_keyword() exactly: a keyword hits when its normalized
+    token sequence appears contiguously in the normalized text, and a keyword
+    listed twice for a category counts twice.
+    """
+
+    _END = None  # trie key marking a complete keyword (tokens are never None)
+
+    def __init__(self, categories):
+        self.categories = [(row["code"], row["name"]) for row in categories]
+        self._trie = {}
+        self._phrases = []  # phrase id -> {category index: times listed}
+        for idx, row in enumerate(categories):
+            for keyword in _normalize_keywords(row.get("keywords")):
+                tokens = _normalize(keyword).split()
+                if not tokens:
+                    continue
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                if self._END not in node:
+                    node[self._END] = len(self._phrases)
+                    self._phrases.append({})
+                owners = self._phrases[node[self._END]]
+                owners[idx] = owners.get(idx, 0) + 1
+
+    def hit_counts(self, text):
+        """Keyword hits per category, in the order of `self.categories`."""
+        tokens = _normalize(text).split()
+        matched = set()
+        for start in range(len(tokens)):
+            node = self._trie
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                if self._END in node:
+                    matched.add(node[self._END])
+        counts = [0] * len(self.categories)
+        for phrase in matched:
+            for idx, n in self._phrases[phrase].items():
+                counts[idx] += n
+        return counts
+
+
+class _Snapshot:
+    def __init__(self, version, categories):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.categories = categories
+        self.matcher = KeywordMatcher(categories)
+        self.bm25 = None  # category_scorer.BM25CategoryScorer, built on first use
+        self.vectors = None  # category_vectors.CategoryVectorIndex, loaded on first use
+        self.vocabulary = None  # cypher_templates.category_vocabulary(), built on first use
+
+
+_CATEGORIES_QUERY = """
+    MATCH (c:Category)
+    RETURN c.code AS code, c.name AS name, c.keywords AS keywords, c.sector AS sector,
+           c.ondc_l1 AS ondc_l1, c.ondc_l2 AS ondc_l2, c.ondc_l3 AS ondc_l3
+    ORDER BY c.code
+"""
+
+
+def _load(driver, version):
+    with driver.session() as session:
+        categories = list(session.run(_CATEGORIES_QUERY))
+    return _Snapshot(version, categories)
+
+
+def _is_fresh(snap):
+    if snap is None or snap.version != _version:
+        return False
+    return not CATEGORY_CACHE_TTL or time.monotonic() - snap.loaded_at < CATEGORY_CACHE_TTL
+
+
+def _get_snapshot(driver):
+    """The current category snapshot, reloading it if invalidated or past its TTL."""
+    snap = _snapshot
+    if _is_fresh(snap):
+        return snap
+    return refresh_categories(driver, only_if_stale=True)
+
+
+def refresh_categories(driver, only_if_stale=False):
+    """Reload categories and swap in a new snapshot (one loader at a time)."""
+    global _snapshot
+    with _load_lock:
+        if only_if_stale and _is_fresh(_snapshot):
+            return _snapshot  # another session refreshed it while we waited
+        # Read the version before querying: an edit that lands mid-load leaves
+        # this snapshot stale, so the next call reloads again.
+        snap = _load(driver, _version)
+        _snapshot = snap
+        return snap
+
+
+async def aget_snapshot(driver):
+    """
+    _get_snapshot() on a neo4j AsyncDriver. There is no load lock: a
+    concurrent reload builds an identical snapshot.
+    """
+    global _snapshot
+    snap = _snapshot
+    if _is_fresh(snap):
+        return snap
+    version = _version  # read before querying, as in refresh_categories()
+    async with driver.session() as session:
+        result = await session.run(_CATEGORIES_QUERY)
+        categories = [record async for record in result]
+    snap = _snapshot = _Snapshot(version, categories)
+    return snap
+
+
+def invalidate_categories():
+    """Mark the cached categories stale; called by graph_service category writes."""
+    global _version
+    _version += 1
+
+
+def category_cache_info():
+    snap = _snapshot
+    return {
+        "version": _version,
+        "snapshot_version": snap.version if snap else None,
+        "categories": len(snap.categories) if snap else 0,
+        "age_s": round(time.monotonic() - snap.loaded_at, 1) if snap else None,
+        "stale": not _is_fresh(snap),
+    }
+
+
+def start_background_refresh(driver, interval=None):
+    """
+    Reload categories every `interval` seconds (default CATEGORY_CACHE_TTL) on
+    a daemon thread, so requests never wait on a reload. Idempotent.
+    """
+    global _refresher
+    interval = interval or CATEGORY_CACHE_TTL
+    if not interval or (_refresher and _refresher.is_alive()):
+        return _refresher
+
+    def _loop():
+        while True:
+            time.sleep(interval)
+            try:
+                refresh_categories(driver)
+            except Exception as exc:  # keep serving the last good snapshot
+                print(f"Category refresh failed: {exc}")
+
+    _refresher = threading.Thread(target=_loop, name="category-refresh", daemon=True)
+    _refresher.start()
+    return _refresher
+
+
 def _get_categories(driver):
-    """Fetch all categories once and cache them for the lifetime of the process."""
-    global _category_cache
-    if _category_cache is None:
-        with driver.session() as session:
-            _category_cache = list(
-                session.run(
-                    """
-                    MATCH (c:Category)
-                    RETURN c.code AS code, c.name AS name, c.keywords AS keywords
-                    ORDER BY c.code
-                    """
-                )
-            )
-    return _category_cache
+    """Category rows of the current snapshot."""
+    return _get_snapshot(driver).categories
+
+
+DEFAULT_CATEGORY = ("TX001", "Textiles")
+
+
+def _rank(matcher, text, top_k=0):
+    """
+    (code, name, score, alternatives) for `text`. The winner is the first
+    category with the most hits (DEFAULT_CATEGORY when nothing hits);
+    alternatives are the next `top_k` categories with at least one hit.
+    """
+    counts = matcher.hit_counts(text)
+    best, best_score = None, 0
+    for idx, hits in enumerate(counts):
+        if hits > best_score:
+            best, best_score = idx, hits
+    code, name = matcher.categories[best] if best is not None else DEFAULT_CATEGORY
+    alternatives = []
+    if top_k:
+        ranked = sorted(
+            (idx for idx, hits in enumerate(counts) if hits and idx != best),
+            key=lambda idx: -counts[idx],
+        )
+        alternatives = [(*matcher.categories[idx], counts[idx]) for idx in ranked[:top_k]]
+    return code, name, best_score, alternatives
+
+
+def _record_text(record):
+    """Product text for one categorize_many() record (dict or list of products)."""
+    if isinstance(record, dict):
+        products = record.get("products") or []
+        if isinstance(products, str):
+            products = [products]
+        business_name = record.get("business_name") or record.get("name") or ""
+        extra = [business_name, record.get("transcription") or ""]
+    else:
+        products, extra = record or [], []
+    return " ".join([*(p for p in products if p), *extra]).strip()
 
 
 def categorize_products(products, driver, business_name="", transcription=""):
     """
-    Score ALL categories and return the one with the most keyword hits.
-    Fixes the 'first alphabetical match wins' bug where AE001 (pump) was
-    incorrectly returned for solar products before RE001 was reached.
+    Score ALL categories and return (code, name) of the best one, or
+    (None, None) when no category matches confidently — the caller asks the
+    user instead of filing the MSE under a default.
+
+    The default backend is category_scorer's BM25 classify(). With
+    CATEGORIZATION_BACKEND=vector or hybrid, category_vectors answers first
+    and BM25 is the fallback when it returns unknown or its index cannot be
+    loaded or built. "keywords" keeps the plain hit count, which always
+    answers (DEFAULT_CATEGORY when nothing hits).
     """
+    if CATEGORIZATION_BACKEND in ("vector", "hybrid"):
+        from msme_app.services import category_vectors  # imports this module
+
+        try:
+            result = category_vectors.classify_products(
+                products, driver, business_name, transcription, mode=CATEGORIZATION_BACKEND
+            )
+        except (OSError, ValueError, ImportError) as exc:
+            # e.g. a read-only .cache or a missing embedder model: keyword scoring still works
+            print(f"Vector categorization unavailable, using keywords: {exc}")
+        else:
+            if not result["unknown"]:
+                return result["code"], result["name"]
+
     combined = " ".join(
         [*products, business_name or "", transcription or ""]
     ).strip()
-    product_text = combined
+    if CATEGORIZATION_BACKEND == "keywords":
+        code, name, _, _ = _rank(_get_snapshot(driver).matcher, combined)
+        return code, name
 
-    categories = _get_categories(driver)
+    from msme_app.services import category_scorer  # imports this module
 
-    best_code  = "TX001"
-    best_name  = "Textiles"
-    best_score = 0
+    result = category_scorer.get_scorer(driver).classify(combined)
+    return result["code"], result["name"]
 
-    for row in categories:
-        keywords = _normalize_keywords(row.get("keywords"))
-        # Count how many distinct keywords match (not just boolean)
-        hits = sum(1 for k in keywords if _has_keyword(product_text, k))
-        if hits > best_score:
-            best_score = hits
-            best_code  = row["code"]
-            best_name  = row["name"]
 
-    return best_code, best_name
+# ── Batch categorization ────────────────────────────────────────────────────────
+
+def load_categories(driver):
+    """Current category rows as plain dicts, e.g. to hand to categorize_many()."""
+    return [dict(row) for row in _get_categories(driver)]
+
+
+_worker_scorer = None  # set in each pool process by _init_worker
+
+
+def _init_worker(scorer):
+    global _worker_scorer
+    _worker_scorer = scorer
+
+
+def _classify(scorer, text, top_k):
+    """
+    categorize_many() result for one text: BM25 classify() (code None when
+    unknown), or the hit count when `scorer` is a KeywordMatcher.
+    """
+    if isinstance(scorer, KeywordMatcher):
+        code, name, score, alternatives = _rank(scorer, text, top_k)
+        return {"code": code, "name": name, "score": score, "confidence": None,
+                "alternatives": alternatives}
+    result = scorer.classify(text, top_k=top_k + 1)
+    alternatives = [
+        (c["code"], c["name"], c["score"]) for c in result["candidates"] if c["code"] != result["code"]
+    ]
+    return {"code": result["code"], "name": result["name"], "score": result["score"],
+            "confidence": result["confidence"], "alternatives": alternatives[:top_k]}
+
+
+def _categorize_chunk(texts, top_k):
+    return [_classify(_worker_scorer, text, top_k) for text in texts]
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def categorize_many(records, categories, workers=None, top_k=3, chunk_size=500):
+    """
+    Categorize a stream of records without a database round trip.
+
+    `records` is any iterable (a generator reading a Udyam dump is fine) of
+    dicts with "products" and optional "business_name"/"name" and
+    "transcription", or plain lists of product strings. `categories` is a
+    list of category rows (see load_categories()), a BM25CategoryScorer or a
+    KeywordMatcher.
+
+    Yields {"code", "name", "score", "confidence", "alternatives"} per record
+    in input order, where alternatives holds up to `top_k` (code, name,
+    score) runners-up. Records are scored with BM25 and code/name are None
+    when no category matches confidently, as in categorize_products() with
+    the default backend; the vector and hybrid backends are not used in
+    batch. With CATEGORIZATION_BACKEND=keywords (or a KeywordMatcher) the
+    score is the keyword hit count, confidence is None and unmatched
+    records get DEFAULT_CATEGORY.
+
+    With workers > 1 (default: CPU count) chunks of `chunk_size` records are
+    scored in a process pool. The scorer is built once and handed to each
+    worker when it starts, and at most two chunks per worker are in flight,
+    so memory stays flat however long the input is.
+    """
+    from msme_app.services.category_scorer import BM25CategoryScorer  # imports this module
+
+    if isinstance(categories, (KeywordMatcher, BM25CategoryScorer)):
+        scorer = categories
+    elif CATEGORIZATION_BACKEND == "keywords":
+        scorer = KeywordMatcher(categories)
+    else:
+        scorer = BM25CategoryScorer(categories)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    texts = (_record_text(r) for r in records)
+
+    if workers <= 1:
+        for text in texts:
+            yield _classify(scorer, text, top_k)
+        return
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(scorer,)) as pool:
+        in_flight = collections.deque()
+        for chunk in _chunks(texts, chunk_size):
+            in_flight.append(pool.apply_async(_categorize_chunk, (chunk, top_k)))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().get()
+        while in_flight:
+            yield from in_flight.popleft().get()
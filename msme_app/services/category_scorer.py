@@ -0,0 +1,221 @@
+"""
+BM25 category scorer — a weighted alternative to the raw keyword-hit count in
+categorization.categorize_products().
+
+Each category is a small document built from its keywords, its name and its
+ONDC l1/l2/l3 path (weighted per field). Terms are normalized tokens plus
+adjacent-token bigrams, so "solar panel" counts as more specific than
+"solar" or "panel". BM25 weights are precomputed once per category snapshot
+into a CSR term → category matrix (indptr / indices / data arrays, as in
+matching_engine), so scoring a text is a slice per query term and one
+np.bincount.
+
+Raw BM25 scores shrink for categories with many keywords (length
+normalization), so each category's score is divided by the weight of its
+own strongest term: a full hit on one of its keywords scores about 0.5–1
+whatever the category's size, plus a bonus for whole-keyword hits
+(KeywordMatcher). Normalized scores become a confidence with a
+temperature softmax over the matched categories plus a "none of these"
+logit. classify() returns the best category, its confidence and the top-k
+candidates, or an explicit unknown outcome (code None) when nothing
+matches, the match is weak, or two categories tie, instead of defaulting
+to TX001.
+"""
+import math
+
+import numpy as np
+
+from msme_app.services import categorization
+from msme_app.services.categorization import _normalize, _normalize_keywords
+
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = {"keywords": 1.0, "name": 0.8, "ondc": 0.4}
+# Added to the normalized score of a category with a whole-keyword hit, so
+# "equipment" (a Sports Goods keyword) beats a category that only uses the
+# word in its name and path ("Agri Equipment & Tools")
+KEYWORD_HIT_BONUS = 0.5
+MIN_CONFIDENCE = 0.5
+
+# Softmax temperature and "none of these" logit over normalized scores. A
+# keyword alone scores ≥ 1 for its own category (≥ 0.5 normalized BM25 plus
+# the hit bonus), so every seed keyword classifies to its owner
+# (evaluation.scorer_comparison.check_seed_keywords); a bare word from
+# another category's longer keyword scores under 0.4 and loses to "none".
+# These defaults follow from the seed keywords, not from benchmark cases;
+# evaluation.scorer_comparison refits them with calibrate() on the tuning
+# half of the benchmark and reports on the held-out half. Refit with
+# calibrate() on labeled production data.
+TEMPERATURE = 0.25
+NULL_LOGIT = 1.5
+
+_STOPWORDS = {
+    "and", "of", "the", "for", "in", "with", "a", "an", "to", "other", "products", "items",
+    "service", "services",
+}
+
+
+def _stem(token):
+    """Fold simple English plurals so 'sarees' / 'saree' and 'tiles' / 'tile' share a term."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _terms(text):
+    """Unigram and bigram terms of `text` (stopwords dropped, plurals folded)."""
+    tokens = [_stem(t) for t in _normalize(text or "").split() if t not in _STOPWORDS]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _fields(row):
+    yield "keywords", _normalize_keywords(row.get("keywords"))
+    yield "name", [row.get("name")]
+    yield "ondc", [row.get(f"ondc_l{level}") for level in (1, 2, 3)]
+
+
+class BM25CategoryScorer:
+    """Precomputed BM25 weights for one category snapshot."""
+
+    def __init__(self, categories, k1=K1, b=B, field_weights=None,
+                 temperature=TEMPERATURE, null_logit=NULL_LOGIT, matcher=None):
+        weights = {**FIELD_WEIGHTS, **(field_weights or {})}
+        self.categories = [(row["code"], row["name"]) for row in categories]
+        self.matcher = matcher or categorization.KeywordMatcher(categories)
+        self.temperature = temperature
+        self.null_logit = null_logit
+
+        docs = []  # per category: {term: field-weighted frequency}
+        for row in categories:
+            tf = {}
+            for field, texts in _fields(row):
+                for text in texts:
+                    # a term counts once per keyword / name / path level
+                    for term in set(_terms(text)):
+                        tf[term] = tf.get(term, 0.0) + weights[field]
+            docs.append(tf)
+
+        n = len(docs)
+        lengths = np.array([sum(tf.values()) for tf in docs], dtype=float)
+        avg_len = lengths.mean() if n and lengths.mean() > 0 else 1.0
+        postings = {}  # term -> [(category idx, tf)]
+        for idx, tf in enumerate(docs):
+            for term, freq in tf.items():
+                postings.setdefault(term, []).append((idx, freq))
+
+        # CSR: term id → (category idx, BM25 weight) rows
+        self.vocab = {}
+        indptr, indices, data = [0], [], []
+        for term, plist in postings.items():
+            idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for idx, freq in plist:
+                norm = k1 * (1 - b + b * lengths[idx] / avg_len)
+                indices.append(idx)
+                data.append(idf * freq * (k1 + 1) / (freq + norm))
+            self.vocab[term] = len(indptr) - 1
+            indptr.append(len(indices))
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.data = np.array(data, dtype=float)
+        # Weight of each category's strongest single term, the unit of normalized scores
+        self.reference = np.zeros(n)
+        np.maximum.at(self.reference, self.indices, self.data)
+        self.reference[self.reference == 0] = 1.0
+
+    def scores(self, text):
+        """
+        Normalized BM25 score of `text` against every category (order of
+        `self.categories`): raw score / the category's strongest term weight,
+        plus KEYWORD_HIT_BONUS when one of its keywords appears whole.
+        """
+        ids = {self.vocab[t] for t in _terms(text) if t in self.vocab}
+        if not ids:
+            return np.zeros(len(self.categories))
+        spans = [(self.indptr[i], self.indptr[i + 1]) for i in ids]
+        cats = np.concatenate([self.indices[lo:hi] for lo, hi in spans])
+        weights = np.concatenate([self.data[lo:hi] for lo, hi in spans])
+        raw = np.bincount(cats, weights=weights, minlength=len(self.categories))
+        hits = np.array(self.matcher.hit_counts(text)) > 0
+        return raw / self.reference + KEYWORD_HIT_BONUS * hits
+
+    def _logits(self, scores):
+        """Null logit + per-category logits; unmatched categories get no probability mass."""
+        scores = np.atleast_2d(scores)
+        category = np.where(scores > 0, scores / self.temperature, -np.inf)
+        return np.column_stack([np.full(len(scores), self.null_logit), category])
+
+    def probabilities(self, scores):
+        """(p_none, p per category) from a temperature softmax with a null logit."""
+        logits = self._logits(scores)[0]
+        p = np.exp(logits - logits.max())
+        p /= p.sum()
+        return p[0], p[1:]
+
+    def classify(self, text, top_k=3, min_confidence=MIN_CONFIDENCE):
+        """
+        {"code", "name", "score", "confidence", "unknown", "candidates"} for
+        `text`. `candidates` lists up to `top_k` matching categories
+        (code, name, score, confidence), best first. When nothing matches or
+        the best confidence is below `min_confidence`, "unknown" is True and
+        code/name are None.
+        """
+        scores = self.scores(text)
+        _, p = self.probabilities(scores)
+        order = np.argsort(-scores, kind="stable")[:max(top_k, 1)]
+        candidates = [
+            {"code": self.categories[i][0], "name": self.categories[i][1],
+             "score": round(float(scores[i]), 4), "confidence": round(float(p[i]), 4)}
+            for i in order if scores[i] > 0
+        ]
+        best = candidates[0] if candidates else None
+        unknown = best is None or best["confidence"] < min_confidence
+        return {
+            "code": None if unknown else best["code"],
+            "name": None if unknown else best["name"],
+            "score": best["score"] if best else 0.0,
+            "confidence": best["confidence"] if best else 0.0,
+            "unknown": unknown,
+            "candidates": candidates[:top_k],
+        }
+
+    def calibrate(self, texts, codes):
+        """
+        Fit temperature and the null logit by minimizing log loss on labeled
+        `texts`; a code of None (or one not in the snapshot) means "none of
+        these". Returns (temperature, null_logit) and keeps them.
+        """
+        index = {code: i for i, (code, _) in enumerate(self.categories)}
+        all_scores = np.array([self.scores(t) for t in texts])
+        labels = np.array([index[c] + 1 if c in index else 0 for c in codes])
+        best = None
+        for temperature in np.geomspace(0.05, 2.0, 25):
+            for null_logit in np.linspace(-2.0, 6.0, 33):
+                self.temperature, self.null_logit = temperature, null_logit
+                logits = self._logits(all_scores)
+                logits -= logits.max(axis=1, keepdims=True)
+                log_p = logits - np.log(np.exp(logits).sum(axis=1, keepdims=True))
+                # a labeled category the text does not match at all costs a fixed penalty
+                loss = -np.maximum(log_p[np.arange(len(texts)), labels], -20.0).mean()
+                if best is None or loss < best[0]:
+                    best = (loss, float(temperature), float(null_logit))
+        _, self.temperature, self.null_logit = best
+        return self.temperature, self.null_logit
+
+
+def get_scorer(driver):
+    """The BM25 scorer for the current category snapshot (built on first use)."""
+    snap = categorization._get_snapshot(driver)
+    scorer = snap.bm25
+    if scorer is None:
+        # A concurrent first call may build it twice; both are identical
+        scorer = snap.bm25 = BM25CategoryScorer(snap.categories, matcher=snap.matcher)
+    return scorer
+
+
+def classify_products(products, driver, business_name="", transcription="", top_k=3,
+                      min_confidence=MIN_CONFIDENCE):
+    """categorize_products() counterpart returning BM25 classify() output."""
+    text = " ".join([*products, business_name or "", transcription or ""]).strip()
+    return get_scorer(driver).classify(text, top_k=top_k, min_confidence=min_confidence)
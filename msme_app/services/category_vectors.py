@@ -0,0 +1,381 @@
+"""
+Offline vector categorization — catches paraphrases, inflections and
+transliterated Hindi that exact keyword matching misses ("haldi powder",
+"joote", "beej aur anaj").
+
+Every category keyword, the category name and its ONDC l2/l3 path are
+embedded once into a float16 matrix saved under .cache/ and memory-mapped on
+load, so processes share the pages and startup does no embedding work. The
+index is rebuilt automatically when the categories (or the embedder) change.
+
+Embedders run on the CPU with no network:
+  - HashedNgramEmbedder (default): hashed character n-grams of the text after
+    transliterating Devanagari to Latin and folding common spelling variants
+    (ee→i, oo→u, aa→a, w→v), so "मसाला" and "masala" share most n-grams;
+  - LocalModelEmbedder: a sentence-transformers model, if that package and
+    the model files are installed (CATEGORY_EMBEDDER=st:<model name>).
+
+A category's similarity to a product is the best cosine over its rows; a
+text's score averages that over its products. Hybrid mode fuses it with the
+keyword-hit count from categorization.KeywordMatcher. Set
+CATEGORIZATION_BACKEND=vector or hybrid to use it from categorize_products().
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from msme_app.services import categorization
+from msme_app.services.categorization import _normalize, _normalize_keywords
+
+INDEX_PATH = Path(
+    os.getenv("CATEGORY_INDEX_PATH")
+    or Path(__file__).resolve().parents[2] / ".cache" / "category_index"
+)
+EMBEDDER = os.getenv("CATEGORY_EMBEDDER", "hashed")
+
+HYBRID_KEYWORD_WEIGHT = 0.4  # share of the fused score coming from keyword hits
+# The outcome is "unknown" below MIN_SCORE or when the best category leads the
+# runner-up by less than MIN_MARGIN. Hashed n-grams put unrelated short texts
+# at 0.4–0.65 vector similarity ("plumbing services" 0.66, "cab service"
+# 0.60, "mobile repair" 0.50), so a score floor alone cannot reject them; the
+# margin does. Fitted with fit_thresholds() (hashed embedder) on the tuning
+# half of the benchmark only, which evaluation.vector_categorization keeps
+# apart from the cases it reports on. Ties go to the conservative side
+# because categorize_products() falls back to BM25 on unknown.
+MIN_SCORE = {"vector": 0.5, "hybrid": 0.4}
+MIN_MARGIN = {"vector": 0.1125, "hybrid": 0.2375}
+_DIM = 2048
+_NGRAMS = (2, 3, 4)
+
+# Filler words in product text, English and romanized Hindi
+_STOPWORDS = {
+    "and", "of", "the", "for", "in", "with", "a", "an", "to", "aur", "ki", "ka", "ke",
+    "wala", "wale", "wali", "products", "items", "made",
+}
+
+# ── Devanagari → Latin ──────────────────────────────────────────────────────────
+
+_CONSONANTS = dict(zip(
+    "कखगघङचछजझञटठडढणतथदधनपफबभमयरलवशषसह",
+    ["k", "kh", "g", "gh", "n", "ch", "chh", "j", "jh", "n", "t", "th", "d", "dh", "n",
+     "t", "th", "d", "dh", "n", "p", "f", "b", "bh", "m", "y", "r", "l", "v", "sh", "sh",
+     "s", "h"],
+))
+_NUKTA_FORMS = {"ड": "r", "ढ": "rh", "क": "q", "ख": "kh", "ग": "g", "ज": "z", "फ": "f"}
+_VOWEL_SIGNS = dict(zip("ािीुूृेैोौॅॉ", ["a", "i", "i", "u", "u", "ri", "e", "ai", "o", "au", "e", "o"]))
+_VOWELS = dict(zip("अआइईउऊऋएऐओऔऑ", ["a", "a", "i", "i", "u", "u", "ri", "e", "ai", "o", "au", "o"]))
+_MARKS = {"ं": "n", "ँ": "n", "ः": "h"}
+_VIRAMA, _NUKTA = "्", "़"
+_DIGITS = {chr(0x0966 + d): str(d) for d in range(10)}
+
+
+def transliterate(text):
+    """
+    Rough Devanagari → Latin, in the spelling MSE owners type: inherent 'a'
+    after consonants except before a vowel sign or virama and at word end
+    ("मसाला" → "masala", "बीज" → "bij"). Latin text passes through.
+    """
+    out = []
+    chars = list(text)
+    for i, ch in enumerate(chars):
+        nxt = chars[i + 1] if i + 1 < len(chars) else ""
+        if ch in _CONSONANTS:
+            out.append(_NUKTA_FORMS[ch] if nxt == _NUKTA and ch in _NUKTA_FORMS else _CONSONANTS[ch])
+            after = chars[i + 2] if nxt == _NUKTA and i + 2 < len(chars) else nxt
+            word_end = not after or not ("ऀ" <= after <= "ॿ")
+            if after not in _VOWEL_SIGNS and after != _VIRAMA and not word_end:
+                out.append("a")
+        elif ch in _VOWEL_SIGNS:
+            out.append(_VOWEL_SIGNS[ch])
+        elif ch in _VOWELS:
+            out.append(_VOWELS[ch])
+        elif ch in _MARKS:
+            out.append(_MARKS[ch])
+        elif ch in _DIGITS:
+            out.append(_DIGITS[ch])
+        elif ch in (_VIRAMA, _NUKTA):
+            continue
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _fold(token):
+    """Collapse spelling variants of romanized Hindi / English."""
+    token = re.sub(r"(.)\1+", r"\1", token.replace("ee", "i").replace("oo", "u"))
+    return token.replace("w", "v")
+
+
+def _tokens(text):
+    tokens = transliterate(_normalize(text or "")).split()
+    return [_fold(t) for t in tokens if t not in _STOPWORDS]
+
+
+# ── Embedders ──────────────────────────────────────────────────────────────────
+
+class HashedNgramEmbedder:
+    """Hashed character n-gram vectors (sublinear counts, L2-normalized)."""
+
+    def __init__(self, dim=_DIM, ngrams=_NGRAMS):
+        self.dim = dim
+        self.ngrams = tuple(ngrams)
+        self.name = f"hashed-{dim}-{'.'.join(map(str, self.ngrams))}"
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _tokens(text):
+                padded = f" {token} "
+                for n in self.ngrams:
+                    for i in range(len(padded) - n + 1):
+                        out[row, zlib.crc32(padded[i:i + n].encode("utf-8")) % self.dim] += 1.0
+        np.sqrt(out, out=out)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms > 0, norms, 1.0)
+
+
+class LocalModelEmbedder:
+    """A sentence-transformers model loaded from the local cache (CPU)."""
+
+    def __init__(self, model_name):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "CATEGORY_EMBEDDER=st:… needs the sentence-transformers package"
+            ) from e
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts):
+        vectors = self.model.encode(
+            [transliterate(t) for t in texts], normalize_embeddings=True, convert_to_numpy=True
+        )
+        return vectors.astype(np.float32)
+
+
+def get_embedder(spec=None):
+    spec = spec or EMBEDDER
+    if spec.startswith("st:"):
+        return LocalModelEmbedder(spec[3:])
+    return HashedNgramEmbedder()
+
+
+# ── Index ──────────────────────────────────────────────────────────────────────
+
+def _category_texts(row):
+    """Texts embedded for one category: each keyword, the name, the ONDC l2/l3 path."""
+    texts = [k for k in _normalize_keywords(row.get("keywords")) if _tokens(k)]
+    texts.append(row.get("name") or row["code"])
+    texts += [row[key] for key in ("ondc_l2", "ondc_l3") if row.get(key)]
+    return texts
+
+
+def _fingerprint(categories, embedder):
+    payload = json.dumps(
+        [embedder.name, [[row["code"], row["name"], _category_texts(row)] for row in categories]],
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class CategoryVectorIndex:
+    """Row vectors (float16, memory-mapped) grouped by category."""
+
+    def __init__(self, vectors, codes, names, offsets, embedder, build_ms=0.0):
+        self.vectors = vectors  # (rows, dim) float16; rows of category i start at offsets[i]
+        self.categories = list(zip(codes, names))
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.embedder = embedder
+        self.build_ms = build_ms  # 0.0 when loaded from disk
+
+    def similarities(self, pieces):
+        """(pieces × categories) best cosine of each piece against each category's rows."""
+        queries = self.embedder.embed(pieces)
+        # Hashed query vectors are sparse: read only their columns from the mmap
+        cols = np.flatnonzero(queries.any(axis=0))
+        sims = queries[:, cols] @ self.vectors[:, cols].T.astype(np.float32)
+        return np.maximum.reduceat(sims, self.offsets, axis=1)
+
+    def scores(self, pieces):
+        """Mean over pieces of the best per-category similarity, clipped to [0, 1]."""
+        pieces = [p for p in pieces if _tokens(p)]
+        if not pieces:
+            return np.zeros(len(self.categories))
+        return np.clip(self.similarities(pieces).mean(axis=0), 0.0, 1.0)
+
+
+_build_lock = threading.Lock()
+
+
+def _replace_atomic(target, write):
+    """Call write(file) on a temp name unique to this process and thread, then rename it to `target`."""
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def build_index(categories, path=INDEX_PATH, embedder=None):
+    """
+    Embed `categories` and write vectors-<fingerprint>.npy (float16) plus
+    meta.json naming it under `path`. Both files are renamed into place from
+    per-process temp files, and the vectors file is named after its content,
+    so concurrent builders can never pair meta.json with another build's
+    vectors. Vector files of older fingerprints are removed.
+    """
+    embedder = embedder or get_embedder()
+    start = time.perf_counter()
+    texts, offsets = [], []
+    for row in categories:
+        offsets.append(len(texts))
+        texts += _category_texts(row)
+    vectors = embedder.embed(texts).astype(np.float16)
+    fingerprint = _fingerprint(categories, embedder)
+    vectors_name = f"vectors-{fingerprint[:16]}.npy"
+    meta = {
+        "fingerprint": fingerprint,
+        "embedder": embedder.name,
+        "vectors": vectors_name,
+        "codes": [row["code"] for row in categories],
+        "names": [row["name"] for row in categories],
+        "offsets": offsets,
+        "rows": len(texts),
+    }
+    path = Path(path)
+    with _build_lock:
+        path.mkdir(parents=True, exist_ok=True)
+        _replace_atomic(path / vectors_name, lambda f: np.save(f, vectors))
+        _replace_atomic(
+            path / "meta.json", lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        )
+        for old in path.glob("vectors*.npy"):
+            if old.name != vectors_name:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass  # still mapped by another process (Windows); removed next build
+    build_ms = (time.perf_counter() - start) * 1000
+    return CategoryVectorIndex(
+        np.load(path / vectors_name, mmap_mode="r"), meta["codes"], meta["names"], offsets,
+        embedder, build_ms,
+    )
+
+
+def load_index(categories, path=INDEX_PATH, embedder=None):
+    """
+    Memory-map the index under `path`, rebuilding it if it is missing, out
+    of date or inconsistent (row count or category count off).
+    """
+    embedder = embedder or get_embedder()
+    path = Path(path)
+    try:
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta["fingerprint"] == _fingerprint(categories, embedder):
+            vectors = np.load(path / Path(meta["vectors"]).name, mmap_mode="r")
+            if (vectors.ndim == 2 and vectors.shape[0] == meta["rows"]
+                    and len(meta["offsets"]) == len(meta["codes"]) == len(categories)):
+                return CategoryVectorIndex(
+                    vectors, meta["codes"], meta["names"], meta["offsets"], embedder,
+                )
+    except (OSError, ValueError, KeyError):
+        pass
+    return build_index(categories, path, embedder)
+
+
+# ── Classification ─────────────────────────────────────────────────────────────
+
+def classify(pieces, index, matcher=None, mode="hybrid", top_k=3, min_score=None,
+             keyword_text=None, min_margin=None):
+    """
+    Best category for product `pieces` (list of strings). mode "vector" uses
+    similarity only; "hybrid" also needs `matcher` (a KeywordMatcher over the
+    same categories) and adds its hit counts over `keyword_text` (default:
+    the pieces joined), squashed to hits / (hits + 1).
+    Returns the same shape as category_scorer classify(), with "confidence"
+    being the fused score in [0, 1]; `min_score` and `min_margin` default to
+    MIN_SCORE[mode] and MIN_MARGIN[mode].
+    """
+    min_score = MIN_SCORE[mode] if min_score is None else min_score
+    min_margin = MIN_MARGIN[mode] if min_margin is None else min_margin
+    score = index.scores(pieces)
+    if mode == "hybrid":
+        hits = np.array(matcher.hit_counts(keyword_text or " ".join(pieces)), dtype=float)
+        score = (1 - HYBRID_KEYWORD_WEIGHT) * score + HYBRID_KEYWORD_WEIGHT * hits / (hits + 1)
+    order = np.argsort(-score, kind="stable")[:max(top_k, 2)]  # the runner-up sets the margin
+    candidates = [
+        {"code": index.categories[i][0], "name": index.categories[i][1],
+         "score": round(float(score[i]), 4), "confidence": round(float(score[i]), 4)}
+        for i in order if score[i] > 0
+    ]
+    best = candidates[0] if candidates else None
+    runner_up = candidates[1]["score"] if len(candidates) > 1 else 0.0
+    unknown = best is None or best["score"] < min_score or best["score"] - runner_up < min_margin
+    return {
+        "code": None if unknown else best["code"],
+        "name": None if unknown else best["name"],
+        "score": best["score"] if best else 0.0,
+        "confidence": best["confidence"] if best else 0.0,
+        "unknown": unknown,
+        "candidates": candidates[:top_k],
+    }
+
+
+def fit_thresholds(pieces_list, codes, index, matcher=None, mode="hybrid"):
+    """
+    (min_score, min_margin) maximizing accuracy on labeled product lists; a
+    code of None means "unknown" is the right answer. Ties go to the larger
+    thresholds, as categorize_products() falls back to BM25 on unknown.
+    """
+    best, runner_up, predicted = [], [], []
+    for pieces in pieces_list:
+        result = classify(pieces, index, matcher, mode, top_k=2, min_score=0.0, min_margin=0.0)
+        scores = [c["score"] for c in result["candidates"]] + [0.0, 0.0]
+        best.append(scores[0])
+        runner_up.append(scores[1])
+        predicted.append(result["candidates"][0]["code"] if result["candidates"] else None)
+    best, margin = np.array(best), np.array(best) - np.array(runner_up)
+    right = np.array([p == c for p, c in zip(predicted, codes)])
+    wants_unknown = np.array([c is None for c in codes])
+
+    fit = None
+    for min_score in np.linspace(0.0, 1.0, 41):
+        for min_margin in np.linspace(0.0, 0.5, 41):
+            unknown = (best < min_score) | (margin < min_margin)
+            accuracy = np.where(unknown, wants_unknown, right).mean()
+            if fit is None or accuracy >= fit[0]:
+                fit = (accuracy, round(float(min_score), 4), round(float(min_margin), 4))
+    return fit[1], fit[2]
+
+
+def get_index(driver):
+    """Vector index for the current category snapshot (loaded on first use)."""
+    snap = categorization._get_snapshot(driver)
+    index = snap.vectors
+    if index is None:
+        index = snap.vectors = load_index(snap.categories)
+    return index
+
+
+def classify_products(products, driver, business_name="", transcription="", mode="hybrid", top_k=3):
+    """
+    categorize_products() counterpart on the vector / hybrid backend. The
+    transcription only feeds keyword hits; embedded whole it would drown
+    the product names.
+    """
+    pieces = [p for p in [*products, business_name or ""] if p and p.strip()]
+    snap = categorization._get_snapshot(driver)
+    keyword_text = " ".join([*pieces, transcription or ""])
+    return classify(pieces, get_index(driver), snap.matcher, mode=mode, top_k=top_k,
+                    keyword_text=keyword_text)
@@ -0,0 +1,218 @@
+"""
+Persistent question → Cypher cache for graphrag_service.
+
+Lookup is two-tier:
+  1. exact match on the normalized question text, then
+  2. nearest neighbour over character n-gram TF-IDF vectors (NumPy, cosine),
+     accepted only above a confidence threshold, when both questions use the
+     same content words up to inflection ("textiles" ~ "textile"), and when
+     every string literal in the cached Cypher (city, product term, …) appears
+     in the new question — so "SNPs in Pune" never reuses the query cached for
+     "SNPs in Mumbai", nor "not export-ready" the one for "export-ready".
+
+Only Cypher that executed successfully is stored (see graphrag_service.ask).
+Entries are evicted LRU and persisted as JSON so the cache survives restarts.
+"""
+import contextlib
+import difflib
+import json
+import os
+import re
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+CACHE_PATH = Path(
+    os.getenv("CYPHER_CACHE_PATH")
+    or Path(__file__).resolve().parents[2] / ".cache" / "cypher_cache.json"
+)
+MAX_ENTRIES = 500
+SIMILARITY_THRESHOLD = 0.75
+_NGRAM = 3
+_DIM = 4096
+
+# Filler words that change phrasing but not the query
+_STOPWORDS = {
+    "a", "an", "the", "in", "for", "of", "to", "at", "on", "me", "show", "list",
+    "give", "find", "what", "which", "who", "are", "is", "all", "please", "can",
+    "you", "tell", "about", "with", "from", "there", "do", "does", "any",
+    "best", "top", "that", "those", "these", "by", "and", "our", "my", "have",
+}
+
+
+def normalize(question: str) -> str:
+    text = re.sub(r"[^a-z0-9\u0900-\u097F\s]", " ", (question or "").lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _content_tokens(text: str) -> list:
+    return [t for t in normalize(text).split() if t not in _STOPWORDS]
+
+
+def _ngram_counts(text: str) -> np.ndarray:
+    """Hashed character n-gram counts over the content words (order-insensitive)."""
+    vec = np.zeros(_DIM, dtype=np.float32)
+    for token in _content_tokens(text):
+        padded = f" {token} "
+        for i in range(len(padded) - _NGRAM + 1):
+            vec[zlib.crc32(padded[i:i + _NGRAM].encode("utf-8")) % _DIM] += 1.0
+    return vec
+
+
+def _same_word(a: str, b: str) -> bool:
+    if a == b or a.rstrip("s") == b.rstrip("s"):
+        return True
+    if a.isdigit() or b.isdigit():
+        return False
+    return (len(a) >= 4 and len(b) >= 4 and a[:4] == b[:4]
+            and difflib.SequenceMatcher(None, a, b).ratio() >= 0.8)
+
+
+def _same_content(q1: str, q2: str) -> bool:
+    """Every content word of each question has a counterpart in the other."""
+    t1, t2 = _content_tokens(q1), _content_tokens(q2)
+    return (all(any(_same_word(a, b) for b in t2) for a in t1)
+            and all(any(_same_word(b, a) for a in t1) for b in t2))
+
+
+def _literals(cypher: str) -> list:
+    return [lit.lower() for lit in re.findall(r"'([^']+)'", cypher or "")]
+
+
+def _mentions(question: str, literal: str) -> bool:
+    """True if `literal` (or its stem, e.g. 'textile' for 'textiles') appears in the question."""
+    text = normalize(question)
+    if normalize(literal) in text:
+        return True
+    stem = normalize(literal)[:5]
+    return len(stem) >= 4 and any(tok.startswith(stem) for tok in text.split())
+
+
+class CypherCache:
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, threshold=SIMILARITY_THRESHOLD):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries = OrderedDict()  # normalized question -> {"question", "cypher"}
+        self._lock = threading.Lock()
+        self._matrix = None  # TF-IDF rows aligned with self._keys
+        self._keys = []
+        self._loaded = False
+        self.stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0}
+
+    # ── persistence ──────────────────────────────────────────────────────────
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for item in json.load(f):
+                    self._entries[normalize(item["question"])] = item
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # A temp file of its own, so concurrent writers never share one
+            f = tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.path.parent, suffix=".tmp", delete=False
+            )
+            try:
+                with f:
+                    json.dump(list(self._entries.values()), f, ensure_ascii=False)
+                os.replace(f.name, self.path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(f.name)
+                raise
+        except OSError:
+            pass  # a read-only deploy just loses persistence, not caching
+
+    # ── similarity index ─────────────────────────────────────────────────────
+    def _index(self):
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            if self._keys:
+                counts = np.stack([_ngram_counts(self._entries[k]["question"]) for k in self._keys])
+                df = (counts > 0).sum(axis=0)
+                self._idf = np.log((1 + len(self._keys)) / (1 + df)) + 1.0
+                self._matrix = self._weigh(counts)
+            else:
+                self._idf = np.ones(_DIM, dtype=np.float32)
+                self._matrix = np.zeros((0, _DIM), dtype=np.float32)
+        return self._matrix
+
+    def _weigh(self, counts):
+        weighted = counts * self._idf
+        norms = np.linalg.norm(weighted, axis=-1, keepdims=True)
+        return weighted / np.where(norms == 0, 1.0, norms)
+
+    # ── public API ───────────────────────────────────────────────────────────
+    def get(self, question: str):
+        """
+        Return {"cypher", "match": "exact"|"similar", "similarity", "question"}
+        or None on a miss.
+        """
+        key = normalize(question)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return {**entry, "match": "exact", "similarity": 1.0}
+
+            matrix = self._index()
+            if len(matrix):
+                sims = matrix @ self._weigh(_ngram_counts(question))
+                for idx in np.argsort(-sims)[:3]:
+                    if sims[idx] < self.threshold:
+                        break
+                    cand = self._entries[self._keys[idx]]
+                    if not _same_content(question, cand["question"]):
+                        continue
+                    if all(_mentions(question, lit) for lit in _literals(cand["cypher"])):
+                        self._entries.move_to_end(self._keys[idx])
+                        self.stats["similar_hits"] += 1
+                        return {**cand, "match": "similar", "similarity": float(sims[idx])}
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, question: str, cypher: str):
+        """Store Cypher that has executed successfully for `question`."""
+        key = normalize(question)
+        if not key or not cypher:
+            return
+        with self._lock:
+            self._load()
+            self._entries[key] = {"question": question, "cypher": cypher}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+            self._save()
+
+    def discard(self, question: str):
+        """Drop an entry whose Cypher stopped working (e.g. after a schema change)."""
+        key = normalize(question)
+        with self._lock:
+            self._load()
+            if self._entries.pop(key, None) is not None:
+                self._matrix = None
+                self._save()
+
+
+_cache: CypherCache | None = None
+
+
+def get_cache() -> CypherCache:
+    global _cache
+    if _cache is None:
+        _cache = CypherCache()
+    return _cache
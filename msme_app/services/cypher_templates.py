@@ -0,0 +1,234 @@
+"""
+Local intent classifier + slot filler for common Ask Anything questions.
+
+Maps questions onto pre-written, parameterized Cypher that follows the
+canonical patterns in graphrag_service._CYPHER_SYSTEM (rules 10–12), so the
+LLM is skipped and Neo4j can reuse cached plans (only $params change).
+Anything the rules do not understand returns None and goes to the LLM:
+a term that is not category vocabulary (names, sectors, keywords), a number
+not introduced by "top"/"first", comparatives ("rated above 90", "lowest"),
+negations ("outside Mumbai") and alternatives ("Mumbai or Pune").
+
+Slots: term (category word), city, limit (top/first N), export flag.
+"""
+import re
+
+from msme_app.services.geocoding import canonical_city, known_city_names
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+
+_SNP_WORDS = {"snp", "snps", "seller", "sellers", "provider", "providers", "partner",
+              "partners", "participant", "participants", "service", "network"}
+_MSE_WORDS = {"mse", "mses", "msme", "msmes", "enterprise", "enterprises", "business",
+              "businesses", "company", "companies", "unit", "units", "manufacturer",
+              "manufacturers", "supplier", "suppliers"}
+_CATEGORY_WORDS = {"category", "categories"}
+_EXPORT_WORDS = {"export", "exports", "exporter", "exporters", "ready", "capable"}
+_NEGATIONS = {"not", "no", "non", "without", "except", "never", "excluding", "outside",
+              "besides", "other", "than", "or", "either", "nor"}
+# Filters and orderings no template expresses
+_COMPARATIVES = {"above", "over", "below", "under", "more", "less", "greater", "fewer",
+                 "least", "most", "lowest", "worst", "between", "minimum", "maximum", "min",
+                 "max", "atleast", "beyond", "within", "capacity"}
+_LIMIT_WORDS = {"top", "first"}
+_FILLER = {
+    "a", "an", "the", "in", "for", "of", "to", "at", "on", "me", "show", "list", "give",
+    "find", "what", "which", "who", "are", "is", "all", "please", "can", "you", "tell",
+    "about", "with", "from", "there", "do", "does", "any", "best", "top", "that", "those",
+    "these", "by", "and", "our", "my", "have", "based", "located", "registered", "rated",
+    "highest", "rating", "ratings", "recommend", "recommended", "good", "serve", "serving",
+    "serves", "sector", "industry", "industries", "products", "product", "making", "make",
+    "makes", "dealing", "deal", "field", "area", "get", "need", "want", "i", "we", "near",
+    "around", "available", "how", "many", "count", "number", "total", "first",
+}
+
+_SNP_RETURN = """
+RETURN s.id, s.name, s.city,
+       round(s.rating * 100) AS rating_pct,
+       s.export_capable, s.certifications, s.payment_terms, s.specialization
+"""
+_SNP_FILTERS = """
+  AND ($city IS NULL OR s.city_norm = $city)
+  AND ($export IS NULL OR s.export_capable = $export)
+"""
+_MSE_RETURN = """
+RETURN m.id, m.name, m.city, m.products, m.nic_activity
+"""
+
+TEMPLATES = {
+    # Rule 11: SNPs for a category/sector/keyword term
+    "snps_by_category": """
+MATCH (s:SNP)-[:SERVES]->(c:Category)
+WHERE (toLower(c.name) CONTAINS $term
+       OR toLower(c.sector) CONTAINS $term
+       OR ANY(k IN c.keywords WHERE toLower(k) CONTAINS $term))
+""" + _SNP_FILTERS + """
+WITH DISTINCT s ORDER BY s.rating DESC LIMIT $limit
+""" + _SNP_RETURN,
+    # Rule 12: top-N SNPs, no category filter
+    "top_snps": """
+MATCH (s:SNP)
+WHERE true
+""" + _SNP_FILTERS + """
+WITH s ORDER BY s.rating DESC LIMIT $limit
+""" + _SNP_RETURN,
+    # Rule 10: MSEs in an industry, searched through the Category graph
+    "mses_by_industry": """
+MATCH (m:MSE)-[:OFFERS]->(c:Category)
+WHERE (toLower(c.name) CONTAINS $term
+       OR toLower(c.sector) CONTAINS $term
+       OR ANY(k IN c.keywords WHERE toLower(k) CONTAINS $term)
+       OR ANY(p IN m.products WHERE toLower(p) CONTAINS $term)
+       OR toLower(m.nic_activity) CONTAINS $term)
+  AND ($city IS NULL OR m.city_norm = $city)
+WITH DISTINCT m ORDER BY m.name LIMIT $limit
+""" + _MSE_RETURN,
+    "mses_in_city": """
+MATCH (m:MSE)
+WHERE m.city_norm = $city
+WITH m ORDER BY m.name LIMIT $limit
+""" + _MSE_RETURN,
+    "count_mses": """
+MATCH (m:MSE)
+WHERE $city IS NULL OR m.city_norm = $city
+RETURN count(DISTINCT m) AS mse_count
+""",
+    "count_snps": """
+MATCH (s:SNP)
+WHERE true
+""" + _SNP_FILTERS + """
+RETURN count(DISTINCT s) AS snp_count
+""",
+    "count_categories": """
+MATCH (c:Category)
+RETURN count(DISTINCT c) AS category_count
+""",
+}
+
+
+def _tokens(question):
+    text = re.sub(r"[^a-z0-9\u0900-\u097F\s-]", " ", (question or "").lower())
+    text = text.replace("-", " ")
+    return text.split()
+
+
+def _singular(word):
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def _extract_city(tokens, cities):
+    """
+    Longest city mentioned in the question (multi-word aware), from the graph's
+    cities plus the offline geocoding table. Returns (name as stored in
+    city_norm, tokens it consumed).
+    """
+    in_graph = {c.strip().lower() for c in (cities or []) if c}
+    text = f" {' '.join(tokens)} "
+    for name in sorted(in_graph | known_city_names(), key=len, reverse=True):
+        if f" {name} " in text:
+            if name in in_graph:
+                return name, set(name.split())
+            canon = canonical_city(name)
+            # Alias of a city stored under another spelling (Bangalore → bengaluru)
+            return (canon if canon in in_graph or not in_graph else name), set(name.split())
+    return None, set()
+
+
+def _term(words):
+    """Lower-cased words → slot form (last word singular), as used for $term."""
+    return " ".join(words[:-1] + [_singular(words[-1])]) if words else None
+
+
+def category_vocabulary(categories):
+    """
+    Terms a template may filter on: each category name, sector and keyword
+    (as a phrase and word by word), in _term() form.
+    """
+    vocabulary = set()
+    for row in categories:
+        texts = [row.get("name"), row.get("sector"), *(row.get("keywords") or [])]
+        for text in texts:
+            words = _tokens(text) if isinstance(text, str) else []
+            if words:
+                vocabulary.add(_term(words))
+                vocabulary.update(_singular(w) for w in words)
+    return vocabulary
+
+
+def classify(question, cities=None, vocabulary=None):
+    """
+    Return {"intent", "cypher", "params"} for a recognised question, else None.
+    `cities` is the list of city names present in the graph; `vocabulary` is
+    category_vocabulary() of the graph's categories — without it, questions
+    with a term are left to the LLM.
+    """
+    tokens = _tokens(question)
+    if not tokens or (_NEGATIONS | _COMPARATIVES) & set(tokens):
+        return None
+
+    city, city_tokens = _extract_city(tokens, cities)
+    limit = None
+    for i, t in enumerate(tokens):
+        if t.isdigit():
+            # Only "top N" / "first N" is a limit; any other number is a filter
+            if limit is not None or i == 0 or tokens[i - 1] not in _LIMIT_WORDS:
+                return None
+            limit = min(int(t), MAX_LIMIT)
+    limit = limit or DEFAULT_LIMIT
+    words = set(tokens)
+    export = True if words & {"export", "exports", "exporter", "exporters"} else None
+
+    is_count = ("how" in words and "many" in words) or "count" in words or (
+        "number" in words and "of" in words
+    )
+    wants_snp = bool(_SNP_WORDS & words)
+    wants_mse = bool(_MSE_WORDS & words)
+    wants_category = bool(_CATEGORY_WORDS & words)
+    if wants_snp and wants_mse:
+        return None  # matching questions (MSE→SNP) need the LLM
+
+    leftover = [
+        t for t in tokens
+        if t not in _FILLER and t not in _SNP_WORDS and t not in _MSE_WORDS
+        and t not in _CATEGORY_WORDS and t not in _EXPORT_WORDS
+        and t not in city_tokens and not t.isdigit()
+    ]
+    if len(leftover) > 2:
+        return None
+    term = _term(leftover)
+    if term and term not in (vocabulary or ()):
+        return None
+
+    params = {"city": city, "export": export, "limit": limit, "term": term}
+
+    if is_count:
+        if term:
+            return None
+        if wants_snp:
+            intent = "count_snps"
+        elif wants_mse and export is None:
+            intent = "count_mses"
+        elif wants_category and not city and export is None:
+            intent = "count_categories"
+        else:
+            return None
+    elif wants_snp:
+        intent = "snps_by_category" if term else "top_snps"
+    elif wants_mse:
+        if export is not None:
+            return None
+        if term:
+            intent = "mses_by_industry"
+        elif city:
+            intent = "mses_in_city"
+        else:
+            return None
+    else:
+        return None
+
+    return {"intent": intent, "cypher": TEMPLATES[intent].strip(), "params": params}
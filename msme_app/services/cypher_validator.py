@@ -0,0 +1,266 @@
+"""
+Pre-execution checks for LLM-generated Cypher.
+
+Catches the mistakes that otherwise cost a failed Neo4j round-trip plus a
+fix_cypher() LLM call: labels, relationship types and properties that are not
+in graphrag_service._SCHEMA, RETURN DISTINCT + ORDER BY on a node property
+(rule 12), and a missing LIMIT (rule 4). Trivial cases — wrong case, near-miss
+property names, the rule-12 rewrite, appending LIMIT — are repaired locally;
+unknown labels, relationship types and unfixable RETURN clauses are returned
+as errors for the LLM to fix before anything is sent to the database. A
+property that is not in the schema is only a warning: the prompt schema
+does not list every stored property, and reading a missing one is null, not
+a failure.
+"""
+import difflib
+import re
+import threading
+
+DEFAULT_LIMIT = 25
+# Rough cost of the reactive path a local repair avoids (failed DB call +
+# fix_cypher + retry), used until real fix timings have been observed.
+_DEFAULT_FIX_COST_MS = 1500.0
+
+_AGGREGATES = ("count(", "sum(", "avg(", "min(", "max(", "collect(", "percentilecont(",
+               "percentiledisc(", "stdev(")
+
+_lock = threading.Lock()
+_stats = {
+    "checked": 0,
+    "clean": 0,
+    "warned": 0,
+    "auto_repaired": 0,
+    "sent_to_llm": 0,
+    "exec_fixes": 0,
+    "exec_fix_ms": 0.0,
+}
+
+
+def parse_schema(text: str) -> dict:
+    """
+    Parse the prompt schema into {"labels": {label: {props}}, "rels": {type}}.
+    Parenthesised notes ("rating (Float 0.0–1.0; …)") are dropped.
+    """
+    labels, rels, current = {}, set(), None
+    for line in text.splitlines():
+        node = re.match(r"\s*NODE:\s*(\w+)", line)
+        if node:
+            current = labels.setdefault(node.group(1), set())
+            continue
+        if line.strip().startswith("RELATIONSHIPS"):
+            current = None
+            continue
+        rel = re.search(r"\((\w+)\)-\[:(\w+)\]->\((\w+)\)", line)
+        if rel:
+            rels.add(rel.group(2))
+            continue
+        if current is not None and line.strip():
+            bare = line
+            while re.search(r"\([^()]*\)", bare):
+                bare = re.sub(r"\([^()]*\)", "", bare)
+            for item in bare.split(","):
+                item = item.strip()
+                if re.fullmatch(r"[a-z_][a-z0-9_]*", item):
+                    current.add(item)
+    return {"labels": labels, "rels": rels}
+
+
+def _mask_strings(cypher: str) -> str:
+    """Same-length copy with string literal contents blanked, so offsets still line up."""
+    def blank(m):
+        text = m.group(0)
+        return text[0] + " " * (len(text) - 2) + text[-1]
+
+    return re.sub(r"'[^']*'|\"[^\"]*\"", blank, cypher)
+
+
+def _closest(name, candidates, cutoff=0.85):
+    lowered = {c.lower(): c for c in candidates}
+    if name.lower() in lowered:
+        return lowered[name.lower()]
+    if name.lower().rstrip("s") in lowered:
+        return lowered[name.lower().rstrip("s")]
+    match = difflib.get_close_matches(name, list(candidates), n=1, cutoff=cutoff)
+    return match[0] if match else None
+
+
+class _Edits:
+    """Collects (start, end, replacement) edits on the original text."""
+
+    def __init__(self):
+        self.spans = []
+
+    def add(self, start, end, text):
+        self.spans.append((start, end, text))
+
+    def apply(self, cypher):
+        for start, end, text in sorted(self.spans, reverse=True):
+            cypher = cypher[:start] + text + cypher[end:]
+        return cypher
+
+
+def _check_names(cypher, masked, schema, repairs, errors, warnings):
+    labels, rels = schema["labels"], schema["rels"]
+    edits = _Edits()
+    var_labels = {}
+
+    for m in re.finditer(r"\(\s*(\w*)\s*:\s*([A-Za-z_]\w*)", masked):
+        var, label = m.group(1), m.group(2)
+        fixed = label if label in labels else _closest(label, labels, cutoff=0.9)
+        if fixed is None:
+            errors.append(f"Unknown node label :{label}. Valid labels: {', '.join(sorted(labels))}.")
+            continue
+        if fixed != label:
+            edits.add(m.start(2), m.end(2), fixed)
+            repairs.append(f"label :{label} → :{fixed}")
+        if var:
+            var_labels[var] = fixed
+
+    for m in re.finditer(r"\[\s*\w*\s*:\s*([A-Za-z_][\w|:]*)", masked):
+        offset = m.start(1)
+        for part in re.finditer(r"[A-Za-z_]\w*", m.group(1)):
+            rel = part.group(0)
+            fixed = rel if rel in rels else _closest(rel, rels, cutoff=0.9)
+            if fixed is None:
+                errors.append(
+                    f"Unknown relationship type :{rel}. Valid types: {', '.join(sorted(rels))}."
+                )
+            elif fixed != rel:
+                edits.add(offset + part.start(), offset + part.end(), fixed)
+                repairs.append(f"relationship :{rel} → :{fixed}")
+
+    for m in re.finditer(r"\b([A-Za-z_]\w*)\.([A-Za-z_]\w*)\b", masked):
+        var, prop = m.group(1), m.group(2)
+        label = var_labels.get(var)
+        if label is None:
+            continue
+        props = labels[label]
+        if prop in props:
+            continue
+        fixed = _closest(prop, props)
+        if fixed is None:
+            warnings.append(f"{label} has no property '{prop}' in the schema ({var}.{prop}).")
+        else:
+            edits.add(m.start(2), m.end(2), fixed)
+            repairs.append(f"property {var}.{prop} → {var}.{fixed}")
+
+    return edits.apply(cypher)
+
+
+def _split_items(text):
+    """Split a projection list on top-level commas."""
+    items, depth, current = [], 0, []
+    for ch in text:
+        if ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+        if ch == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        items.append("".join(current).strip())
+    return items
+
+
+_FINAL_RETURN = re.compile(
+    r"\bRETURN\s+(?P<distinct>DISTINCT\s+)?(?P<items>.*?)"
+    r"(?:\s+ORDER\s+BY\s+(?P<order>.*?))?"
+    r"(?:\s+SKIP\s+(?P<skip>\S+))?"
+    r"(?:\s+LIMIT\s+(?P<limit>\S+))?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _check_return(cypher, repairs, errors):
+    masked = _mask_strings(cypher)
+    if re.search(r"\bUNION\b", masked, re.IGNORECASE):
+        return cypher
+    returns = list(re.finditer(r"\bRETURN\b", masked, re.IGNORECASE))
+    if not returns:
+        return cypher
+    start = returns[-1].start()
+    m = _FINAL_RETURN.match(masked, start)
+    if not m:
+        return cypher
+    original = cypher[start:]
+    items = _split_items(original[m.start("items") - start:m.end("items") - start])
+
+    order = m.group("order")
+    if m.group("distinct") and order:
+        order_text = original[m.start("order") - start:m.end("order") - start]
+        exprs = [re.sub(r"\s+(ASC|DESC|ASCENDING|DESCENDING)$", "", o, flags=re.IGNORECASE).strip()
+                 for o in _split_items(order_text)]
+        item_exprs = {re.split(r"\s+AS\s+", i, flags=re.IGNORECASE)[0].strip() for i in items}
+        aliases = {re.split(r"\s+AS\s+", i, flags=re.IGNORECASE)[-1].strip() for i in items}
+        if any(e not in item_exprs and e not in aliases for e in exprs):
+            variables = set(re.findall(r"\b([A-Za-z_]\w*)\.", " ".join(items) + " " + order_text))
+            if len(variables) == 1:
+                var = variables.pop()
+                limit = f" LIMIT {m.group('limit')}" if m.group("limit") else f" LIMIT {DEFAULT_LIMIT}"
+                skip = f" SKIP {m.group('skip')}" if m.group("skip") else ""
+                rewritten = (f"WITH DISTINCT {var} ORDER BY {order_text}{skip}{limit}\n"
+                             f"RETURN {', '.join(items)}")
+                repairs.append("RETURN DISTINCT … ORDER BY rewritten as WITH DISTINCT … RETURN (rule 12)")
+                return cypher[:start] + rewritten
+            errors.append(
+                "RETURN DISTINCT with ORDER BY on a property that is not returned is invalid. "
+                "Sort and deduplicate in a WITH DISTINCT … ORDER BY … LIMIT clause before RETURN (rule 12)."
+            )
+            return cypher
+
+    if not re.search(r"\bLIMIT\b", masked, re.IGNORECASE):
+        aggregate_only = all(any(a in i.lower() for a in _AGGREGATES) for i in items)
+        if not aggregate_only:
+            repairs.append(f"added LIMIT {DEFAULT_LIMIT}")
+            return cypher.rstrip().rstrip(";") + f"\nLIMIT {DEFAULT_LIMIT}"
+    return cypher
+
+
+def validate(cypher: str, schema: dict, count: bool = True):
+    """
+    Check (and where trivial, repair) a generated query.
+    Returns (cypher, repairs, errors, warnings), each message listed once;
+    `errors` is empty when it can be sent as is, `warnings` are only reported.
+    Pass count=False for a re-check of the LLM's fix so it is not tallied twice.
+    """
+    repairs, errors, warnings = [], [], []
+    cypher = _check_names(cypher, _mask_strings(cypher), schema, repairs, errors, warnings)
+    cypher = _check_return(cypher, repairs, errors)
+    repairs, errors, warnings = (list(dict.fromkeys(m)) for m in (repairs, errors, warnings))
+    if not count:
+        return cypher, repairs, errors, warnings
+    with _lock:
+        _stats["checked"] += 1
+        if warnings:
+            _stats["warned"] += 1
+        if errors:
+            _stats["sent_to_llm"] += 1
+        elif repairs:
+            _stats["auto_repaired"] += 1
+        else:
+            _stats["clean"] += 1
+    return cypher, repairs, errors, warnings
+
+
+def record_exec_fix(elapsed_ms: float):
+    """Note a reactive fix (query failed in Neo4j, fix_cypher + retry) and what it cost."""
+    with _lock:
+        _stats["exec_fixes"] += 1
+        _stats["exec_fix_ms"] += elapsed_ms
+
+
+def stats():
+    """
+    Counters plus local_fix_rate (share of flawed queries repaired without the
+    LLM) and est_saved_ms (local repairs × average observed reactive-fix cost).
+    """
+    with _lock:
+        s = dict(_stats)
+    flawed = s["auto_repaired"] + s["sent_to_llm"] + s["exec_fixes"]
+    fix_cost = s["exec_fix_ms"] / s["exec_fixes"] if s["exec_fixes"] else _DEFAULT_FIX_COST_MS
+    s["local_fix_rate"] = round(s["auto_repaired"] / flawed, 3) if flawed else 0.0
+    s["est_saved_ms"] = round(s["auto_repaired"] * fix_cost, 1)
+    return s
@@ -0,0 +1,175 @@
+"""
+Follow-up questions answered over the previous turn's rows.
+
+"Which of those are export-ready?", "sort them by rating", "how many of
+them are in Pune?", "top 3 of those" only refine rows the user already has,
+so they are resolved here — filter / sort / limit / count on the cached
+results — without generating Cypher or querying Neo4j. resolve() returns
+None unless the question refers back to the previous answer ("those",
+"them", …) and every other word is understood, so anything needing new data
+goes through the full pipeline.
+"""
+import re
+
+from msme_app.services import answer_formatter
+from msme_app.services.geocoding import canonical_city
+
+_ANAPHORS = {"those", "them", "these", "they", "ones", "above"}
+_FILLER = {
+    "which", "of", "those", "them", "these", "they", "are", "is", "only", "just", "show",
+    "me", "list", "the", "ones", "among", "and", "with", "have", "has", "do", "does",
+    "please", "how", "many", "what", "who", "can", "sort", "sorted", "order", "ordered",
+    "by", "certified", "certification", "certifications", "ready", "capable", "rated",
+    "rating", "a", "an", "out", "to", "all", "above", "keep", "filter", "now", "give",
+    "tell", "number", "count", "there", "their", "it", "in", "from", "based", "located",
+}
+# Row fields each filter reads; at least one previous row must have one
+_FILTER_FIELDS = {
+    "export": ("export_capable",),
+    "min_rating": ("rating_pct", "rating"),
+    "max_rating": ("rating_pct", "rating"),
+    "cert": ("certifications",),
+    "city": ("city",),
+}
+_CERTS = r"iso\s?\d{3,5}|bis|fssai|gmp|haccp|ce|zed|bee"
+
+
+def _field(key):
+    return key.split(".", 1)[1] if "." in key else key
+
+
+def _view(row):
+    """Flat {property: value} for filtering, whatever the row shape (node column or projections)."""
+    view = {}
+    for key, value in dict(row).items():
+        if hasattr(value, "labels") and hasattr(value, "items"):
+            view.update(dict(value))
+        else:
+            view[_field(key)] = value
+    return view
+
+
+def _rating_pct(view):
+    if view.get("rating_pct") is not None:
+        return float(view["rating_pct"])
+    if view.get("rating") is not None:
+        return float(view["rating"]) * 100
+    return None
+
+
+def _parse(question):
+    """Return (ops, leftover words); ops is a list of (kind, arg, description)."""
+    text = " " + (question or "").lower().replace("-", " ") + " "
+    ops = []
+
+    def take(pattern, handler):
+        nonlocal text
+        m = re.search(pattern, text)
+        if m:
+            ops.append(handler(m))
+            text = text[:m.start()] + " " + text[m.end():]
+        return m
+
+    take(r"\bhow many\b|\bcount\b|\bnumber of\b", lambda m: ("count", None, None))
+    if not take(r"\b(?:not|non|no|without)\s+export(?:ers?|s)?\b(?:\s+(?:ready|capable))?",
+                lambda m: ("export", False, "not export-ready")):
+        take(r"\bexport(?:ers?|s)?\b(?:\s+(?:ready|capable))?",
+             lambda m: ("export", True, "export-ready"))
+    take(
+        r"\brat(?:ed|ing)?\s*(above|over|more than|greater than|at least|below|under|less than)"
+        r"\s*(\d+(?:\.\d+)?)\s*%?",
+        lambda m: (
+            "min_rating" if m.group(1) in ("above", "over", "more than", "greater than", "at least")
+            else "max_rating",
+            float(m.group(2)) * (100 if float(m.group(2)) <= 1 else 1),
+            f"rated {m.group(1)} {m.group(2)}%",
+        ),
+    )
+    take(rf"\b(?:with\s+)?({_CERTS})\b(?:\s+certifi\w*)?",
+         lambda m: ("cert", m.group(1).replace(" ", ""), f"with {m.group(1).upper()}"))
+    take(r"\b(top|best|first|highest rated)\s+(\d+)\b",
+         lambda m: ("limit", (int(m.group(2)), m.group(1) != "first"), f"{m.group(1)} {m.group(2)}"))
+    take(r"\b(?:sort(?:ed)?|order(?:ed)?)\b(?:\s+(?:them|those|these))?\s+by\s+(rating|name|city|capacity)\b",
+         lambda m: ("sort", m.group(1), f"sorted by {m.group(1)}"))
+    take(r"\b(highest|best|lowest|worst)\s+rated\b",
+         lambda m: ("sort", "rating" if m.group(1) in ("highest", "best") else "rating_asc",
+                    f"{m.group(1)} rated first"))
+    take(r"\b(?:in|from|based in|located in)\s+([a-z][a-z ]*?)(?=\s*(?:\?|$|\band\b|\bwith\b|,))",
+         lambda m: ("city", m.group(1).strip(), f"in {m.group(1).strip().title()}"))
+
+    leftover = [w for w in re.findall(r"[a-z0-9]+", text) if w not in _FILLER]
+    return ops, leftover
+
+
+def resolve(question: str, previous_results):
+    """
+    Answer a follow-up over `previous_results`, or None if the question is
+    not a pure refinement of them. Returns {"results", "operation", "answer"}
+    where "answer" is None when the subset still needs LLM phrasing.
+    """
+    if not previous_results:
+        return None
+    words = set(re.findall(r"[a-z]+", (question or "").lower()))
+    if not words & _ANAPHORS:
+        return None
+    ops, leftover = _parse(question)
+    if not ops or leftover:
+        return None
+
+    rows = list(previous_results)
+    views = [_view(r) for r in rows]
+    # Filtering on a field the previous rows do not carry (export readiness
+    # of MSE rows, say) would drop everything; that needs a new query instead
+    for kind, _, _ in ops:
+        fields = _FILTER_FIELDS.get(kind, ())
+        if fields and not any(v.get(f) is not None for v in views for f in fields):
+            return None
+    kept = list(range(len(rows)))
+    described = []
+    limit = None
+    for kind, arg, desc in ops:
+        if desc:
+            described.append(desc)
+        if kind == "export":
+            kept = [i for i in kept if views[i].get("export_capable") is not None
+                    and bool(views[i]["export_capable"]) == arg]
+        elif kind in ("min_rating", "max_rating"):
+            kept = [i for i in kept if _rating_pct(views[i]) is not None and (
+                _rating_pct(views[i]) >= arg if kind == "min_rating" else _rating_pct(views[i]) <= arg
+            )]
+        elif kind == "cert":
+            kept = [i for i in kept if any(
+                arg in str(c).lower().replace(" ", "") for c in views[i].get("certifications") or []
+            )]
+        elif kind == "city":
+            want = canonical_city(arg)
+            kept = [i for i in kept if canonical_city(views[i].get("city")) == want]
+        elif kind == "sort":
+            if arg in ("rating", "rating_asc"):
+                kept.sort(key=lambda i: _rating_pct(views[i]) or 0.0, reverse=arg == "rating")
+            elif arg == "capacity":
+                kept.sort(key=lambda i: views[i].get("capacity") or 0, reverse=True)
+            else:
+                kept.sort(key=lambda i: str(views[i].get(arg) or "").lower())
+        elif kind == "limit":
+            limit = arg
+
+    if limit:
+        n, by_rating = limit
+        if by_rating:
+            kept.sort(key=lambda i: _rating_pct(views[i]) or 0.0, reverse=True)
+        kept = kept[:n]
+
+    subset = [rows[i] for i in kept]
+    operation = ", ".join(described) or "count"
+    if any(kind == "count" for kind, _, _ in ops):
+        criteria = f" ({operation})" if described else ""
+        answer = f"**{len(subset):,}** of the {len(rows):,} previous results match{criteria}."
+    elif not subset:
+        answer = (
+            f"None of the {len(rows):,} previous results match ({operation}). "
+            "Try loosening that filter, or ask a new question to search again."
+        )
+    else:
+        answer = answer_formatter.render(question, subset)
+    return {"results": subset, "operation": operation, "answer": answer}
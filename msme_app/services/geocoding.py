@@ -0,0 +1,77 @@
+"""
+Offline geocoding for MSEs and SNPs.
+
+Resolves a PIN code or city name to approximate (lat, lon) from the bundled
+msme_app/data/pin_geo.csv table — one row per 3-digit PIN prefix (sorting
+district) and its main city. Accuracy is district-level, which is all the
+distance-decay geo score needs; no network access is required.
+"""
+import csv
+import re
+from functools import lru_cache
+from pathlib import Path
+
+_TABLE_PATH = Path(__file__).resolve().parents[1] / "data" / "pin_geo.csv"
+
+_CITY_ALIASES = {
+    "bangalore": "bengaluru",
+    "bombay": "mumbai",
+    "madras": "chennai",
+    "calcutta": "kolkata",
+    "gurgaon": "gurugram",
+    "baroda": "vadodara",
+    "mysore": "mysuru",
+    "mangalore": "mangaluru",
+    "new delhi": "delhi",
+    "cochin": "kochi",
+    "ernakulam": "kochi",
+    "trivandrum": "thiruvananthapuram",
+    "vizag": "visakhapatnam",
+    "tirupur": "tiruppur",
+}
+
+
+@lru_cache(maxsize=1)
+def _load_table():
+    by_prefix, by_city = {}, {}
+    with open(_TABLE_PATH, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            coords = (float(row["lat"]), float(row["lon"]))
+            # First row for a prefix is the district's main city
+            by_prefix.setdefault(row["pin_prefix"], coords)
+            by_city[row["city"].strip().lower()] = coords
+    return by_prefix, by_city
+
+
+def canonical_city(city):
+    """Lower-cased city name with common aliases resolved (Bangalore → bengaluru)."""
+    key = (city or "").strip().lower()
+    return _CITY_ALIASES.get(key, key)
+
+
+def known_city_names():
+    """Every city name and alias the offline table can resolve, lower-cased."""
+    return set(_load_table()[1]) | set(_CITY_ALIASES)
+
+
+def geocode(pin=None, city=None):
+    """
+    Return (lat, lon) for a PIN code or city, or None if neither resolves.
+    PIN wins over city when both are known.
+    """
+    by_prefix, by_city = _load_table()
+    digits = re.sub(r"\D", "", str(pin or ""))
+    if len(digits) == 6 and digits[:3] in by_prefix:
+        return by_prefix[digits[:3]]
+    return by_city.get(canonical_city(city))
+
+
+# Distance-decay geo score shared by run_reasoning() and matching_engine:
+#   geo = 0.1 + 0.9 * exp(-distance_km / GEO_DECAY_KM)
+# 1.0 at the same location, ~0.43 at 50 km, floor 0.1 far away (the old
+# "different city" value). Falls back to city equality when a point is missing.
+GEO_DECAY_KM = 50.0
+
+# Candidate SNPs are first pre-filtered to this radius via the point index;
+# if none qualify, matching falls back to every SNP serving the category.
+DEFAULT_RADIUS_KM = 300.0
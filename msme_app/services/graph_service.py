@@ -4,6 +4,10 @@ Updated for IndiaAI Innovation Challenge 2026
 """
 import json
 
+from msme_app.services import categorization, matching_engine, query_cache
+from msme_app.services.query_cache import cached, invalidates
+from msme_app.services.geocoding import DEFAULT_RADIUS_KM, GEO_DECAY_KM, geocode
+
 
 def setup_knowledge_graph(driver):
     """Legacy function - use seed_graph.py instead"""
@@ -50,6 +54,69 @@ def _normalize_list(value):
     return [value]
 
 
+def _mse_props(
+    name,
+    city,
+    products,
+    urn=None,
+    mobile=None,
+    email=None,
+    enterprise_type=None,
+    activity=None,
+    social_category=None,
+    incorporation_date=None,
+    commencement_date=None,
+    registration_date=None,
+    address=None,
+    state=None,
+    pin=None,
+    unit_names=None,
+    nic_5_digit_codes=None,
+    nic_activity=None,
+    source=None,
+):
+    """Build the MSE property map shared by save_mse() and save_mses_bulk()."""
+    lat, lon = geocode(pin=pin, city=city) or (None, None)
+    return {
+        "name": name,
+        "city": city,
+        "products": products,
+        "urn": urn or None,  # blank URNs stay unset
+        "mobile": mobile,
+        "email": email,
+        "type": enterprise_type,
+        "activity": activity,
+        "social_category": social_category,
+        "incorporation_date": incorporation_date,
+        "commencement_date": commencement_date,
+        "registration_date": registration_date,
+        "address": _normalize_address(address),
+        "state": state,
+        "pin": pin,
+        "unit_names": _normalize_list(unit_names),
+        "nic_5_digit_codes": _normalize_list(nic_5_digit_codes),
+        "nic_activity": nic_activity,
+        "source": source,
+        "lat": lat,
+        "lon": lon,
+    }
+
+
+_SAVE_MSE_QUERY = """
+    UNWIND $rows AS row
+    MERGE (m:MSE {id: row.id})
+    ON CREATE SET m.created_at = timestamp()
+    SET m += row.props,
+        m.city_norm = toLower(trim(row.props.city)),
+        m.location = CASE WHEN row.props.lat IS NULL THEN null
+                          ELSE point({latitude: row.props.lat, longitude: row.props.lon}) END
+    MERGE (c:Category {code: row.cat})
+    SET c.name = coalesce(c.name, row.cat_name)
+    MERGE (m)-[:OFFERS]->(c)
+"""
+
+
+@invalidates
 def save_mse(
     driver,
     mse_id,
@@ -75,70 +142,366 @@ def save_mse(
     nic_activity=None,
     source=None,
 ):
+    props = _mse_props(
+        name,
+        city,
+        products,
+        urn=urn,
+        mobile=mobile,
+        email=email,
+        enterprise_type=enterprise_type,
+        activity=activity,
+        social_category=social_category,
+        incorporation_date=incorporation_date,
+        commencement_date=commencement_date,
+        registration_date=registration_date,
+        address=address,
+        state=state,
+        pin=pin,
+        unit_names=unit_names,
+        nic_5_digit_codes=nic_5_digit_codes,
+        nic_activity=nic_activity,
+        source=source,
+    )
     with driver.session() as session:
-        props = {
-            "name": name,
-            "city": city,
-            "products": products,
-            "urn": urn,
-            "mobile": mobile,
-            "email": email,
-            "type": enterprise_type,
-            "activity": activity,
-            "social_category": social_category,
-            "incorporation_date": incorporation_date,
-            "commencement_date": commencement_date,
-            "registration_date": registration_date,
-            "address": _normalize_address(address),
-            "state": state,
-            "pin": pin,
-            "unit_names": _normalize_list(unit_names),
-            "nic_5_digit_codes": _normalize_list(nic_5_digit_codes),
-            "nic_activity": nic_activity,
-            "source": source,
-        }
         session.run(
-            """
-            MERGE (m:MSE {id: $id})
-            ON CREATE SET m.created_at = timestamp()
-            SET m += $props
-            MERGE (c:Category {code: $cat})
-            SET c.name = coalesce(c.name, $cat_name)
-            MERGE (m)-[:OFFERS]->(c)
-            """,
-            id=mse_id,
-            cat=category,
-            cat_name=category_name,
-            props=props,
+            _SAVE_MSE_QUERY,
+            rows=[{"id": mse_id, "cat": category, "cat_name": category_name, "props": props}],
+        )
+
+
+def _mse_row(record):
+    """
+    Turn one bulk-import record (save_mse() keyword names; 'id' accepted for
+    'mse_id') into an UNWIND row. Raises ValueError/TypeError on bad input.
+    """
+    fields = dict(record)
+    mse_id = fields.pop("mse_id", None) or fields.pop("id", None)
+    category = fields.pop("category", None)
+    category_name = fields.pop("category_name", None)
+    if not mse_id:
+        raise ValueError("missing mse_id")
+    if not category:
+        raise ValueError("missing category")
+    return {
+        "id": mse_id,
+        "cat": category,
+        "cat_name": category_name,
+        "props": _mse_props(**fields),
+    }
+
+
+def _write_rows(tx, query, rows):
+    tx.run(query, rows=rows).consume()
+
+
+def _iter_save_bulk(driver, records, to_row, query, batch_size, id_keys):
+    """
+    Shared batching loop for the *_bulk writers: validate each record with
+    `to_row`, then UNWIND `query` over one transaction per batch. Yields
+    (id, success, message) per record in input order as each batch commits.
+    """
+    outcomes, batch, pending = [], [], []
+
+    def _flush(session):
+        if batch:
+            try:
+                session.execute_write(_write_rows, query, batch)
+                outcome = (True, "saved")
+            except Exception as e:
+                outcome = (False, str(e))
+            for idx in pending:
+                outcomes[idx] = (outcomes[idx][0], *outcome)
+        done = list(outcomes)
+        outcomes.clear()
+        batch.clear()
+        pending.clear()
+        return done
+
+    with driver.session() as session:
+        for record in records:
+            record_id = next((record.get(k) for k in id_keys if record.get(k)), None)
+            try:
+                row = to_row(record)
+                pending.append(len(outcomes))
+                outcomes.append((record_id, False, "pending"))
+                batch.append(row)
+            except (TypeError, ValueError) as e:
+                outcomes.append((record_id, False, str(e)))
+            # Invalid records count too, so a run of them is not held in memory
+            if len(outcomes) >= batch_size:
+                yield from _flush(session)
+        yield from _flush(session)
+
+
+def _save_bulk(driver, records, to_row, query, batch_size, id_keys):
+    """_iter_save_bulk() collected into a list."""
+    return list(_iter_save_bulk(driver, records, to_row, query, batch_size, id_keys))
+
+
+def iter_save_mses_bulk(driver, records, batch_size=500):
+    """
+    save_mses_bulk() as a generator: yields (mse_id, success, message) per
+    record as each batch commits, so a caller can report outcomes without
+    holding one per record. Cached reads are retired when it finishes, fails
+    or is closed early.
+    """
+    try:
+        yield from _iter_save_bulk(
+            driver, records, _mse_row, _SAVE_MSE_QUERY, batch_size, ("mse_id", "id")
         )
+    finally:
+        query_cache.invalidate()
 
 
-def run_reasoning(driver, mse_id, city):
+def save_mses_bulk(driver, records, batch_size=500):
+    """
+    Save many MSEs with one UNWIND query and one transaction per batch.
+
+    `records` may be any iterable (including a generator streaming from disk)
+    of dicts using the save_mse() keyword names. It is consumed lazily, so only
+    one batch is held in memory at a time.
+
+    Returns a list of (mse_id, success: bool, message: str), one per record,
+    in input order. Records that fail validation are reported without being
+    sent; if a batch transaction fails, every record in it is reported failed.
+    Use iter_save_mses_bulk() to stream the outcomes instead.
+    """
+    return list(iter_save_mses_bulk(driver, records, batch_size))
+
+
+# Geo term for (s, m): distance decay over the point properties, falling back
+# to the old city-equality score when either node has no location (and to the
+# raw city on nodes not yet backfilled with city_norm).
+_GEO_EXPR = f"""
+    CASE
+        WHEN s.location IS NOT NULL AND m.location IS NOT NULL
+            THEN 0.1 + 0.9 * exp(-point.distance(s.location, m.location) / 1000.0 / {GEO_DECAY_KM})
+        WHEN coalesce(s.city_norm, toLower(trim(s.city)))
+           = coalesce(m.city_norm, toLower(trim(m.city))) THEN 1.0
+        ELSE 0.1
+    END
+"""
+
+# Candidate patterns: the radius variant seeks SNPs through the point index
+# before expanding to categories; the other scans every SNP serving them.
+_CANDIDATES_IN_RADIUS = """
+    MATCH (m:MSE {id: $mse})
+    MATCH (s:SNP)
+    WHERE point.distance(s.location, m.location) <= $radius
+    MATCH (m)-[:OFFERS]->(c:Category)<-[:SERVES]-(s)
+"""
+_CANDIDATES_ALL = """
+    MATCH (m:MSE {id: $mse})-[:OFFERS]->(c:Category)
+    MATCH (s:SNP)-[:SERVES]->(c)
+"""
+
+_REASONING_RETURN = f"""
+    WITH s, m, {_GEO_EXPR} AS geo
+    RETURN s.id AS snp_id,
+           s.name AS snp,
+           s.city AS location,
+           s.certifications AS certifications,
+           s.export_capable AS export_capable,
+           s.specialization AS specialization,
+           s.languages AS languages,
+           s.payment_terms AS payment_terms,
+           round((geo*0.6 + s.base_score)*100) AS score,
+           round(geo*100) AS geo_pct,
+           round(s.sla_score*100) AS sla_pct,
+           round(s.capacity_score*100) AS cap_pct,
+           s.cert_count AS cert_count
+    ORDER BY score DESC, snp_id ASC LIMIT $top_k
+"""
+
+
+def run_reasoning(driver, mse_id, city, top_k=3, local=False, radius_km=DEFAULT_RADIUS_KM):
     """
     Enhanced matching with SNP metadata consideration
     Now includes certifications, export capability, and specialization
+
+    Only the geo term is computed per match; SLA, capacity, focus and
+    certification terms come from the stored SNP profile (_SNP_PROFILE_UPDATE).
+    Candidates are limited to SNPs within `radius_km` of the MSE when it has
+    a location and at least `top_k` qualify; otherwise every SNP serving its
+    categories is ranked, where the geo term still puts same-city and nearby
+    SNPs first. Pass radius_km=None to always consider all.
+
+    local=True scores in-process with matching_engine (same weights and
+    result keys) and only reads the MSE's categories from Neo4j.
+    """
+    if local:
+        with driver.session() as session:
+            record = session.run(
+                """
+                MATCH (m:MSE {id: $mse})-[:OFFERS]->(c:Category)
+                RETURN m.city AS city, m.lat AS lat, m.lon AS lon, collect(c.code) AS codes
+                """,
+                mse=mse_id,
+            ).single()
+        if not record:
+            return []
+        location = (record["lat"], record["lon"]) if record["lat"] is not None else None
+        engine = matching_engine.get_engine(driver)
+        return engine.match(
+            record["codes"], record["city"], top_k=top_k,
+            location=location, radius_km=radius_km,
+        )
+
+    results = _reasoning_candidates(driver, mse_id, top_k, radius_km)
+    if any(r["score"] is None for r in results):
+        # SNPs written outside save_snp() (older seed scripts, graphs from
+        # before migration 4) have no stored profile yet. Null scores sort
+        # first, so backfill every missing profile and rank again.
+        refresh_snp_profiles(driver, missing_only=True)
+        results = _reasoning_candidates(driver, mse_id, top_k, radius_km)
+    return results
+
+
+def _reasoning_candidates(driver, mse_id, top_k, radius_km):
+    with driver.session() as session:
+        results = []
+        if radius_km:
+            results = list(
+                session.run(
+                    _CANDIDATES_IN_RADIUS + _REASONING_RETURN,
+                    mse=mse_id,
+                    radius=radius_km * 1000.0,
+                    top_k=top_k,
+                )
+            )
+        if len(results) < top_k:
+            results = list(
+                session.run(_CANDIDATES_ALL + _REASONING_RETURN, mse=mse_id, top_k=top_k)
+            )
+        return results
+
+
+@invalidates
+def backfill_city_norm(driver):
+    """Set the indexed `city_norm` on MSEs and SNPs saved before it existed."""
+    with driver.session() as session:
+        record = session.run(
+            """
+            MATCH (n)
+            WHERE (n:MSE OR n:SNP) AND n.city IS NOT NULL
+              AND (n.city_norm IS NULL OR n.city_norm <> toLower(trim(n.city)))
+            SET n.city_norm = toLower(trim(n.city))
+            RETURN count(n) AS updated
+            """
+        ).single()
+    return record["updated"]
+
+
+@invalidates
+def backfill_locations(driver, batch_size=1000):
+    """
+    Set lat/lon and the indexed `location` point on MSEs and SNPs saved before
+    geocoding existed, using stored lat/lon when present and the offline
+    PIN/city table otherwise. Returns the number of nodes updated.
+    """
+    with driver.session() as session:
+        pending = [
+            dict(row)
+            for row in session.run(
+                """
+                MATCH (n)
+                WHERE (n:MSE OR n:SNP) AND n.location IS NULL
+                RETURN elementId(n) AS eid, n.pin AS pin, n.city AS city,
+                       n.lat AS lat, n.lon AS lon
+                """
+            )
+        ]
+        rows = []
+        for row in pending:
+            if row["lat"] is not None and row["lon"] is not None:
+                coords = (row["lat"], row["lon"])
+            else:
+                coords = geocode(pin=row["pin"], city=row["city"])
+            if coords:
+                rows.append({"eid": row["eid"], "lat": coords[0], "lon": coords[1]})
+        for i in range(0, len(rows), batch_size):
+            session.execute_write(
+                _write_rows,
+                """
+                UNWIND $rows AS row
+                MATCH (n) WHERE elementId(n) = row.eid
+                SET n.lat = row.lat, n.lon = row.lon,
+                    n.location = point({latitude: row.lat, longitude: row.lon})
+                """,
+                rows[i:i + batch_size],
+            )
+    return len(rows)
+
+
+_SAVE_RECOMMENDATIONS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (m:MSE {id: row.id})
+    CALL (m) {
+        MATCH (m)-[r:RECOMMENDED]->(:SNP)
+        DELETE r
+    }
+    WITH m, row
+    UNWIND row.recs AS rec
+    MATCH (s:SNP {id: rec.snp_id})
+    CREATE (m)-[:RECOMMENDED {score: rec.score, rank: rec.rank, of: size(row.recs),
+                              computed_at: timestamp()}]->(s)
+"""
+
+
+def _best_per_snp(results):
+    """
+    One row per SNP, with its best score, best first. run_reasoning() and
+    matching_engine return a row per (SNP, category), so an SNP serving two
+    of an MSE's categories would otherwise take two ranks.
+    """
+    best = {}
+    for r in results:
+        kept = best.get(r["snp_id"])
+        if kept is None or (r["score"] or 0) > (kept["score"] or 0):
+            best[r["snp_id"]] = r
+    return sorted(best.values(), key=lambda r: -(r["score"] or 0))
+
+
+def save_recommendations(driver, recommendations, invalidate=True):
+    """
+    Replace cached (:MSE)-[:RECOMMENDED]->(:SNP) edges in one transaction.
+    `recommendations` maps mse_id → run_reasoning()-style result rows; they
+    are collapsed to one edge per SNP and ranked by score.
+    Each edge records how many were saved (`of`), so an MSE that later loses
+    one to a deleted SNP can be found and re-matched. Only cached
+    fetch_recommendations() reads are retired; batch callers pass
+    invalidate=False and retire them once when the run is done.
+    """
+    rows = [
+        {
+            "id": mse_id,
+            "recs": [
+                {"snp_id": r["snp_id"], "score": r["score"], "rank": rank}
+                for rank, r in enumerate(_best_per_snp(results), start=1)
+            ],
+        }
+        for mse_id, results in recommendations.items()
+    ]
+    if not rows:
+        return
+    with driver.session() as session:
+        session.execute_write(_write_rows, _SAVE_RECOMMENDATIONS_QUERY, rows)
+    if invalidate:
+        query_cache.invalidate("fetch_recommendations")
+
+
+@cached()
+def fetch_recommendations(driver, mse_id):
+    """
+    Read cached recommendations for an MSE in run_reasoning() result shape,
+    so render_reasoning_cards() can display them without re-scoring.
     """
     with driver.session() as session:
         return list(
             session.run(
                 """
-                MATCH (m:MSE {id: $mse})-[:OFFERS]->(c:Category)
-                MATCH (s:SNP)-[:SERVES]->(c)
-                WITH s, c, m,
-                     (CASE
-                        WHEN toLower(s.city) = toLower(m.city) THEN 1.0
-                        ELSE 0.1 END) AS geo,
-                     CASE
-                        WHEN s.export_capable = true AND (s.rating + 0.05) > 1.0 THEN 1.0
-                        WHEN s.export_capable = true THEN s.rating + 0.05
-                        ELSE s.rating
-                     END AS sla,
-                     CASE WHEN s.capacity > 150 THEN 0.9 ELSE 0.5 END AS capacity,
-                     size(coalesce(s.certifications, [])) * 0.02 AS cert_bonus
-                WITH s, c, m, geo, sla, capacity, cert_bonus,
-                     COUNT { (s)-[:SERVES]->(:Category) } AS total_cats
-                WITH s, c, m, geo, sla, capacity, cert_bonus,
-                     CASE WHEN total_cats > 0 THEN 1.0 / total_cats ELSE 1.0 END AS focus
+                MATCH (m:MSE {id: $mse})-[r:RECOMMENDED]->(s:SNP)
                 RETURN s.id AS snp_id,
                        s.name AS snp,
                        s.city AS location,
@@ -147,19 +510,20 @@ def run_reasoning(driver, mse_id, city):
                        s.specialization AS specialization,
                        s.languages AS languages,
                        s.payment_terms AS payment_terms,
-                       round((geo*0.6 + sla*0.15 + capacity*0.10 + focus*0.10 + cert_bonus*0.05)*100) AS score,
-                       round(geo*100) AS geo_pct,
-                       round(sla*100) AS sla_pct,
-                       round(capacity*100) AS cap_pct,
-                       size(coalesce(s.certifications, [])) AS cert_count
-                ORDER BY score DESC LIMIT 3
+                       r.score AS score,
+                       round((""" + _GEO_EXPR + """) * 100) AS geo_pct,
+                       round(s.sla_score*100) AS sla_pct,
+                       round(s.capacity_score*100) AS cap_pct,
+                       s.cert_count AS cert_count,
+                       r.computed_at AS computed_at
+                ORDER BY r.rank ASC
                 """,
                 mse=mse_id,
-                city=city,
             )
         )
 
 
+@cached()
 def fetch_stats(driver):
     """Fetch dashboard statistics"""
     with driver.session() as session:
@@ -177,6 +541,7 @@ def fetch_stats(driver):
         ).single()
 
 
+@cached()
 def fetch_recent_mses(driver, limit=None):
     """Fetch MSEs ordered newest-first (by created_at); no limit by default."""
     with driver.session() as session:
@@ -196,6 +561,96 @@ def fetch_recent_mses(driver, limit=None):
         return list(session.run(query, **params))
 
 
+# Keyset pages of the dashboard MSE table. The first page scans the
+# (created_at, id) index from the top; later pages seek to the cursor with a
+# plain range on created_at, which the planner can serve from the index (an
+# OR across both keys cannot), and break created_at ties on id.
+_MSES_PAGE_FIRST = "WHERE m.created_at IS NOT NULL"
+_MSES_PAGE_AFTER = """
+    WHERE m.created_at <= $cursor_ts
+      AND (m.created_at < $cursor_ts OR m.id < $cursor_id)
+"""
+_MSES_PAGE_BODY = """
+      AND ($city IS NULL OR trim(m.city) = $city)
+      AND ($category IS NULL
+           OR EXISTS { (m)-[:OFFERS]->(c:Category) WHERE trim(c.name) = $category })
+    WITH m ORDER BY m.created_at DESC, m.id DESC LIMIT $limit
+    OPTIONAL MATCH (m)-[:OFFERS]->(c:Category)
+    WITH m, head(collect(c)) AS c
+    RETURN m.id AS id,
+           m.name AS name,
+           m.city AS city,
+           m.products AS products,
+           c.code AS category_code,
+           c.name AS category_name,
+           m.created_at AS created_at
+    ORDER BY created_at DESC, id DESC
+"""
+
+
+@cached()
+def fetch_mses_page(driver, page_size=50, cursor=None, city=None, category_name=None):
+    """
+    One page of MSEs, newest first, using keyset pagination on
+    (created_at, id) so each page is an index-ordered range read no matter
+    how deep it is. Only the dashboard table's columns are projected.
+
+    `cursor` is the (created_at, id) pair returned with the previous page.
+    `city` and `category_name` match the trimmed values fetch_mse_counts()
+    lists. Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    cursor_ts, cursor_id = cursor if cursor else (None, None)
+    where = _MSES_PAGE_FIRST if cursor is None else _MSES_PAGE_AFTER
+    with driver.session() as session:
+        rows = list(
+            session.run(
+                "MATCH (m:MSE)\n" + where + _MSES_PAGE_BODY,
+                cursor_ts=cursor_ts,
+                cursor_id=cursor_id,
+                city=city,
+                category=category_name,
+                limit=page_size + 1,
+            )
+        )
+    rows = [dict(r) for r in rows]
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+@cached()
+def fetch_mse_counts(driver):
+    """MSE totals by city and by category for the dashboard insight panels and filters."""
+    with driver.session() as session:
+        total = session.run("MATCH (m:MSE) RETURN count(m) AS n").single()["n"]
+        by_city = [
+            (row["city"], row["n"])
+            for row in session.run(
+                """
+                MATCH (m:MSE)
+                WHERE m.city IS NOT NULL AND trim(m.city) <> ''
+                RETURN trim(m.city) AS city, count(m) AS n
+                ORDER BY n DESC, city ASC
+                """
+            )
+        ]
+        by_category = [
+            (row["name"], row["n"])
+            for row in session.run(
+                """
+                MATCH (m:MSE)-[:OFFERS]->(c:Category)
+                WHERE c.name IS NOT NULL AND trim(c.name) <> ''
+                RETURN trim(c.name) AS name, count(DISTINCT m) AS n
+                ORDER BY n DESC, name ASC
+                """
+            )
+        ]
+    return {"total": total, "by_city": by_city, "by_category": by_category}
+
+
+@cached()
 def fetch_mse_by_id(driver, mse_id):
     """Fetch single MSE by ID with all details"""
     with driver.session() as session:
@@ -216,6 +671,7 @@ def fetch_mse_by_id(driver, mse_id):
         return props
 
 
+@cached()
 def fetch_snps(driver, limit=None):
     """
     Fetch SNPs with basic information (for backward compatibility)
@@ -235,6 +691,7 @@ def fetch_snps(driver, limit=None):
         return list(result)
 
 
+@cached()
 def fetch_snps_detailed(driver, limit=None):
     """
     NEW: Fetch SNPs with complete metadata including:
@@ -272,6 +729,7 @@ def fetch_snps_detailed(driver, limit=None):
         return list(result)
 
 
+@cached()
 def fetch_categories(driver, limit=None):
     """Fetch categories with basic information"""
     with driver.session() as session:
@@ -288,6 +746,7 @@ def fetch_categories(driver, limit=None):
         return list(result)
 
 
+@cached()
 def fetch_categories_detailed(driver, limit=None):
     """
     NEW: Fetch categories with ONDC mapping and SNP count
@@ -315,20 +774,31 @@ def fetch_categories_detailed(driver, limit=None):
         return list(result)
 
 
+_CITIES_QUERY = """
+    MATCH (n)
+    WHERE n.city IS NOT NULL
+    RETURN DISTINCT n.city AS city
+    ORDER BY city ASC
+"""
+
+
+@cached()
 def fetch_cities(driver):
     """Fetch all unique cities from SNPs and MSEs"""
     with driver.session() as session:
-        rows = session.run(
-            """
-            MATCH (n)
-            WHERE n.city IS NOT NULL
-            RETURN DISTINCT n.city AS city
-            ORDER BY city ASC
-            """
-        )
+        rows = session.run(_CITIES_QUERY)
         return [row["city"] for row in rows]
 
 
+@cached()
+async def afetch_cities(driver):
+    """fetch_cities() on a neo4j AsyncDriver."""
+    async with driver.session() as session:
+        result = await session.run(_CITIES_QUERY)
+        return [row["city"] async for row in result]
+
+
+@cached()
 def fetch_snp_by_id(driver, snp_id):
     """Fetch a single SNP with all metadata and its category codes"""
     with driver.session() as session:
@@ -348,6 +818,106 @@ def fetch_snp_by_id(driver, snp_id):
         return props
 
 
+def _snp_props(
+    name,
+    city,
+    rating,
+    capacity,
+    lat=None,
+    lon=None,
+    certifications=None,
+    export_capable=False,
+    languages=None,
+    payment_terms=None,
+    specialization=None,
+):
+    """Build the SNP property map shared by save_snp() and save_snps_bulk()."""
+    if lat is None or lon is None:
+        lat, lon = geocode(city=city) or (None, None)
+    return {
+        "name": name,
+        "city": city,
+        "rating": rating,
+        "capacity": capacity,
+        "lat": lat,
+        "lon": lon,
+        "certifications": certifications or [],
+        "export_capable": export_capable,
+        "languages": languages or [],
+        "payment_terms": payment_terms,
+        "specialization": specialization,
+    }
+
+
+# Precomputed per-SNP scoring profile used by run_reasoning(). Everything in
+# the match score except the MSE-dependent geo term lives here, so matching is
+# a lookup of stored properties instead of per-row aggregation. Expects `s`
+# to be bound; kept current by save_snp(), save_snps_bulk() and
+# delete_category(), and backfilled by refresh_snp_profiles().
+_SNP_PROFILE_UPDATE = """
+    WITH s, COUNT { (s)-[:SERVES]->(:Category) } AS serves_count
+    WITH s, serves_count, coalesce(s.rating, 0.0) AS rating
+    WITH s, serves_count,
+         CASE
+            WHEN s.export_capable = true AND (rating + 0.05) > 1.0 THEN 1.0
+            WHEN s.export_capable = true THEN rating + 0.05
+            ELSE rating
+         END AS sla,
+         CASE WHEN s.capacity > 150 THEN 0.9 ELSE 0.5 END AS capacity,
+         CASE WHEN serves_count > 0 THEN 1.0 / serves_count ELSE 1.0 END AS focus,
+         size(coalesce(s.certifications, [])) AS cert_count
+    SET s.serves_count   = serves_count,
+        s.cert_count     = cert_count,
+        s.sla_score      = sla,
+        s.capacity_score = capacity,
+        s.focus_score    = focus,
+        s.base_score     = sla*0.15 + capacity*0.10 + focus*0.10 + cert_count*0.02*0.05
+"""
+
+# Properties and SERVES edges are written in one statement (one transaction),
+# and only the edges that actually changed are touched, so the SNP never
+# appears without its categories to concurrent readers such as run_reasoning.
+_SAVE_SNP_QUERY = """
+    UNWIND $rows AS row
+    MERGE (s:SNP {id: row.id})
+    SET s += row.props,
+        s.updated_at = timestamp(),
+        s.city_norm = toLower(trim(row.props.city)),
+        s.location = CASE WHEN row.props.lat IS NULL THEN null
+                          ELSE point({latitude: row.props.lat, longitude: row.props.lon}) END
+    WITH s, row
+    CALL (s, row) {
+        MATCH (s)-[r:SERVES]->(old:Category)
+        WHERE NOT old.code IN row.codes
+        DELETE r
+    }
+    CALL (s, row) {
+        UNWIND row.codes AS code
+        MATCH (c:Category {code: code})
+        MERGE (s)-[:SERVES]->(c)
+    }
+""" + _SNP_PROFILE_UPDATE
+
+
+@invalidates
+def refresh_snp_profiles(driver, snp_ids=None, missing_only=False):
+    """
+    Recompute stored scoring profiles for the given SNPs (all if None);
+    missing_only=True limits it to SNPs that have no profile yet.
+    """
+    with driver.session() as session:
+        session.run(
+            """
+            MATCH (s:SNP)
+            WHERE ($ids IS NULL OR s.id IN $ids)
+              AND (NOT $missing_only OR s.base_score IS NULL)
+            """ + _SNP_PROFILE_UPDATE,
+            ids=snp_ids,
+            missing_only=missing_only,
+        )
+
+
+@invalidates
 def save_snp(
     driver,
     snp_id,
@@ -365,54 +935,66 @@ def save_snp(
     category_codes=None,
 ):
     """Create or update an SNP node and rebuild its SERVES relationships"""
-    with driver.session() as session:
-        session.run(
-            """
-            MERGE (s:SNP {id: $id})
-            SET s.name           = $name,
-                s.city           = $city,
-                s.rating         = $rating,
-                s.capacity       = $capacity,
-                s.lat            = $lat,
-                s.lon            = $lon,
-                s.certifications = $certifications,
-                s.export_capable = $export_capable,
-                s.languages      = $languages,
-                s.payment_terms  = $payment_terms,
-                s.specialization = $specialization
-            """,
-            id=snp_id,
-            name=name,
-            city=city,
-            rating=rating,
-            capacity=capacity,
+    row = {
+        "id": snp_id,
+        "codes": list(category_codes or []),
+        "props": _snp_props(
+            name,
+            city,
+            rating,
+            capacity,
             lat=lat,
             lon=lon,
-            certifications=certifications or [],
+            certifications=certifications,
             export_capable=export_capable,
-            languages=languages or [],
+            languages=languages,
             payment_terms=payment_terms,
             specialization=specialization,
-        )
-        # Replace SERVES relationships atomically
-        session.run("MATCH (s:SNP {id: $id})-[r:SERVES]->() DELETE r", id=snp_id)
-        for code in (category_codes or []):
-            session.run(
-                """
-                MATCH (s:SNP {id: $id}), (c:Category {code: $code})
-                MERGE (s)-[:SERVES]->(c)
-                """,
-                id=snp_id,
-                code=code,
-            )
+        ),
+    }
+    with driver.session() as session:
+        session.execute_write(_write_rows, _SAVE_SNP_QUERY, [row])
+    matching_engine.notify_snps_changed(driver, [snp_id])
 
 
+def _snp_row(record):
+    """
+    Turn one bulk record (save_snp() keyword names; 'id' accepted for 'snp_id'
+    and 'categories' for 'category_codes') into an UNWIND row.
+    """
+    fields = dict(record)
+    snp_id = fields.pop("snp_id", None) or fields.pop("id", None)
+    codes = fields.pop("category_codes", None) or fields.pop("categories", None) or []
+    if not snp_id:
+        raise ValueError("missing snp_id")
+    return {"id": snp_id, "codes": list(codes), "props": _snp_props(**fields)}
+
+
+@invalidates
+def save_snps_bulk(driver, records, batch_size=200):
+    """
+    Save many SNPs (properties + SERVES diff) with one transaction per batch.
+    Accepts the same record shape as the seed scripts. Returns a list of
+    (snp_id, success: bool, message: str) in input order.
+    """
+    results = _save_bulk(
+        driver, records, _snp_row, _SAVE_SNP_QUERY, batch_size, ("snp_id", "id")
+    )
+    saved = [snp_id for snp_id, ok, _ in results if ok]
+    if saved:
+        matching_engine.notify_snps_changed(driver, saved)
+    return results
+
+
+@invalidates
 def delete_snp(driver, snp_id):
     """Delete an SNP and all its relationships"""
     with driver.session() as session:
         session.run("MATCH (s:SNP {id: $id}) DETACH DELETE s", id=snp_id)
+    matching_engine.notify_snp_deleted(snp_id)
 
 
+@cached()
 def fetch_category_by_id(driver, code):
     """Fetch a single Category by code"""
     with driver.session() as session:
@@ -425,6 +1007,7 @@ def fetch_category_by_id(driver, code):
         return dict(record["props"])
 
 
+@invalidates
 def save_category(driver, code, name, sector, keywords=None,
                   ondc_l1=None, ondc_l2=None, ondc_l3=None):
     """Create or update a Category node"""
@@ -447,8 +1030,10 @@ def save_category(driver, code, name, sector, keywords=None,
             ondc_l2=ondc_l2,
             ondc_l3=ondc_l3,
         )
+    categorization.invalidate_categories()
 
 
+@invalidates
 def delete_category(driver, code):
     """
     Delete a Category if no MSEs currently offer it.
@@ -465,10 +1050,24 @@ def delete_category(driver, code):
         mse_count = row["mse_count"] if row else 0
         if mse_count > 0:
             return False, f"Cannot delete — {mse_count} MSE(s) currently offer this category."
-        session.run("MATCH (c:Category {code: $code}) DETACH DELETE c", code=code)
-        return True, "Category deleted successfully."
+        # SNPs that served this category lose an edge; refresh their profiles
+        session.run(
+            """
+            MATCH (c:Category {code: $code})
+            OPTIONAL MATCH (c)<-[:SERVES]-(served:SNP)
+            WITH c, collect(served) AS snps
+            DETACH DELETE c
+            WITH snps
+            UNWIND snps AS s
+            """ + _SNP_PROFILE_UPDATE,
+            code=code,
+        )
+    matching_engine.notify_categories_changed()
+    categorization.invalidate_categories()
+    return True, "Category deleted successfully."
 
 
+@cached()
 def fetch_analytics_summary(driver):
     """
     NEW: Comprehensive analytics for dashboard
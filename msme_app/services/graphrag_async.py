@@ -0,0 +1,217 @@
+"""
+Asyncio GraphRAG front end, so one process can serve many concurrent chat
+users without a blocked thread per request.
+
+The stages themselves (templates, question cache, validation, sandboxed
+execution, local/cached/LLM answer, follow-ups) are graphrag_service's single
+pipeline, run by aask_stream() on the neo4j AsyncDriver and the async LLM
+gateway. AsyncGraphRAG adds:
+  - bounded concurrency: at most `max_concurrency` pipelines run at once;
+  - backpressure: beyond `max_pending` admitted requests, new ones fail fast
+    with Overloaded instead of queueing without limit;
+  - coalescing: concurrent ask() / ask_stream() calls for the same
+    (normalized) question share one in-flight pipeline, and a caller that
+    joins late replays the events it missed.
+
+BackgroundGraphRAG runs it on a private event-loop thread for synchronous
+callers (the Streamlit page, utils/graphrag_server.py).
+"""
+import asyncio
+import contextlib
+import queue
+import threading
+
+import neo4j
+
+from msme_app.services import graphrag_service
+from msme_app.services.cypher_cache import normalize
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_PENDING = 64
+
+
+class Overloaded(RuntimeError):
+    """Too many requests admitted already; the caller should retry later."""
+
+
+class _SharedRun:
+    """The events of one in-flight pipeline run, replayed to every subscriber."""
+
+    def __init__(self):
+        self.events = []
+        self.error = None  # set if the run failed before finishing (e.g. Overloaded)
+        self.finished = False
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event):
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def finish(self, error=None):
+        async with self._changed:
+            self.error = error
+            self.finished = True
+            self._changed.notify_all()
+
+    async def subscribe(self):
+        seen = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.finished or seen < len(self.events))
+                new = self.events[seen:]
+                finished = self.finished
+            seen += len(new)
+            for event in new:
+                yield event
+            if finished and seen == len(self.events):
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class AsyncGraphRAG:
+    def __init__(self, driver, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_pending=DEFAULT_MAX_PENDING):
+        self.driver = driver  # neo4j.AsyncDriver
+        self.max_pending = max_pending
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._pending = 0
+        self._running = 0
+        self._inflight = {}  # normalized question -> _SharedRun
+        self._stats = {"requests": 0, "completed": 0, "coalesced": 0, "rejected": 0}
+
+    def stats(self):
+        return {
+            **self._stats,
+            "pending": self._pending,
+            "running": self._running,
+            "in_flight_questions": len(self._inflight),
+        }
+
+    # ── admission control ────────────────────────────────────────────────────
+    @contextlib.asynccontextmanager
+    async def _admit(self):
+        if self._pending >= self.max_pending:
+            self._stats["rejected"] += 1
+            raise Overloaded(f"{self._pending} requests already pending; try again shortly.")
+        self._pending += 1
+        self._stats["requests"] += 1
+        try:
+            async with self._sem:
+                self._running += 1
+                try:
+                    yield
+                finally:
+                    self._running -= 1
+        finally:
+            self._pending -= 1
+
+    async def _events(self, question, previous=None):
+        async with self._admit():
+            async for event in graphrag_service.aask_stream(self.driver, question, previous):
+                if event["stage"] == "done":
+                    self._stats["completed"] += 1
+                yield event
+
+    # ── coalescing ───────────────────────────────────────────────────────────
+    async def _produce(self, key, run, question):
+        try:
+            async for event in self._events(question):
+                await run.publish(event)
+            await run.finish()
+        except Exception as e:
+            await run.finish(e)
+        finally:
+            if self._inflight.get(key) is run:
+                del self._inflight[key]
+
+    def _shared_run(self, question):
+        key = normalize(question)
+        run = self._inflight.get(key)
+        if run is None:
+            run = self._inflight[key] = _SharedRun()
+            # A task of its own: one subscriber giving up must not stop it for the others
+            asyncio.ensure_future(self._produce(key, run, question))
+        else:
+            self._stats["coalesced"] += 1
+        return run
+
+    async def ask_stream(self, question: str, previous: list | None = None):
+        """Async generator of the same stage events as graphrag_service.ask_stream()."""
+        if previous:
+            # Follow-ups depend on the caller's own previous rows; never shared
+            async for event in self._events(question, previous):
+                yield event
+            return
+        async for event in self._shared_run(question).subscribe():
+            if event["stage"] == "done":
+                event = {**event, "result": dict(event["result"])}
+            yield event
+
+    async def ask(self, question: str, previous: list | None = None) -> dict:
+        """Same result dict as graphrag_service.ask(); identical in-flight questions share one run."""
+        async for event in self.ask_stream(question, previous):
+            if event["stage"] == "done":
+                return event["result"]
+
+    async def close(self):
+        await self.driver.close()
+
+
+class BackgroundGraphRAG:
+    """An AsyncGraphRAG on its own event-loop thread, callable from synchronous code."""
+
+    def __init__(self, config, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_pending=DEFAULT_MAX_PENDING):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="graphrag-async", daemon=True
+        )
+        self._thread.start()
+
+        async def _create():
+            driver = neo4j.AsyncGraphDatabase.driver(
+                config["NEO4J_URI"], auth=(config["NEO4J_USER"], config["NEO4J_PASSWORD"])
+            )
+            return AsyncGraphRAG(driver, max_concurrency, max_pending)
+
+        self.rag = self._call(_create())
+
+    def _call(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def ask(self, question: str, previous=None, timeout=None) -> dict:
+        return self._call(self.rag.ask(question, previous), timeout)
+
+    def ask_stream(self, question: str, previous=None):
+        """
+        Blocking generator over the async pipeline's stage events. Only the
+        caller's own thread waits; the pipeline runs on the event loop.
+        """
+        events = queue.Queue()
+
+        async def _pump():
+            try:
+                async for event in self.rag.ask_stream(question, previous):
+                    events.put(event)
+            except Exception as e:  # Overloaded, or a bug — re-raised in the caller
+                events.put(e)
+            finally:
+                events.put(None)
+
+        asyncio.run_coroutine_threadsafe(_pump(), self._loop)
+        while (item := events.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def stats(self):
+        async def _stats():
+            return self.rag.stats()
+
+        return self._call(_stats())
+
+    def close(self):
+        self._call(self.rag.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
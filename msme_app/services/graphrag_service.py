@@ -2,36 +2,42 @@
 GraphRAG Service — Natural Language → Cypher → Neo4j → Grounded Answer
 Zero hallucination: every answer is derived exclusively from live DB results.
 """
-import os
+import asyncio
 import re
+import time
 
-import openai
-from openai import OpenAI
+import neo4j
 
-_client: OpenAI | None = None
-
-
-def _get_client() -> OpenAI:
-    """Return a cached OpenAI client using the key set by load_config() or the env var."""
-    global _client
-    if _client is None:
-        api_key = openai.api_key or os.getenv("OPENAI_API_KEY")
-        _client = OpenAI(api_key=api_key)
-    return _client
+from msme_app.services import (
+    answer_cache,
+    answer_formatter,
+    categorization,
+    cypher_templates,
+    cypher_validator,
+    followups,
+    llm_gateway,
+    result_compactor,
+)
+from msme_app.services.cypher_cache import get_cache as get_cypher_cache
+from msme_app.services.graph_service import afetch_cities, fetch_cities
 
 # ── Graph schema description fed to the LLM ─────────────────────────────────
 _SCHEMA = """
 NODE: MSE (Micro/Small Enterprise)
-  id, name, city, products (list), urn, mobile, email,
+  id, name, city, city_norm (lower-cased, trimmed city), products (list), urn, mobile, email,
   type (enterprise type e.g. Proprietorship), activity, social_category,
-  state, pin, unit_names (list), nic_5_digit_codes (list), nic_activity, source
+  state, pin, address, unit_names (list), nic_5_digit_codes (list), nic_activity, source,
+  incorporation_date, commencement_date, registration_date,
+  lat, lon, location (point from lat/lon), created_at (epoch ms)
 
 NODE: SNP (Seller Network Participant — ONDC-registered service provider)
-  id, name, city,
+  id, name, city, city_norm (lower-cased, trimmed city),
   rating (Float 0.0–1.0; 0.92 = 92%), capacity (Integer monthly units),
   export_capable (Boolean), certifications (list e.g. ["ISO9001","BIS"]),
   languages (list of codes e.g. ["en","hi","ta"]),
-  payment_terms (e.g. "Net 30"), specialization, lat, lon
+  payment_terms (e.g. "Net 30"), specialization, lat, lon, location (point from lat/lon),
+  updated_at (epoch ms), serves_count, cert_count,
+  sla_score, capacity_score, focus_score, base_score (precomputed match score parts)
 
 NODE: Category (ONDC product/service taxonomy)
   code (e.g. "TX001"), name (e.g. "Textiles & Fabrics"),
@@ -41,8 +47,11 @@ NODE: Category (ONDC product/service taxonomy)
 RELATIONSHIPS:
   (MSE)-[:OFFERS]->(Category)  — MSE's products belong to this category
   (SNP)-[:SERVES]->(Category)  — SNP can serve MSEs in this category
+  (MSE)-[:RECOMMENDED]->(SNP)  — cached match, properties score, rank, of, computed_at
 """
 
+_SCHEMA_INFO = cypher_validator.parse_schema(_SCHEMA)
+
 _CYPHER_SYSTEM = f"""You are a Neo4j Cypher expert for Udyam Mitra, an AI platform that \
 connects Indian MSEs with SNPs on the ONDC network.
 
@@ -50,7 +59,8 @@ connects Indian MSEs with SNPs on the ONDC network.
 
 Rules (follow strictly):
 1. Output ONLY a valid Cypher query — no markdown fences, no explanation, no comments.
-2. Use toLower() for all string comparisons.
+2. Use toLower() for all string comparisons. For city equality filters use the indexed
+   city_norm property instead: WHERE s.city_norm = 'mumbai' (value lower-cased).
 3. Use OPTIONAL MATCH when joining nodes that may not exist.
 4. Limit results to 25 rows unless the user specifies otherwise.
 5. Multiply rating by 100 when displaying as a percentage.
@@ -132,104 +142,536 @@ def _clean_cypher(text: str) -> str:
     return text.strip()
 
 
+def _cypher_messages(question: str) -> list:
+    return [
+        {"role": "system", "content": _CYPHER_SYSTEM},
+        {"role": "user", "content": f"Question: {question}"},
+    ]
+
+
+def _fix_messages(cypher: str, error: str, question: str) -> list:
+    return _cypher_messages(question) + [
+        {"role": "assistant", "content": cypher},
+        {
+            "role": "user",
+            "content": (
+                f"The query failed with this error:\n{error}\n\n"
+                "Fix the Cypher query. Output ONLY the corrected query."
+            ),
+        },
+    ]
+
+
+_CYPHER_PARAMS = {"temperature": 0, "max_tokens": 600}
+_ANSWER_PARAMS = {"temperature": 0.1, "max_tokens": 700}
+
+
 def generate_cypher(question: str) -> str:
     """Convert a natural language question into a Neo4j Cypher query."""
-    response = _get_client().chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": _CYPHER_SYSTEM},
-            {"role": "user", "content": f"Question: {question}"},
-        ],
-        temperature=0,
-        max_tokens=600,
-    )
-    return _clean_cypher(response.choices[0].message.content)
+    text = llm_gateway.chat("graphrag.cypher", _cypher_messages(question), **_CYPHER_PARAMS)
+    return _clean_cypher(text)
 
 
 def fix_cypher(cypher: str, error: str, question: str) -> str:
     """Ask the LLM to self-correct a failed Cypher query."""
-    response = _get_client().chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": _CYPHER_SYSTEM},
-            {"role": "user", "content": f"Question: {question}"},
-            {"role": "assistant", "content": cypher},
-            {
-                "role": "user",
-                "content": (
-                    f"The query failed with this error:\n{error}\n\n"
-                    "Fix the Cypher query. Output ONLY the corrected query."
-                ),
-            },
-        ],
-        temperature=0,
-        max_tokens=600,
+    text = llm_gateway.chat(
+        "graphrag.fix", _fix_messages(cypher, error, question), **_CYPHER_PARAMS
     )
-    return _clean_cypher(response.choices[0].message.content)
+    return _clean_cypher(text)
+
+
+# ── Execution sandbox for generated Cypher ──────────────────────────────────
+QUERY_TIMEOUT_S = 10.0
+MAX_ROWS = 500
+# A CartesianProduct the planner expects to produce more rows than this is
+# treated as unbounded (e.g. MATCH (m:MSE), (s:SNP) with no join predicate).
+MAX_CARTESIAN_ROWS = 10_000
+
+
+class CypherRejected(ValueError):
+    """Generated Cypher refused by the sandbox; the message is fed to fix_cypher()."""
+
+
+def _plan_operators(plan):
+    if not plan:
+        return
+    yield plan
+    for child in plan.get("children") or []:
+        yield from _plan_operators(child)
+
+
+def _explain_query(cypher: str) -> neo4j.Query:
+    return neo4j.Query(f"EXPLAIN {cypher}", timeout=QUERY_TIMEOUT_S)
+
 
+def _reject_plan(summary):
+    """Raise CypherRejected for an EXPLAIN summary of a write or an unbounded cartesian product."""
+    if summary.query_type != "r":
+        raise CypherRejected(
+            f"Query rejected: it is not read-only (query type '{summary.query_type}'). "
+            "Only MATCH / OPTIONAL MATCH / WITH / RETURN read queries are allowed — "
+            "remove CREATE, MERGE, SET, DELETE, REMOVE and schema commands."
+        )
+    for op in _plan_operators(summary.plan):
+        if op.get("operatorType", "").startswith("CartesianProduct"):
+            estimated = (op.get("args") or {}).get("EstimatedRows") or 0
+            if estimated > MAX_CARTESIAN_ROWS:
+                raise CypherRejected(
+                    f"Query rejected: it builds a cartesian product of ~{int(estimated):,} rows "
+                    "between disconnected MATCH patterns. Connect the patterns through a "
+                    "relationship (e.g. OFFERS / SERVES) or a WHERE join condition."
+                )
 
-def execute_cypher(driver, cypher: str) -> list:
-    """Run a Cypher query and return results as a list of dicts."""
-    with driver.session() as session:
-        result = session.run(cypher)
-        return [dict(record) for record in result]
 
+def _check_plan(session, cypher: str, params: dict):
+    """EXPLAIN the query (plans it, runs nothing) and reject writes and unbounded cartesian products."""
+    _reject_plan(session.run(_explain_query(cypher), params).consume())
 
-def format_answer(question: str, results: list) -> str:
+
+def run_sandboxed(driver, cypher: str, params: dict | None = None, check: bool = True):
+    """
+    Run generated Cypher in a read-access session with a transaction timeout,
+    streaming at most MAX_ROWS records. With `check`, the query is EXPLAINed
+    first (see _check_plan). Returns (rows as dicts, truncated flag); raises
+    CypherRejected or the driver's error (including a timeout) on failure.
+    """
+    params = params or {}
+    with driver.session(default_access_mode=neo4j.READ_ACCESS) as session:
+        if check:
+            _check_plan(session, cypher, params)
+        result = session.run(neo4j.Query(cypher, timeout=QUERY_TIMEOUT_S), params)
+        rows = []
+        for record in result:
+            if len(rows) == MAX_ROWS:
+                return rows, True
+            rows.append(dict(record))
+        return rows, False
+
+
+async def arun_sandboxed(driver, cypher: str, params: dict | None = None, check: bool = True):
+    """run_sandboxed() on a neo4j AsyncDriver."""
+    params = params or {}
+    async with driver.session(default_access_mode=neo4j.READ_ACCESS) as session:
+        if check:
+            _reject_plan(await (await session.run(_explain_query(cypher), params)).consume())
+        result = await session.run(neo4j.Query(cypher, timeout=QUERY_TIMEOUT_S), params)
+        rows = []
+        async for record in result:
+            if len(rows) == MAX_ROWS:
+                return rows, True
+            rows.append(dict(record))
+        return rows, False
+
+
+def execute_cypher(driver, cypher: str, params: dict | None = None) -> list:
+    """Run a Cypher query in the sandbox and return results as a list of dicts."""
+    return run_sandboxed(driver, cypher, params)[0]
+
+
+def _answer_messages(question: str, results: list, compact: bool = True) -> list:
+    raw_text = str(results[:25]) if results else "[]"
+    if compact:
+        results_text = result_compactor.compact(results)
+        result_compactor.record(raw_text, results_text)
+    else:
+        results_text = raw_text
+    return [
+        {"role": "system", "content": _ANSWER_SYSTEM},
+        {
+            "role": "user",
+            "content": (
+                f"Question: {question}\n\n"
+                f"Database results{' (pipe-separated table, first line is the header)' if compact else ''}:\n"
+                f"{results_text}\n\n"
+                "Provide a helpful, factual answer based strictly on these results."
+            ),
+        },
+    ]
+
+
+def format_answer(question: str, results: list, compact: bool = True) -> str:
     """Turn raw DB results into a grounded natural-language answer."""
-    results_text = str(results[:25]) if results else "[]"
-    response = _get_client().chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": _ANSWER_SYSTEM},
-            {
-                "role": "user",
-                "content": (
-                    f"Question: {question}\n\n"
-                    f"Database results:\n{results_text}\n\n"
-                    "Provide a helpful, factual answer based strictly on these results."
-                ),
-            },
-        ],
-        temperature=0.1,
-        max_tokens=700,
+    return llm_gateway.chat(
+        "graphrag.answer", _answer_messages(question, results, compact), **_ANSWER_PARAMS
+    ).strip()
+
+
+def format_answer_stream(question: str, results: list):
+    """Like format_answer(), but yields answer text chunks as the model produces them."""
+    yield from llm_gateway.chat_stream(
+        "graphrag.answer", _answer_messages(question, results), **_ANSWER_PARAMS
     )
-    return response.choices[0].message.content.strip()
 
 
-def ask(driver, question: str) -> dict:
-    """
-    Full GraphRAG pipeline with one self-correction attempt:
-      1. NL  → Cypher   (GPT-4o-mini, temp=0)
-      2. Cypher → Neo4j execution
-      2b. On failure: fix Cypher and retry once
-      3. Results → grounded natural-language answer (GPT-4o-mini, temp=0.1)
+_FALLBACK_ANSWER = (
+    "I'm sorry, I wasn't able to find an answer for that. "
+    "Could you try rephrasing your question? You can ask me about registered enterprises, "
+    "service providers, product categories, cities, ratings, or export readiness."
+)
 
-    Returns dict with keys: answer, cypher, results, error
-    """
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _followup_result(answer, results, operation, timings, local):
+    return {
+        "answer": answer,
+        "cypher": None,
+        "results": results,
+        "error": None,
+        "timings": timings,
+        "cypher_cache": None,
+        "template": None,
+        "answer_cache": False,
+        "local_answer": local,
+        "truncated": False,
+        "validation": None,
+        "followup": operation,
+    }
+
+
+def _vocabulary(snap):
+    """Category vocabulary for cypher_templates, cached on the category snapshot."""
+    if snap.vocabulary is None:
+        snap.vocabulary = cypher_templates.category_vocabulary(snap.categories)
+    return snap.vocabulary
+
+
+# ── Pipeline ─────────────────────────────────────────────────────────────────
+# _pipeline() is the question → answer flow, written once and free of I/O: it
+# yields stage events (dicts) and I/O requests (tuples), and is sent each
+# request's result or thrown its exception. ask_stream() performs the requests
+# with the sync driver and llm_gateway.chat*(); aask_stream() with a neo4j
+# AsyncDriver and llm_gateway.achat*(), so no thread waits on either.
+#   ("cities",)                         → fetch_cities()
+#   ("vocabulary",)                     → _vocabulary() of the category snapshot
+#   ("chat", site, messages, params)    → completion text
+#   ("stream", site, messages, params)  → "token" events, then the joined text
+#   ("run", cypher, params, check)      → run_sandboxed()'s (rows, truncated)
+#   ("cache_put", question, cypher)     → cypher cache put() (rewrites its file)
+#   ("cache_discard", question)         → cypher cache discard()
+
+
+def _followup_events(question: str, followup: dict, started: float):
+    """Events for a follow-up resolved over the previous rows: no Cypher, no DB."""
+    timings = {"llm_answer_ms": 0.0}
+    yield {"stage": "rows", "results": followup["results"]}
+    t = time.perf_counter()
+    answer = followup["answer"]
+    if answer is not None:
+        yield {"stage": "token", "text": answer}
+    else:
+        answer = yield (
+            "stream", "graphrag.answer", _answer_messages(question, followup["results"]),
+            _ANSWER_PARAMS,
+        )
+        answer = answer.strip()
+    timings["llm_answer_ms"] = _ms(t)
+    timings["total_ms"] = _ms(started)
+    yield {
+        "stage": "done",
+        "result": _followup_result(
+            answer, followup["results"], followup["operation"], timings,
+            followup["answer"] is not None,
+        ),
+    }
+
+
+def _pipeline(question: str, previous: list | None = None):
+    """The stages of ask_stream() as events and I/O requests (see above)."""
+    started = time.perf_counter()
+    followup = followups.resolve(question, previous) if previous else None
+    if followup:
+        yield from _followup_events(question, followup, started)
+        return
+
+    timings = {
+        "llm_cypher_ms": 0.0, "validate_ms": 0.0, "db_ms": 0.0, "fix_retry_ms": 0.0,
+        "llm_answer_ms": 0.0,
+    }
     cypher = None
+    cache = get_cypher_cache()
+    cache_info = None
+    template = None
+    params = None
+    cached_answer = False
+    local_answer = False
+    truncated = False
+    validation = None
     try:
-        cypher = generate_cypher(question)
+        # Common intents: fixed Cypher + slots, no LLM round-trip
+        results = None
+        t = time.perf_counter()
+        cities = yield ("cities",)
+        vocabulary = yield ("vocabulary",)
+        matched = cypher_templates.classify(question, cities=cities, vocabulary=vocabulary)
+        if matched:
+            cypher = matched["cypher"]
+            timings["llm_cypher_ms"] = _ms(t)
+            yield {"stage": "cypher", "cypher": cypher}
+            t = time.perf_counter()
+            try:
+                # Trusted, read-only text: skip the EXPLAIN round-trip. No rows
+                # is an answer too: the answer LLM explains it (no re-generation).
+                results, truncated = yield ("run", cypher, matched["params"], False)
+                template, params = matched["intent"], matched["params"]
+            except Exception:
+                results = None  # fall through to the LLM path
+            timings["db_ms"] = _ms(t)
 
-        try:
-            results = execute_cypher(driver, cypher)
-        except Exception as exec_err:
-            # Self-correction: ask LLM to fix the broken query
-            fixed = fix_cypher(cypher, str(exec_err), question)
-            cypher = fixed
-            results = execute_cypher(driver, cypher)  # propagate if still fails
+        if results is None:
+            t = time.perf_counter()
+            hit = cache.get(question)
+            if hit:
+                cypher = hit["cypher"]
+                cache_info = {k: hit[k] for k in ("match", "similarity", "question")}
+            else:
+                cypher = _clean_cypher((yield (
+                    "chat", "graphrag.cypher", _cypher_messages(question), _CYPHER_PARAMS,
+                )))
+            # += : a failed template attempt's time is kept
+            timings["llm_cypher_ms"] += _ms(t)
 
-        answer = format_answer(question, results)
-        return {"answer": answer, "cypher": cypher, "results": results, "error": None}
+            if not hit:
+                # Repair trivial mistakes locally; only real ones go back to the LLM
+                t = time.perf_counter()
+                cypher, repairs, errors, warnings = cypher_validator.validate(cypher, _SCHEMA_INFO)
+                if errors:
+                    cypher = _clean_cypher((yield (
+                        "chat", "graphrag.fix", _fix_messages(cypher, "\n".join(errors), question),
+                        _CYPHER_PARAMS,
+                    )))
+                    cypher, more, _, warnings = cypher_validator.validate(
+                        cypher, _SCHEMA_INFO, count=False
+                    )
+                    repairs += more
+                validation = {"repairs": repairs, "errors": errors, "warnings": warnings}
+                timings["validate_ms"] = _ms(t)
+            yield {"stage": "cypher", "cypher": cypher}
+
+            t = time.perf_counter()
+            try:
+                results, truncated = yield ("run", cypher, None, True)
+                timings["db_ms"] += _ms(t)
+            except Exception as exec_err:
+                failed_ms = _ms(t)
+                timings["db_ms"] += failed_ms
+                if cache_info:
+                    yield ("cache_discard", cache_info["question"])
+                    cache_info = None
+                # Self-correction: ask LLM to fix the broken query
+                t = time.perf_counter()
+                cypher = _clean_cypher((yield (
+                    "chat", "graphrag.fix", _fix_messages(cypher, str(exec_err), question),
+                    _CYPHER_PARAMS,
+                )))
+                yield {"stage": "cypher", "cypher": cypher}
+                results, truncated = yield ("run", cypher, None, True)  # propagate if still fails
+                timings["fix_retry_ms"] = _ms(t)
+                cypher_validator.record_exec_fix(failed_ms + timings["fix_retry_ms"])
+            # Only Cypher that actually ran is cached
+            if not cache_info or cache_info["match"] != "exact":
+                yield ("cache_put", question, cypher)
+        yield {"stage": "rows", "results": results}
+
+        t = time.perf_counter()
+        answer = answer_formatter.render(question, results)
+        if answer is not None:
+            local_answer = True
+            yield {"stage": "token", "text": answer}
+        elif (answer := answer_cache.get(question, cypher, params, results)) is not None:
+            cached_answer = True
+            yield {"stage": "token", "text": answer}
+        else:
+            answer = yield (
+                "stream", "graphrag.answer", _answer_messages(question, results), _ANSWER_PARAMS,
+            )
+            answer = answer.strip()
+            answer_cache.put(question, cypher, params, results, answer)
+        if truncated:
+            note = f"\n\n_Showing results from the first {MAX_ROWS} matches only._"
+            answer += note
+            yield {"stage": "token", "text": note}
+        timings["llm_answer_ms"] = _ms(t)
+
+        timings["total_ms"] = _ms(started)
+        yield {
+            "stage": "done",
+            "result": {
+                "answer": answer,
+                "cypher": cypher,
+                "results": results,
+                "error": None,
+                "timings": timings,
+                "cypher_cache": cache_info,
+                "template": template,
+                "answer_cache": cached_answer,
+                "local_answer": local_answer,
+                "truncated": truncated,
+                "validation": validation,
+                "followup": None,
+            },
+        }
 
     except Exception as e:
-        return {
-            "answer": (
-                "I'm sorry, I wasn't able to find an answer for that. "
-                "Could you try rephrasing your question? You can ask me about registered enterprises, "
-                "service providers, product categories, cities, ratings, or export readiness."
-            ),
-            "cypher": cypher,
-            "results": [],
-            "error": str(e),
+        timings["total_ms"] = _ms(started)
+        yield {
+            "stage": "done",
+            "result": {
+                "answer": _FALLBACK_ANSWER,
+                "cypher": cypher,
+                "results": [],
+                "error": str(e),
+                "timings": timings,
+                "cypher_cache": cache_info,
+                "template": template,
+                "answer_cache": cached_answer,
+                "local_answer": local_answer,
+                "truncated": truncated,
+                "validation": validation,
+                "followup": None,
+            },
         }
+
+
+def _perform(driver, request):
+    """One _pipeline() I/O request with the sync driver (a generator, so "stream" can emit tokens)."""
+    kind, *args = request
+    if kind == "stream":
+        parts = []
+        for text in llm_gateway.chat_stream(args[0], args[1], **args[2]):
+            parts.append(text)
+            yield {"stage": "token", "text": text}
+        return "".join(parts)
+    if kind == "cities":
+        return fetch_cities(driver)
+    if kind == "vocabulary":
+        return _vocabulary(categorization._get_snapshot(driver))
+    if kind == "chat":
+        return llm_gateway.chat(args[0], args[1], **args[2])
+    if kind == "run":
+        return run_sandboxed(driver, *args)
+    if kind == "cache_put":
+        return get_cypher_cache().put(*args)
+    if kind == "cache_discard":
+        return get_cypher_cache().discard(*args)
+    raise ValueError(f"Unknown pipeline request: {kind}")
+
+
+async def _aperform(driver, request):
+    """_perform() for every request but "stream", on a neo4j AsyncDriver."""
+    kind, *args = request
+    if kind == "cities":
+        return await afetch_cities(driver)
+    if kind == "vocabulary":
+        return _vocabulary(await categorization.aget_snapshot(driver))
+    if kind == "chat":
+        return await llm_gateway.achat(args[0], args[1], **args[2])
+    if kind == "run":
+        return await arun_sandboxed(driver, *args)
+    if kind == "cache_put":
+        # put() / discard() rewrite the cache file; keep that off the event loop
+        return await asyncio.to_thread(get_cypher_cache().put, *args)
+    if kind == "cache_discard":
+        return await asyncio.to_thread(get_cypher_cache().discard, *args)
+    raise ValueError(f"Unknown pipeline request: {kind}")
+
+
+def ask_stream(driver, question: str, previous: list | None = None):
+    """
+    Streaming GraphRAG pipeline. Yields stage events as they happen:
+      {"stage": "cypher", "cypher": str}           — query generated (or fixed)
+      {"stage": "rows",   "results": list}         — rows fetched
+      {"stage": "token",  "text": str}             — partial answer text
+      {"stage": "done",   "result": dict}          — same dict as ask()
+
+    The final result carries "timings" in ms: llm_cypher_ms, validate_ms,
+    db_ms, fix_retry_ms, llm_answer_ms and total_ms, and "cypher_cache": None or
+    {"match": "exact"|"similar", "similarity", "question"} when the Cypher came
+    from the question cache instead of the LLM, and "template": the
+    cypher_templates intent name when a parameterized template answered the
+    question without calling the LLM for Cypher (None otherwise).
+    "answer_cache" is True when the answer was reused for the same question,
+    query and rows at the current graph version (see answer_cache) instead of regenerated;
+    "local_answer" is True when answer_formatter rendered it without the LLM.
+    "truncated" is True when the sandbox stopped reading at MAX_ROWS rows.
+    "validation" lists the local repairs, the errors sent to fix_cypher() and
+    the warnings (properties not in the schema) when freshly generated Cypher
+    went through cypher_validator (else None).
+    Generated Cypher runs through run_sandboxed(); a rejection or timeout is
+    handed to fix_cypher() like any other execution error.
+
+    `previous` is the prior turn's result rows. A follow-up that only filters,
+    sorts, limits or counts them ("which of those are export-ready?") is
+    answered from those rows by followups.resolve() without Cypher or a DB
+    call; "followup" then names the operation (None otherwise).
+    """
+    pipeline = _pipeline(question, previous)
+    reply = error = None
+    try:
+        while True:
+            try:
+                step = pipeline.throw(error) if error else pipeline.send(reply)
+            except StopIteration:
+                return
+            reply = error = None
+            if isinstance(step, dict):
+                yield step
+                continue
+            try:
+                reply = yield from _perform(driver, step)
+            except Exception as e:
+                error = e
+    finally:
+        pipeline.close()
+
+
+async def aask_stream(driver, question: str, previous: list | None = None):
+    """ask_stream() on a neo4j AsyncDriver and the async LLM gateway: same events, no blocked thread."""
+    pipeline = _pipeline(question, previous)
+    reply = error = None
+    try:
+        while True:
+            try:
+                step = pipeline.throw(error) if error else pipeline.send(reply)
+            except StopIteration:
+                return
+            reply = error = None
+            if isinstance(step, dict):
+                yield step
+                continue
+            try:
+                if step[0] == "stream":
+                    parts = []
+                    async for text in llm_gateway.achat_stream(step[1], step[2], **step[3]):
+                        parts.append(text)
+                        yield {"stage": "token", "text": text}
+                    reply = "".join(parts)
+                else:
+                    reply = await _aperform(driver, step)
+            except Exception as e:
+                error = e
+    finally:
+        pipeline.close()
+
+
+def ask(driver, question: str, previous: list | None = None) -> dict:
+    """
+    Full GraphRAG pipeline with one self-correction attempt:
+      1. NL  → Cypher   (parameterized template, cached query, or GPT-4o-mini, temp=0)
+      1b. Generated Cypher validated against the schema, trivial fixes applied locally
+      2. Cypher → Neo4j execution
+      2b. On failure: fix Cypher and retry once
+      3. Results → grounded natural-language answer (rendered locally for
+         simple shapes, else GPT-4o-mini, temp=0.1)
+
+    Follow-ups over `previous` rows skip steps 1–2 (see ask_stream()).
+
+    Returns dict with keys: answer, cypher, results, error, timings,
+    cypher_cache, template, answer_cache, local_answer, truncated, validation,
+    followup (the final event of ask_stream()).
+    """
+    for event in ask_stream(driver, question, previous):
+        if event["stage"] == "done":
+            return event["result"]
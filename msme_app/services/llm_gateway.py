@@ -0,0 +1,263 @@
+"""
+Single entry point for OpenAI chat completions.
+
+Every call names its call site ("graphrag.cypher", "nlp.extract_entities",
+…) and the gateway records prompt / cached / completion tokens, latency,
+errors and estimated cost per site. Callers put their static instructions in
+the leading system message and the per-request data last, so identical
+prefixes hit provider-side prompt caching; the gateway counts how many
+distinct system prompts each site has sent ("prefix_variants" should stay 1).
+
+Set LLM_BACKEND=stub (or call set_backend(StubBackend(...))) to run without
+the network: the stub answers from canned responses and estimates usage.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import openai
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# USD per 1M tokens: (input, cached input, output)
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+
+class OpenAIBackend:
+    def __init__(self):
+        self._client = None
+        self._async_client = None
+
+    def _api_key(self):
+        return openai.api_key or os.getenv("OPENAI_API_KEY")
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = openai.OpenAI(api_key=self._api_key())
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = openai.AsyncOpenAI(api_key=self._api_key())
+        return self._async_client
+
+    def create(self, site, **kwargs):
+        return self.client.chat.completions.create(**kwargs)
+
+    async def acreate(self, site, **kwargs):
+        return await self.async_client.chat.completions.create(**kwargs)
+
+
+class _Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class StubBackend:
+    """
+    Offline backend. `responses` maps a call site to a string or to a
+    callable(messages) -> str; unknown sites get `default`.
+    """
+
+    def __init__(self, responses=None, default=""):
+        self.responses = responses or {}
+        self.default = default
+        self.calls = []  # (site, messages) for inspection
+
+    def _text(self, site, messages):
+        self.calls.append((site, messages))
+        reply = self.responses.get(site, self.default)
+        return reply(messages) if callable(reply) else reply
+
+    @staticmethod
+    def _usage(messages, text):
+        prompt = sum(len(m["content"]) for m in messages) // 4
+        return _Obj(prompt_tokens=prompt, completion_tokens=len(text) // 4,
+                    prompt_tokens_details=_Obj(cached_tokens=0))
+
+    def _response(self, site, kwargs):
+        text = self._text(site, kwargs["messages"])
+        if kwargs.get("stream"):
+            words = text.split(" ")
+            chunks = [
+                _Obj(choices=[_Obj(delta=_Obj(content=w + (" " if i < len(words) - 1 else "")))],
+                     usage=None)
+                for i, w in enumerate(words)
+            ]
+            chunks.append(_Obj(choices=[], usage=self._usage(kwargs["messages"], text)))
+            return chunks
+        return _Obj(
+            choices=[_Obj(message=_Obj(content=text))],
+            usage=self._usage(kwargs["messages"], text),
+        )
+
+    def create(self, site, **kwargs):
+        return self._response(site, kwargs)
+
+    async def acreate(self, site, **kwargs):
+        response = self._response(site, kwargs)
+        if not kwargs.get("stream"):
+            return response
+
+        async def _aiter():
+            for chunk in response:
+                yield chunk
+
+        return _aiter()
+
+
+_backend = StubBackend() if os.getenv("LLM_BACKEND") == "stub" else OpenAIBackend()
+_lock = threading.Lock()
+_sites = {}  # site -> counters
+_prefixes = {}  # site -> {system prompt hash}
+
+
+def set_backend(backend):
+    """Swap the backend (e.g. StubBackend for offline runs); returns the previous one."""
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
+
+
+def _record(site, model, messages, usage, started, error=False):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    price_in, price_cached, price_out = PRICES.get(model, PRICES[DEFAULT_MODEL])
+    cost = ((prompt - cached) * price_in + cached * price_cached + completion * price_out) / 1e6
+    prefix = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+    prefix_hash = hashlib.sha1(prefix.encode("utf-8")).hexdigest()[:12]
+    with _lock:
+        s = _sites.setdefault(site, {
+            "calls": 0, "errors": 0, "prompt_tokens": 0, "cached_tokens": 0,
+            "completion_tokens": 0, "latency_ms": 0.0, "max_latency_ms": 0.0, "cost_usd": 0.0,
+        })
+        s["calls"] += 1
+        s["errors"] += int(error)
+        s["prompt_tokens"] += prompt
+        s["cached_tokens"] += cached
+        s["completion_tokens"] += completion
+        s["latency_ms"] += elapsed_ms
+        s["max_latency_ms"] = max(s["max_latency_ms"], elapsed_ms)
+        s["cost_usd"] += cost
+        _prefixes.setdefault(site, set()).add(prefix_hash)
+
+
+def chat(site: str, messages: list, model: str = DEFAULT_MODEL, **params) -> str:
+    """Chat completion → message text. `params` go to the API (temperature, max_tokens, …)."""
+    started = time.perf_counter()
+    try:
+        response = _backend.create(site, model=model, messages=messages, **params)
+    except Exception:
+        _record(site, model, messages, None, started, error=True)
+        raise
+    _record(site, model, messages, response.usage, started)
+    return response.choices[0].message.content
+
+
+def chat_stream(site: str, messages: list, model: str = DEFAULT_MODEL, **params):
+    """Streaming chat completion; yields text chunks and records usage when the stream ends."""
+    started = time.perf_counter()
+    usage = None
+    try:
+        stream = _backend.create(
+            site, model=model, messages=messages, **params,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception:
+        _record(site, model, messages, usage, started, error=True)
+        raise
+    _record(site, model, messages, usage, started)
+
+
+async def achat(site: str, messages: list, model: str = DEFAULT_MODEL, **params) -> str:
+    started = time.perf_counter()
+    try:
+        response = await _backend.acreate(site, model=model, messages=messages, **params)
+    except Exception:
+        _record(site, model, messages, None, started, error=True)
+        raise
+    _record(site, model, messages, response.usage, started)
+    return response.choices[0].message.content
+
+
+async def achat_stream(site: str, messages: list, model: str = DEFAULT_MODEL, **params):
+    started = time.perf_counter()
+    usage = None
+    try:
+        stream = await _backend.acreate(
+            site, model=model, messages=messages, **params,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception:
+        _record(site, model, messages, usage, started, error=True)
+        raise
+    _record(site, model, messages, usage, started)
+
+
+def stats():
+    """{"sites": {site: counters}, "total": counters} with average latency and cache share."""
+    with _lock:
+        sites = {site: dict(s) for site, s in _sites.items()}
+        variants = {site: len(h) for site, h in _prefixes.items()}
+    total = {}
+    for site, s in sites.items():
+        for key, value in s.items():
+            if key == "max_latency_ms":
+                total[key] = max(total.get(key, 0.0), value)
+            else:
+                total[key] = total.get(key, 0) + value
+        s["prefix_variants"] = variants.get(site, 0)
+    for s in list(sites.values()) + ([total] if total else []):
+        s["avg_latency_ms"] = round(s["latency_ms"] / s["calls"], 1) if s["calls"] else 0.0
+        s["cached_share"] = round(s["cached_tokens"] / s["prompt_tokens"], 3) if s["prompt_tokens"] else 0.0
+        s["cost_usd"] = round(s["cost_usd"], 6)
+        s["latency_ms"] = round(s["latency_ms"], 1)
+        s["max_latency_ms"] = round(s["max_latency_ms"], 1)
+    return {"sites": sites, "total": total}
+
+
+def prometheus_metrics() -> str:
+    """Per-site counters in Prometheus text exposition format."""
+    lines = []
+    fields = [
+        ("calls", "llm_calls_total"),
+        ("errors", "llm_errors_total"),
+        ("prompt_tokens", "llm_prompt_tokens_total"),
+        ("cached_tokens", "llm_cached_prompt_tokens_total"),
+        ("completion_tokens", "llm_completion_tokens_total"),
+        ("latency_ms", "llm_latency_ms_total"),
+        ("cost_usd", "llm_cost_usd_total"),
+    ]
+    sites = stats()["sites"]
+    for key, metric in fields:
+        lines.append(f"# TYPE {metric} counter")
+        for site, s in sorted(sites.items()):
+            lines.append(f'{metric}{{site="{site}"}} {s[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def reset_stats():
+    with _lock:
+        _sites.clear()
+        _prefixes.clear()
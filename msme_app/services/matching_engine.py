@@ -0,0 +1,238 @@
+"""
+In-process vectorized matching engine — a local alternative to the Cypher
+scorer in graph_service.run_reasoning().
+
+The SNP×Category bipartite graph is loaded once into NumPy arrays:
+  * an SNP feature matrix (sla, capacity, focus, cert_bonus), and
+  * a CSR adjacency (category → SNP rows) for SERVES.
+Scoring an MSE is then a slice of the adjacency plus one dot product, using
+exactly the run_reasoning() weights. save_snp()/delete_snp()/delete_category()
+notify the shared engine so it stays current without a full reload.
+"""
+import threading
+
+import numpy as np
+
+from msme_app.services.geocoding import GEO_DECAY_KM
+
+# Same weights as run_reasoning(): geo, sla, capacity, focus, cert_bonus
+GEO_WEIGHT = 0.6
+FEATURE_WEIGHTS = np.array([0.15, 0.10, 0.10, 0.05])
+
+# Earth radius used by Neo4j's point.distance() for WGS-84, so local and
+# Cypher distances agree.
+_EARTH_RADIUS_KM = 6378.14
+
+_SNP_FIELDS = (
+    "name", "city", "rating", "capacity", "certifications", "export_capable",
+    "specialization", "languages", "payment_terms", "lat", "lon",
+)
+
+_LOAD_QUERY = """
+    MATCH (s:SNP)
+    WHERE $ids IS NULL OR s.id IN $ids
+    OPTIONAL MATCH (s)-[:SERVES]->(c:Category)
+    WITH s, collect(c.code) AS category_codes
+    RETURN s.id AS id, properties(s) AS props, category_codes
+"""
+
+
+def _distance_km(lat, lon, lat0, lon0):
+    """Vectorized haversine distance from (lat0, lon0) to each (lat, lon)."""
+    lat, lon, lat0, lon0 = map(np.radians, (lat, lon, lat0, lon0))
+    a = np.sin((lat - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _round(values):
+    """Cypher round(): half away from zero (np.round is half-to-even)."""
+    return np.sign(values) * np.floor(np.abs(values) + 0.5)
+
+
+class _Snapshot:
+    """Immutable array view of the SNP graph; rebuilt and swapped whole."""
+
+    def __init__(self, snps):
+        self.ids = list(snps)
+        rows = [snps[i] for i in self.ids]
+        n = len(rows)
+
+        rating = np.array([r["rating"] or 0.0 for r in rows], dtype=float)
+        export = np.array([bool(r["export_capable"]) for r in rows])
+        capacity = np.array([r["capacity"] or 0 for r in rows], dtype=float)
+        n_cats = np.array([len(r["category_codes"]) for r in rows], dtype=float)
+        certs = np.array([len(r["certifications"] or []) for r in rows], dtype=float)
+
+        sla = np.where(export, np.minimum(rating + 0.05, 1.0), rating)
+        cap = np.where(capacity > 150, 0.9, 0.5)
+        focus = np.where(n_cats > 0, 1.0 / np.maximum(n_cats, 1), 1.0)
+        self.features = np.column_stack([sla, cap, focus, certs * 0.02]) if n else np.zeros((0, 4))
+        self.base = self.features @ FEATURE_WEIGHTS
+        self.city = np.array([(r["city"] or "").strip().lower() for r in rows], dtype=object)
+        self.lat = np.array([np.nan if r["lat"] is None else r["lat"] for r in rows], dtype=float)
+        self.lon = np.array([np.nan if r["lon"] is None else r["lon"] for r in rows], dtype=float)
+        self.cert_count = certs.astype(int)
+        self.rows = rows
+        # Rank of each SNP id in sorted order: the tie-break of run_reasoning()'s ORDER BY
+        self.id_rank = np.empty(n, dtype=int)
+        self.id_rank[sorted(range(n), key=self.ids.__getitem__)] = np.arange(n)
+
+        # CSR adjacency: category code → SNP row indices
+        by_code = {}
+        for idx, r in enumerate(rows):
+            for code in r["category_codes"]:
+                by_code.setdefault(code, []).append(idx)
+        self.code_index = {code: i for i, code in enumerate(sorted(by_code))}
+        indptr = [0]
+        indices = []
+        for code in sorted(by_code):
+            indices.extend(by_code[code])
+            indptr.append(len(indices))
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+
+    def candidates(self, category_codes):
+        """SNP rows serving any of the codes — one row per (SNP, category) pair, like the Cypher MATCH."""
+        parts = []
+        for code in category_codes:
+            i = self.code_index.get(code)
+            if i is not None:
+                parts.append(self.indices[self.indptr[i]:self.indptr[i + 1]])
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+class MatchingEngine:
+    """Holds the current snapshot and applies incremental SNP updates."""
+
+    def __init__(self):
+        self._snps = {}
+        self._snapshot = _Snapshot({})
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, driver):
+        """Load (or fully reload) every SNP and its SERVES edges."""
+        snps = self._fetch(driver, None)
+        with self._lock:
+            self._snps = snps
+            self._snapshot = _Snapshot(snps)
+            self.loaded = True
+        return self
+
+    def refresh_snps(self, driver, snp_ids):
+        """Re-fetch only the given SNPs and swap in a rebuilt snapshot."""
+        if not self.loaded:
+            return
+        fresh = self._fetch(driver, list(snp_ids))
+        with self._lock:
+            snps = dict(self._snps)
+            for snp_id in snp_ids:
+                snps.pop(snp_id, None)
+            snps.update(fresh)
+            self._snps = snps
+            self._snapshot = _Snapshot(snps)
+
+    def remove_snp(self, snp_id):
+        if not self.loaded:
+            return
+        with self._lock:
+            if snp_id in self._snps:
+                snps = dict(self._snps)
+                del snps[snp_id]
+                self._snps = snps
+                self._snapshot = _Snapshot(snps)
+
+    def invalidate(self):
+        """Drop the snapshot; the next get_engine() call reloads it."""
+        with self._lock:
+            self.loaded = False
+
+    @staticmethod
+    def _fetch(driver, snp_ids):
+        with driver.session() as session:
+            rows = session.run(_LOAD_QUERY, ids=snp_ids)
+            snps = {}
+            for row in rows:
+                props = row["props"] or {}
+                snp = {k: props.get(k) for k in _SNP_FIELDS}
+                snp["category_codes"] = list(row["category_codes"])
+                snps[row["id"]] = snp
+            return snps
+
+    def match(self, category_codes, city, top_k=3, location=None, radius_km=None):
+        """
+        Score every SNP serving `category_codes` for an MSE in `city` at
+        `location` (lat, lon). Mirrors run_reasoning(): the radius pre-filter
+        applies only if at least `top_k` candidates are inside it. Returns up
+        to `top_k` dicts with the same keys as run_reasoning().
+        """
+        snap = self._snapshot
+        cand = snap.candidates(category_codes)
+        if cand.size == 0:
+            return []
+        same_city = np.where(snap.city[cand] == (city or "").strip().lower(), 1.0, 0.1)
+        if location is not None:
+            dist = _distance_km(snap.lat[cand], snap.lon[cand], *location)
+            has_point = ~np.isnan(dist)
+            geo = np.where(has_point, 0.1 + 0.9 * np.exp(-np.nan_to_num(dist) / GEO_DECAY_KM), same_city)
+            if radius_km:
+                inside = has_point & (np.nan_to_num(dist, nan=np.inf) <= radius_km)
+                if inside.sum() >= top_k:
+                    cand, geo = cand[inside], geo[inside]
+        else:
+            geo = same_city
+        score = _round((geo * GEO_WEIGHT + snap.base[cand]) * 100)
+        order = np.lexsort((snap.id_rank[cand], -score))[:top_k]
+        results = []
+        for pos in order:
+            idx = cand[pos]
+            row = snap.rows[idx]
+            results.append({
+                "snp_id": snap.ids[idx],
+                "snp": row["name"],
+                "location": row["city"],
+                "certifications": row["certifications"],
+                "export_capable": row["export_capable"],
+                "specialization": row["specialization"],
+                "languages": row["languages"],
+                "payment_terms": row["payment_terms"],
+                "score": float(score[pos]),
+                "geo_pct": float(_round(geo[pos] * 100)),
+                "sla_pct": float(_round(snap.features[idx, 0] * 100)),
+                "cap_pct": float(_round(snap.features[idx, 1] * 100)),
+                "cert_count": int(snap.cert_count[idx]),
+            })
+        return results
+
+
+_engine: MatchingEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(driver) -> MatchingEngine:
+    """Return the process-wide engine, loading it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = MatchingEngine()
+        if not _engine.loaded:
+            _engine.load(driver)
+    return _engine
+
+
+def notify_snps_changed(driver, snp_ids):
+    """Write hook for save_snp()/save_snps_bulk(); no-op until the engine is loaded."""
+    if _engine is not None:
+        _engine.refresh_snps(driver, snp_ids)
+
+
+def notify_snp_deleted(snp_id):
+    """Write hook for delete_snp()."""
+    if _engine is not None:
+        _engine.remove_snp(snp_id)
+
+
+def notify_categories_changed():
+    """Write hook for delete_category(); forces a reload on next use."""
+    if _engine is not None:
+        _engine.invalidate()
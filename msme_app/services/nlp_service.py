@@ -1,18 +1,19 @@
 import json
 
-import openai
 import difflib
 import re
 
+from msme_app.services import llm_gateway
+
 
 SYSTEM_PROMPT = """Return ONLY English JSON.
 Example: "मैं चेन्नई लेदर" → {"business_name": "Chennai Leather Works", "city": "Chennai", "products": ["leather belt"], "udyam": ""}"""
 
 
 def extract_entities(transcription):
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    text = llm_gateway.chat(
+        "nlp.extract_entities",
+        [
             {"role": "system", "content": SYSTEM_PROMPT},
             {
                 "role": "user",
@@ -21,7 +22,7 @@ def extract_entities(transcription):
         ],
         temperature=0,
     )
-    return json.loads(response.choices[0].message.content.strip())
+    return json.loads(text.strip())
 
 
 def normalize_city(city, transcription, city_list):
@@ -57,9 +58,9 @@ def normalize_city(city, transcription, city_list):
 
     # LLM fallback to map ambiguous city to the closest known city
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        text = llm_gateway.chat(
+            "nlp.normalize_city",
+            [
                 {
                     "role": "system",
                     "content": "Pick the best matching city from the provided list. Return only the city name from the list, or empty string if none fit.",
@@ -71,7 +72,7 @@ def normalize_city(city, transcription, city_list):
             ],
             temperature=0,
         )
-        candidate = response.choices[0].message.content.strip().splitlines()[0].strip()
+        candidate = (text.strip().splitlines() or [""])[0].strip()
         if candidate:
             lower_map = {c.lower(): c for c in city_list}
             if candidate.lower() in lower_map:
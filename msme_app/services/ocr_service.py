@@ -281,31 +281,30 @@ def process_udyam_certificate(file_path):
         return {"error": str(exc), "success": False}
 
 
+_LLM_EXTRACT_SYSTEM = (
+    "Extract structured data from certificates. Return only JSON.\n"
+    "Extract Udyam certificate data from the OCR text the user sends.\n"
+    "Return JSON with these exact fields:\n"
+    '{\n  "urn": "UDYAM-XX-XX-XXXXXXX or null",\n  "business_name": "",\n'
+    '  "type": "MICRO/SMALL/MEDIUM",\n  "activity": "MANUFACTURING/SERVICES/TRADING",\n'
+    '  "city": "",\n  "state": "",\n  "mobile": "",\n  "email": ""\n}'
+)
+
+
 def extract_with_llm(raw_text):
     import json
-    import openai
-
-    prompt = (
-        "Extract Udyam certificate data from this OCR text:\n\n"
-        f"{raw_text}\n\n"
-        "Return JSON with these exact fields:\n"
-        '{\n  "urn": "UDYAM-XX-XX-XXXXXXX or null",\n  "business_name": "",\n'
-        '  "type": "MICRO/SMALL/MEDIUM",\n  "activity": "MANUFACTURING/SERVICES/TRADING",\n'
-        '  "city": "",\n  "state": "",\n  "mobile": "",\n  "email": ""\n}'
-    )
 
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "Extract structured data from certificates. Return only JSON.",
-            },
-            {"role": "user", "content": prompt},
+    from msme_app.services import llm_gateway
+
+    # Static instructions first, OCR text last, so the prompt prefix is cacheable
+    raw = llm_gateway.chat(
+        "ocr.extract_with_llm",
+        [
+            {"role": "system", "content": _LLM_EXTRACT_SYSTEM},
+            {"role": "user", "content": f"OCR text:\n\n{raw_text}"},
         ],
         temperature=0,
-    )
-    raw = response.choices[0].message.content.strip()
+    ).strip()
     # Strip markdown code fences if the model wraps the JSON
     if raw.startswith("```"):
         raw = re.sub(r"^```(?:json)?\s*", "", raw)
@@ -0,0 +1,131 @@
+"""
+Process-wide result cache for graph_service read functions.
+
+Streamlit reruns the whole page on every interaction, so the dashboard's
+fetch_* calls would otherwise hit Neo4j on every click. Reads decorated with
+@cached are served from memory, keyed by function + params; writes decorated
+with @invalidates bump a generation counter that retires every entry at once.
+Writes that only affect a few reads (e.g. cached recommendations) call
+invalidate() with those function names instead.
+A TTL bounds staleness from writes made outside this process (seed scripts,
+bulk imports). The cache is module-global, so it is shared by all pages and
+sessions in the server process.
+"""
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 60.0
+MAX_ENTRIES = 512
+
+_lock = threading.Lock()
+_store = OrderedDict()  # key -> ((generation, scoped generation), expires_at, value)
+_generation = 0
+_scoped = {}  # function name -> times invalidate() retired it alone
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def generation():
+    """Current graph-data generation; changes whenever a write goes through graph_service."""
+    return _generation
+
+
+def invalidate(*functions):
+    """
+    Retire every cached read and bump the generation, or with function names
+    only the entries of those functions (the generation is unchanged).
+    """
+    global _generation
+    with _lock:
+        if functions:
+            for name in functions:
+                _scoped[name] = _scoped.get(name, 0) + 1
+            for key in [k for k in _store if k[0] in functions]:
+                del _store[key]
+        else:
+            _generation += 1
+            _store.clear()
+        _stats["invalidations"] += 1
+
+
+def stats():
+    with _lock:
+        return {**_stats, "entries": len(_store), "generation": _generation}
+
+
+def _plain(value):
+    """Neo4j Records → dicts so cached values can be safely deep-copied per caller."""
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if hasattr(value, "keys") and hasattr(value, "values") and not isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def _lookup(name, key):
+    """(hit, value, stamp) for a cached read; `stamp` is handed back to _remember()."""
+    with _lock:
+        stamp = (_generation, _scoped.get(name, 0))
+        entry = _store.get(key)
+        if entry and entry[0] == stamp and entry[1] > time.monotonic():
+            _store.move_to_end(key)
+            _stats["hits"] += 1
+            return True, copy.deepcopy(entry[2]), stamp
+        _stats["misses"] += 1
+        return False, None, stamp
+
+
+def _remember(name, key, stamp, ttl, value):
+    value = _plain(value)
+    with _lock:
+        # Skip storing if a write landed while we were reading
+        if stamp == (_generation, _scoped.get(name, 0)):
+            _store[key] = (stamp, time.monotonic() + ttl, value)
+            _store.move_to_end(key)
+            while len(_store) > MAX_ENTRIES:
+                _store.popitem(last=False)
+    return copy.deepcopy(value)
+
+
+def cached(ttl=DEFAULT_TTL):
+    """
+    Cache a read function's result. The first argument (the driver) is not
+    part of the key. Coroutine functions (reads on a neo4j AsyncDriver) are
+    cached the same way.
+    """
+    def decorator(func):
+        name = func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(driver, *args, **kwargs):
+                key = (name, args, tuple(sorted(kwargs.items())))
+                hit, value, stamp = _lookup(name, key)
+                if hit:
+                    return value
+                return _remember(name, key, stamp, ttl, await func(driver, *args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(driver, *args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            hit, value, stamp = _lookup(name, key)
+            if hit:
+                return value
+            return _remember(name, key, stamp, ttl, func(driver, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def invalidates(func):
+    """Mark a write function: bump the generation after it runs (even if it raises)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            invalidate()
+    return wrapper
@@ -0,0 +1,105 @@
+"""
+Batch re-matching of MSEs to SNPs.
+
+Scores MSEs with the in-process matching engine and persists the top-k as
+(:MSE)-[:RECOMMENDED {score, rank, of, computed_at}]->(:SNP) edges, so pages can
+read cached recommendations instead of calling run_reasoning() per view.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from msme_app.services import matching_engine, query_cache
+from msme_app.services.geocoding import DEFAULT_RADIUS_KM
+from msme_app.services.graph_service import save_recommendations
+
+# MSEs to re-match. With $since set, only MSEs whose categories are served by
+# an SNP updated since then, that point at such an SNP, that lost a
+# recommendation (fewer edges than were saved: DETACH DELETE of an SNP drops
+# its edges without touching the MSE) or that have no recommendations yet;
+# with $codes set, only MSEs offering those categories.
+_TARGET_QUERY = """
+    MATCH (m:MSE)-[:OFFERS]->(c:Category)
+    WHERE ($codes IS NULL OR c.code IN $codes)
+      AND ($since IS NULL
+           OR EXISTS { (c)<-[:SERVES]-(s:SNP) WHERE s.updated_at >= $since }
+           OR EXISTS { (m)-[:RECOMMENDED]->(s:SNP) WHERE s.updated_at >= $since }
+           OR EXISTS {
+               MATCH (m)-[r:RECOMMENDED]->(:SNP)
+               WITH count(r) AS saved, max(r.of) AS expected
+               WHERE saved < expected
+               RETURN saved
+           }
+           OR NOT EXISTS { (m)-[:RECOMMENDED]->(:SNP) })
+    RETURN m.id AS id, m.city AS city, m.lat AS lat, m.lon AS lon, collect(c.code) AS codes
+"""
+
+
+def _top_distinct(engine, codes, city, location, top_k):
+    """Engine results with one row per SNP (an SNP may serve several of the MSE's categories)."""
+    seen, picked = set(), []
+    rows = engine.match(
+        codes, city, top_k=top_k * max(len(codes), 1),
+        location=location, radius_km=DEFAULT_RADIUS_KM,
+    )
+    for row in rows:
+        if row["snp_id"] not in seen:
+            seen.add(row["snp_id"])
+            picked.append(row)
+            if len(picked) == top_k:
+                break
+    return picked
+
+
+def rematch_all(driver, since=None, category_codes=None, workers=4, top_k=3, batch_size=500):
+    """
+    Recompute and persist top-k SNP recommendations for every MSE, or only
+    the affected ones when `since` (epoch ms, as written by timestamp()) or
+    `category_codes` is given.
+
+    Scoring is vectorized in-process; each worker scores one batch and writes
+    it in a single transaction. Cached recommendation reads are retired once,
+    after the last batch. Returns throughput stats:
+    {"mses", "recommendations", "batches", "seconds", "mses_per_sec"}.
+    """
+    start = time.perf_counter()
+    engine = matching_engine.get_engine(driver)
+    with driver.session() as session:
+        targets = [
+            (
+                row["id"],
+                row["city"],
+                (row["lat"], row["lon"]) if row["lat"] is not None else None,
+                list(row["codes"]),
+            )
+            for row in session.run(
+                _TARGET_QUERY,
+                since=since,
+                codes=list(category_codes) if category_codes else None,
+            )
+        ]
+
+    def _process(batch):
+        recs = {
+            mse_id: _top_distinct(engine, codes, city, location, top_k)
+            for mse_id, city, location, codes in batch
+        }
+        save_recommendations(driver, recs, invalidate=False)
+        return sum(len(r) for r in recs.values())
+
+    batches = [targets[i:i + batch_size] for i in range(0, len(targets), batch_size)]
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            n_recs = sum(pool.map(_process, batches))
+    finally:
+        # Also after a failed batch: earlier ones are already committed
+        if batches:
+            query_cache.invalidate("fetch_recommendations")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "mses": len(targets),
+        "recommendations": n_recs,
+        "batches": len(batches),
+        "seconds": round(elapsed, 3),
+        "mses_per_sec": round(len(targets) / elapsed, 1) if elapsed else 0.0,
+    }
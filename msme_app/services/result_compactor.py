@@ -0,0 +1,113 @@
+"""
+Compact GraphRAG result rows into a small table for the answer prompt.
+
+Full nodes are flattened to their answer-relevant properties (contact
+details, geo points, timestamps and scoring internals are dropped; columns
+the query returned explicitly are always kept). Nulls and empty lists are
+left out, lists are joined, long cells truncated, and rows are added until a
+token budget is reached, with a note of how many were left out.
+"""
+import threading
+
+MAX_ROWS = 25
+TOKEN_BUDGET = 1500
+MAX_CELL_CHARS = 120
+
+# Node properties never needed to phrase an answer (still returned when a
+# query asks for them by name, e.g. RETURN m.mobile).
+_HIDDEN_NODE_PROPS = {
+    "mobile", "email", "address", "location", "lat", "lon", "city_norm", "pin",
+    "created_at", "updated_at", "social_category", "unit_names", "nic_5_digit_codes",
+    "source", "urn", "serves_count", "cert_count", "sla_score", "capacity_score",
+    "focus_score", "base_score", "keywords",
+}
+
+_lock = threading.Lock()
+_stats = {"prompts": 0, "raw_tokens": 0, "compact_tokens": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English-heavy text)."""
+    return (len(text) + 3) // 4
+
+
+def _is_node(value):
+    return hasattr(value, "labels") and hasattr(value, "items")
+
+
+def _cell(value):
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, float):
+        value = round(value, 3)
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(_cell(v) for v in value if v not in (None, ""))
+    elif isinstance(value, dict) or _is_node(value):
+        value = "; ".join(f"{k}={_cell(v)}" for k, v in dict(value).items() if v not in (None, "", []))
+    text = " ".join(str(value).split()).replace("|", "/")
+    return text if len(text) <= MAX_CELL_CHARS else text[:MAX_CELL_CHARS - 1] + "…"
+
+
+def _flatten(row):
+    """Result row → ordered {column: value}, expanding node columns to their useful properties."""
+    flat = {}
+    for key, value in row.items():
+        if _is_node(value):
+            prefix = "" if len(row) == 1 else f"{key}."
+            props = dict(value)
+            # name/id first, then the rest alphabetically
+            for prop in sorted(props, key=lambda p: (p not in ("name", "id"), p != "name", p)):
+                v = props[prop]
+                if prop not in _HIDDEN_NODE_PROPS:
+                    flat[prefix + prop] = v
+        else:
+            flat[key] = value
+    return {k: v for k, v in flat.items() if v not in (None, "", [], {})}
+
+
+def compact(results, budget=TOKEN_BUDGET, max_rows=MAX_ROWS) -> str:
+    """Render rows as a pipe table within `budget` estimated tokens."""
+    if not results:
+        return "(no rows)"
+    rows = [_flatten(dict(r)) for r in results[:max_rows]]
+    columns = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    if not columns:
+        return f"({len(results)} rows, all values empty)"
+
+    header = " | ".join(columns)
+    lines = [header]
+    used = estimate_tokens(header)
+    for row in rows:
+        line = " | ".join(_cell(row[c]) if c in row else "" for c in columns)
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget and len(lines) > 1:
+            break
+        lines.append(line)
+        used += cost
+
+    shown = len(lines) - 1
+    summary = f"{len(results)} row{'s' if len(results) != 1 else ''}"
+    if shown < len(results):
+        summary += f", first {shown} shown"
+    return f"({summary})\n" + "\n".join(lines)
+
+
+def record(raw_text: str, compact_text: str):
+    with _lock:
+        _stats["prompts"] += 1
+        _stats["raw_tokens"] += estimate_tokens(raw_text)
+        _stats["compact_tokens"] += estimate_tokens(compact_text)
+
+
+def stats():
+    """Cumulative estimated prompt tokens before (str(rows)) and after compaction."""
+    with _lock:
+        s = dict(_stats)
+    s["saved_pct"] = (
+        round(100 * (1 - s["compact_tokens"] / s["raw_tokens"]), 1) if s["raw_tokens"] else 0.0
+    )
+    return s
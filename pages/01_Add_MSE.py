@@ -7,7 +7,8 @@ import pandas as pd
 import streamlit as st
 
 from msme_app.config import get_driver, load_config
-from msme_app.services.categorization import categorize_products
+from msme_app.schema import ensure_schema
+from msme_app.services.categorization import categorize_products, start_background_refresh
 from msme_app.services.graph_service import (
     fetch_categories,
     fetch_cities,
@@ -17,6 +18,7 @@ from msme_app.services.graph_service import (
     fetch_stats,
     run_reasoning,
     save_mse,
+    save_recommendations,
 )
 from msme_app.services.nlp_service import extract_entities, normalize_city
 from msme_app.services.ocr_service import (
@@ -41,9 +43,13 @@ configure_page()
 
 @st.cache_resource
 def _get_driver():
-    return get_driver(load_config())
+    driver = get_driver(load_config())
+    start_background_refresh(driver)  # no-op unless CATEGORY_CACHE_TTL is set
+    return driver
 
 driver = _get_driver()
+if schema_error := ensure_schema(driver):
+    st.warning(schema_error)
 
 apply_styles()
 render_header()
@@ -139,6 +145,7 @@ def _save_mse_dialog(p):
         st.write(f"✅ MSE created — ID: `{p['mse_id']}` · Category: **{p['category_name']}**")
         st.write("🔍 Searching for best-fit Seller Network Participants…")
         reasoning_result = run_reasoning(driver, p["mse_id"], p["city"])
+        save_recommendations(driver, {p["mse_id"]: reasoning_result})
         n = len(reasoning_result)
         st.write(
             f"✅ Found **{n} matching SNP{'s' if n != 1 else ''}** "
@@ -196,7 +203,7 @@ def render_confirm_form(form_key_prefix):
                 f"⚠️ No SNP matches found for "
                 f"**{lr['category_name']} ({lr['category_code']})** "
                 f"in **{lr['entities']['city']}**. "
-                "Check that seed_graph.py has been run and SNPs cover this category."
+                "Check that `python -m utils.seed_graph` has been run and SNPs cover this category."
             )
         if st.button("➕ Register Another MSE", key=f"{form_key_prefix}_another"):
             st.session_state.last_result = None
@@ -259,18 +266,26 @@ def render_confirm_form(form_key_prefix):
         value=_comma_list(data.get("products", "")),
         key=f"{form_key_prefix}_products",
     )
-    category_default = (
-        f"{data.get('category_name', 'Textiles')} "
-        f"({data.get('category_code', 'TX001')})"
-    )
+    category_default = f"{data_category_name} ({data_category_code})"
+    # categorize_products() found no confident match: leave it to the user
+    category_unknown = "category_code" in data and not data_category_code
+    # Nothing preselected without a category (manual entry detects one from
+    # the products on save), so every saved category is a real choice
     category_selection = col4.selectbox(
         "Category",
         options=local_category_options,
-        index=local_category_options.index(category_default)
+        index=None
+        if not data_category_code
+        else local_category_options.index(category_default)
         if category_default in local_category_options
         else 0,
+        placeholder="Detect from products"
+        if form_key_prefix == "manual" and not category_unknown
+        else "Choose a category",
         key=f"{form_key_prefix}_category",
     )
+    if category_unknown:
+        st.warning("Couldn't recognise a category from the products — please choose one.")
 
 
     st.markdown('<div class="fsec fsec-green"><span class="fsec-icon">📋</span>Registration &amp; Contact</div>', unsafe_allow_html=True)
@@ -406,19 +421,24 @@ def render_confirm_form(form_key_prefix):
         "💾  Save & Match SNPs", type="primary", key=f"{form_key_prefix}_save"
     )
     if save_clicked:
-        category_code = local_category_map.get(category_selection, "TX001")
-        category_name = local_category_name_map.get(category_code, "Textiles")
         products = [p.strip() for p in products_text.split(",") if p.strip()]
-
-        # ── Auto-categorize from products when user hasn't manually changed
-        # the category (it stayed at the default TX001 for manual entry)
-        if products and category_code == "TX001" and form_key_prefix == "manual":
-            auto_code, auto_name = categorize_products(
+        if category_selection is not None:
+            category_code = local_category_map.get(category_selection, "TX001")
+            category_name = local_category_name_map.get(category_code, "Textiles")
+        elif form_key_prefix == "manual" and products:
+            # ── No category chosen for manual entry: detect it from the products
+            category_code, category_name = categorize_products(
                 products, driver, business_name=business_name
             )
-            if auto_code != "TX001":
-                category_code = auto_code
-                category_name = auto_name
+            if category_code is None:
+                st.error(
+                    "Couldn't recognise a category from the products — "
+                    "choose one before saving."
+                )
+                return
+        else:
+            st.error("Choose a category before saving.")
+            return
 
         nic_codes = [c.strip() for c in nic_codes_text.split(",") if c.strip()]
         unit_names = [u.strip() for u in unit_names_text.split(",") if u.strip()]
@@ -566,8 +586,6 @@ with tab_manual:
             "business_name": "",
             "city": "",
             "products": "",
-            "category_code": "TX001",
-            "category_name": "Textiles",
             "urn": "",
             "mobile": "",
             "email": "",
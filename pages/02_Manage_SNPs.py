@@ -1,7 +1,10 @@
+import threading
+
 import pandas as pd
 import streamlit as st
 
 from msme_app.config import get_driver, load_config
+from msme_app.schema import ensure_schema
 from msme_app.services.graph_service import (
     delete_snp,
     fetch_categories_detailed,
@@ -9,6 +12,7 @@ from msme_app.services.graph_service import (
     fetch_snps_detailed,
     save_snp,
 )
+from msme_app.services.rematch_service import rematch_all
 from msme_app.ui import (
     apply_styles,
     configure_page,
@@ -26,6 +30,8 @@ def _get_driver():
 
 
 driver = _get_driver()
+if schema_error := ensure_schema(driver):
+    st.warning(schema_error)
 
 apply_styles()
 render_header()
@@ -50,6 +56,17 @@ st.caption("Create, view, update, and delete SNPs — ONDC-registered service pr
 _PAYMENT_OPTIONS = ["Net 15", "Net 30", "Net 45", "Net 60", "Advance", "COD"]
 
 
+def _rematch_in_background(category_codes):
+    """Refresh cached MSE recommendations for the touched categories without blocking the page."""
+    if category_codes:
+        threading.Thread(
+            target=rematch_all,
+            args=(driver,),
+            kwargs={"category_codes": sorted(category_codes)},
+            daemon=True,
+        ).start()
+
+
 # ── SNP form (add / edit) ─────────────────────────────────────────────────────
 def _snp_form(snp_id=None):
     """Render the SNP create/edit form inside a dialog."""
@@ -186,6 +203,7 @@ def _snp_form(snp_id=None):
                 specialization=specialization.strip(),
                 category_codes=selected_cats,
             )
+            _rematch_in_background(set(selected_cats) | set(existing_cats))
             st.success("SNP saved successfully!")
             st.rerun()
 
@@ -202,6 +220,7 @@ def _snp_form(snp_id=None):
             use_container_width=True,
         ):
             delete_snp(driver, snp_id)
+            _rematch_in_background(set(existing_cats))
             st.success("SNP deleted.")
             st.rerun()
         st.markdown("</div>", unsafe_allow_html=True)
@@ -219,7 +238,7 @@ try:
     snps = fetch_snps_detailed(driver, limit=None)
 
     if not snps:
-        st.info("No SNPs found. Click 'Add New SNP' or run seed_graph.py.")
+        st.info("No SNPs found. Click 'Add New SNP' or run `python -m utils.seed_graph`.")
     else:
         rows = []
         for s in snps:
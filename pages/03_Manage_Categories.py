@@ -2,6 +2,7 @@ import pandas as pd
 import streamlit as st
 
 from msme_app.config import get_driver, load_config
+from msme_app.schema import ensure_schema
 from msme_app.services.graph_service import (
     delete_category,
     fetch_categories_detailed,
@@ -25,6 +26,8 @@ def _get_driver():
 
 
 driver = _get_driver()
+if schema_error := ensure_schema(driver):
+    st.warning(schema_error)
 
 apply_styles()
 render_header()
@@ -180,7 +183,7 @@ try:
     cats = fetch_categories_detailed(driver, limit=None)
 
     if not cats:
-        st.info("No categories found. Click 'Add Category' or run seed_graph.py.")
+        st.info("No categories found. Click 'Add Category' or run `python -m utils.seed_graph`.")
     else:
         rows = []
         for c in cats:
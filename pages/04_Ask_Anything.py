@@ -1,7 +1,8 @@
 import streamlit as st
 
 from msme_app.config import get_driver, load_config
-from msme_app.services.graphrag_service import ask
+from msme_app.schema import ensure_schema
+from msme_app.services.graphrag_async import BackgroundGraphRAG, Overloaded
 from msme_app.ui import (
     apply_styles,
     configure_page,
@@ -17,7 +18,16 @@ def _get_driver():
     return get_driver(load_config())
 
 
+@st.cache_resource
+def _get_rag():
+    # One async pipeline per server process, shared by every chat session
+    return BackgroundGraphRAG(load_config())
+
+
 driver = _get_driver()
+if schema_error := ensure_schema(driver):
+    st.warning(schema_error)
+rag = _get_rag()
 
 apply_styles()
 render_header()
@@ -118,6 +128,18 @@ if "aq_messages" not in st.session_state:
         }
     ]
 
+def _timings_caption(timings):
+    parts = [
+        ("Query", timings.get("llm_cypher_ms")),
+        ("Check", timings.get("validate_ms")),
+        ("DB", timings.get("db_ms")),
+        ("Fix", timings.get("fix_retry_ms")),
+        ("Answer", timings.get("llm_answer_ms")),
+        ("Total", timings.get("total_ms")),
+    ]
+    return "⏱ " + " · ".join(f"{label} {ms:,.0f} ms" for label, ms in parts if ms)
+
+
 # ── Render chat history ───────────────────────────────────────────────────────
 for msg in st.session_state["aq_messages"]:
     if msg["role"] == "user":
@@ -131,14 +153,30 @@ for msg in st.session_state["aq_messages"]:
                     st.code(msg["error"], language="text")
                     if msg.get("cypher"):
                         st.code(msg["cypher"], language="cypher")
-            elif msg.get("cypher"):
+            elif msg.get("cypher") or msg.get("followup"):
                 cols = st.columns([1, 1])
-                with cols[0]:
-                    with st.expander("🔍 View Cypher Query", expanded=False):
-                        st.markdown(
-                            f'<div class="cypher-box">{msg["cypher"]}</div>',
-                            unsafe_allow_html=True,
-                        )
+                if msg.get("cypher"):
+                    with cols[0]:
+                        with st.expander("🔍 View Cypher Query", expanded=False):
+                            st.markdown(
+                                f'<div class="cypher-box">{msg["cypher"]}</div>',
+                                unsafe_allow_html=True,
+                            )
+                timings = msg.get("timings")
+                if timings and msg.get("followup"):
+                    st.caption(_timings_caption(timings) + f" · ↪ from previous results: {msg['followup']}")
+                elif timings:
+                    if msg.get("template"):
+                        cache_note = " · ⚡ template"
+                    elif msg.get("cypher_cache"):
+                        cache_note = " · ⚡ cached query"
+                    else:
+                        cache_note = ""
+                    if msg.get("local_answer"):
+                        cache_note += " · ⚡ instant answer"
+                    elif msg.get("answer_cache"):
+                        cache_note += " · ⚡ cached answer"
+                    st.caption(_timings_caption(timings) + cache_note)
                 results = msg.get("results") or []
                 if results:
                     with cols[1]:
@@ -150,11 +188,46 @@ for msg in st.session_state["aq_messages"]:
 
 # ── Process question ──────────────────────────────────────────────────────────
 def _process_question(question: str):
+    # Rows of the last answer, so follow-ups ("which of those…") can be resolved locally
+    history = st.session_state["aq_messages"]
+    previous = history[-1].get("results") if history and history[-1]["role"] == "assistant" else None
+
     st.session_state["aq_messages"].append(
         {"role": "user", "content": question, "cypher": None, "results": None, "error": None}
     )
-    with st.spinner("Querying the database…"):
-        result = ask(driver, question)
+    with st.chat_message("user"):
+        st.write(question)
+
+    # Render stages live as ask_stream() yields them; the full message is
+    # re-rendered from history on the rerun that follows.
+    result = None
+    with st.chat_message("assistant", avatar="🎯"):
+        status = st.status("Understanding your question…", expanded=False)
+        answer_box = st.empty()
+        answer = ""
+        try:
+            for event in rag.ask_stream(question, previous=previous):
+                stage = event["stage"]
+                if stage == "cypher":
+                    status.update(label="Querying the database…")
+                elif stage == "rows":
+                    n = len(event["results"])
+                    status.update(label=f"Found {n} record{'s' if n != 1 else ''} — writing the answer…")
+                elif stage == "token":
+                    answer += event["text"]
+                    answer_box.markdown(answer + "▌")
+                elif stage == "done":
+                    result = event["result"]
+            status.update(label="Done", state="complete")
+        except Overloaded as e:
+            status.update(label="Busy", state="error")
+            result = {
+                "answer": "I'm handling a lot of questions right now — please ask again in a moment.",
+                "cypher": None,
+                "results": [],
+                "error": str(e),
+            }
+
     st.session_state["aq_messages"].append(
         {
             "role": "assistant",
@@ -162,6 +235,12 @@ def _process_question(question: str):
             "cypher": result["cypher"],
             "results": result["results"],
             "error": result["error"],
+            "timings": result.get("timings"),
+            "cypher_cache": result.get("cypher_cache"),
+            "template": result.get("template"),
+            "answer_cache": result.get("answer_cache"),
+            "local_answer": result.get("local_answer"),
+            "followup": result.get("followup"),
         }
     )
 
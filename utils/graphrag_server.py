@@ -0,0 +1,103 @@
+"""
+Small local HTTP endpoint for the async GraphRAG pipeline.
+
+Usage:
+    python -m utils.graphrag_server                       # 127.0.0.1:8765
+    python -m utils.graphrag_server --port 9000 --concurrency 16 --max-pending 128
+
+    curl -s localhost:8765/ask -d '{"question": "How many MSEs are registered?"}'
+    curl -s localhost:8765/stats
+    curl -s localhost:8765/metrics
+
+POST /ask returns the graphrag_service.ask() result as JSON; 429 when the
+pipeline is over its pending limit. GET /stats reports pipeline, cache and
+LLM counters; GET /metrics exposes the LLM counters in Prometheus format.
+Credentials come from .streamlit/secrets.toml or the environment, as in
+utils.seed_graph (no Streamlit import).
+"""
+import argparse
+import json
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from msme_app.services import answer_cache, cypher_validator, llm_gateway
+from msme_app.services.graphrag_async import BackgroundGraphRAG, Overloaded
+from utils.seed_graph import load_config
+
+
+def make_handler(rag, timeout):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, default=str, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = llm_gateway.prometheus_metrics().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if self.path != "/stats":
+                return self._send(404, {"error": "not found"})
+            self._send(200, {
+                "pipeline": rag.stats(),
+                "answer_cache": answer_cache.stats(),
+                "validator": cypher_validator.stats(),
+                "llm": llm_gateway.stats(),
+            })
+
+        def do_POST(self):
+            if self.path != "/ask":
+                return self._send(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                question = (json.loads(self.rfile.read(length) or b"{}").get("question") or "").strip()
+            except (ValueError, AttributeError):
+                return self._send(400, {"error": "body must be JSON: {\"question\": \"...\"}"})
+            if not question:
+                return self._send(400, {"error": "question is required"})
+            try:
+                self._send(200, rag.ask(question, timeout=timeout))
+            except Overloaded as e:
+                self._send(429, {"error": str(e)})
+            except FutureTimeout:
+                self._send(504, {"error": f"no answer within {timeout:.0f}s"})
+
+        def log_message(self, fmt, *args):
+            print(f"{self.address_string()} - {fmt % args}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve GraphRAG answers over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=8, help="Pipelines running at once")
+    parser.add_argument("--max-pending", type=int, default=64, help="Admitted requests before 429")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds per request")
+    args = parser.parse_args()
+
+    rag = BackgroundGraphRAG(
+        load_config(), max_concurrency=args.concurrency, max_pending=args.max_pending
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(rag, args.timeout))
+    print(f"GraphRAG endpoint on http://{args.host}:{args.port} (POST /ask, GET /stats, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        rag.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Bulk MSE import for Udyam registration dumps (CSV or JSONL)
+
+Streams the input file row by row and writes it to Neo4j in batches via
+graph_service.iter_save_mses_bulk(), so files far larger than memory can be
+loaded; failed records are written to --errors as they happen, not collected.
+Credentials come from .streamlit/secrets.toml or the environment, as in
+utils.seed_graph (no Streamlit import).
+
+Columns / keys use the save_mse() keyword names:
+    mse_id (or id), name, city, products, category, category_name, urn, ...
+List columns in CSV (products, unit_names, nic_5_digit_codes) may be a JSON
+array or a '|'-separated string. With --categorize, records without a
+category are assigned one from their products (categorize_many()); records
+no category matches confidently stay uncategorized, so they fail with
+"missing category" and are listed in --errors for manual review instead of
+being filed under a default.
+
+Usage:
+    python -m utils.import_mses --file udyam.csv
+    python -m utils.import_mses --file udyam.jsonl --batch-size 1000
+    python -m utils.import_mses --file udyam.csv --categorize --workers 4
+"""
+import argparse
+import collections
+import csv
+import json
+import time
+from pathlib import Path
+
+from neo4j import GraphDatabase
+
+from msme_app.services.categorization import categorize_many, load_categories
+from msme_app.services.graph_service import iter_save_mses_bulk
+from utils.seed_graph import load_config
+
+_LIST_COLUMNS = ("products", "unit_names", "nic_5_digit_codes")
+
+
+def _parse_list(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value.startswith("[") and value.endswith("]"):
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, list):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+    return [v.strip() for v in value.split("|") if v.strip()]
+
+
+def iter_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            record = {k: (v if v != "" else None) for k, v in row.items() if k}
+            for col in _LIST_COLUMNS:
+                if col in record:
+                    record[col] = _parse_list(record[col])
+            if isinstance(record.get("address"), str) and record["address"].startswith("{"):
+                try:
+                    record["address"] = json.loads(record["address"])
+                except json.JSONDecodeError:
+                    pass
+            yield record
+
+
+def iter_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"  ⚠️  Skipping line {line_no}: {e}")
+
+
+def with_categories(records, categories, workers=None):
+    """
+    Fill category/category_name on records that lack a category, streaming.
+    Records categorize_many() cannot place (code None) are left as they are.
+    """
+    pending = collections.deque()
+
+    def _tee():
+        for record in records:
+            pending.append(record)
+            yield record
+
+    for result in categorize_many(_tee(), categories, workers=workers, top_k=0):
+        record = pending.popleft()
+        if not record.get("category") and result["code"]:
+            record["category"] = result["code"]
+            record["category_name"] = result["name"]
+        yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import MSEs from CSV or JSONL")
+    parser.add_argument("--file", required=True, help="Path to .csv or .jsonl file")
+    parser.add_argument("--batch-size", type=int, default=500, help="Records per transaction")
+    parser.add_argument(
+        "--errors",
+        help="Optional path to write failed records as JSONL (id + message)",
+    )
+    parser.add_argument(
+        "--categorize", action="store_true",
+        help="Assign a category from products to records that have none",
+    )
+    parser.add_argument("--workers", type=int, help="Categorization processes (default: CPU count)")
+    args = parser.parse_args()
+
+    path = Path(args.file)
+    records = iter_jsonl(path) if path.suffix.lower() in (".jsonl", ".ndjson") else iter_csv(path)
+
+    cfg = load_config()
+    driver = GraphDatabase.driver(
+        cfg["NEO4J_URI"], auth=(cfg["NEO4J_USER"], cfg["NEO4J_PASSWORD"])
+    )
+    if args.categorize:
+        records = with_categories(records, load_categories(driver), workers=args.workers)
+    processed = failed = 0
+    errors = open(args.errors, "w", encoding="utf-8") if args.errors else None
+    start = time.perf_counter()
+    try:
+        for mse_id, ok, message in iter_save_mses_bulk(driver, records, batch_size=args.batch_size):
+            processed += 1
+            if ok:
+                continue
+            failed += 1
+            if failed <= 10:
+                print(f"  ⚠️  {mse_id}: {message}")
+            if errors:
+                errors.write(json.dumps({"id": mse_id, "error": message}, ensure_ascii=True) + "\n")
+    finally:
+        driver.close()
+        if errors:
+            errors.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Processed {processed} records in {elapsed:.1f}s "
+          f"({processed / elapsed if elapsed else 0:.0f} rec/s)")
+    print(f"  • Saved:  {processed - failed}")
+    print(f"  • Failed: {failed}")
+    if errors and failed:
+        print(f"  Failed records written to {args.errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Recompute cached SNP recommendations for MSEs.
+
+Usage:
+    python -m utils.rematch_all                       # every MSE
+    python -m utils.rematch_all --since 1760000000000 # SNPs changed since (epoch ms)
+    python -m utils.rematch_all --categories TX001 AP001 --workers 8
+
+Credentials come from .streamlit/secrets.toml or the environment, as in
+utils.seed_graph (no Streamlit import).
+"""
+import argparse
+
+from neo4j import GraphDatabase
+
+from msme_app.services.rematch_service import rematch_all
+from utils.seed_graph import load_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch re-match MSEs to SNPs")
+    parser.add_argument("--since", type=int, help="Only MSEs affected by SNPs updated since (epoch ms)")
+    parser.add_argument("--categories", nargs="*", help="Only MSEs offering these category codes")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    cfg = load_config()
+    driver = GraphDatabase.driver(
+        cfg["NEO4J_URI"], auth=(cfg["NEO4J_USER"], cfg["NEO4J_PASSWORD"])
+    )
+    try:
+        stats = rematch_all(
+            driver,
+            since=args.since,
+            category_codes=args.categories,
+            workers=args.workers,
+            top_k=args.top_k,
+            batch_size=args.batch_size,
+        )
+    finally:
+        driver.close()
+
+    print(f"Re-matched {stats['mses']} MSEs in {stats['seconds']}s "
+          f"({stats['mses_per_sec']} MSEs/s)")
+    print(f"  • Recommendations written: {stats['recommendations']}")
+    print(f"  • Batches: {stats['batches']}")
+
+
+if __name__ == "__main__":
+    main()
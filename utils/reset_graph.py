@@ -6,7 +6,7 @@ IMPORTANT: This script will DELETE ALL DATA in your Neo4j database.
 Use only when you want to completely reset and re-seed.
 
 Usage:
-    python reset_graph.py
+    python -m utils.reset_graph
 """
 import os
 import tomllib
@@ -160,7 +160,7 @@ def main():
         print("✅ GRAPH DATABASE RESET COMPLETE!")
         print("=" * 70)
         print("\n📝 Next Steps:")
-        print("   1. Run: python seed_graph.py")
+        print("   1. Run: python -m utils.seed_graph")
         print("   2. This will create:")
         print("      • 35 Categories with ONDC mapping")
         print("      • 25 SNPs with rich metadata")
@@ -2,12 +2,18 @@
 Merged Seed Graph for IndiaAI Innovation Challenge 2026
 Combined and enhanced taxonomy: 35 categories, 25 SNPs with rich metadata
 Includes multilingual keywords and ONDC taxonomy mapping
+
+Run from the repository root (it imports the msme_app package):
+    python -m utils.seed_graph
 """
 import os
 import tomllib
 from pathlib import Path
 from neo4j import GraphDatabase
 
+from msme_app.schema import apply_migrations
+from msme_app.services.graph_service import save_snps_bulk
+
 
 def load_config():
     """Load credentials from .streamlit/secrets.toml, falling back to env vars."""
@@ -747,7 +753,7 @@ def seed_categories(session):
         )
 
 
-def seed_snps(session):
+def seed_snps(driver):
     """
     25 SNPs with enhanced metadata covering major Indian cities
     Includes certifications, specialization, export capability, languages, and payment terms
@@ -1130,50 +1136,10 @@ def seed_snps(session):
         },
     ]
 
-    for snp in snps:
-        # Create SNP node with all metadata
-        session.run(
-            """
-            MERGE (s:SNP {id: $id})
-            SET s.name = $name, 
-                s.city = $city, 
-                s.rating = $rating,
-                s.capacity = $capacity, 
-                s.lat = $lat, 
-                s.lon = $lon,
-                s.certifications = $certifications,
-                s.export_capable = $export_capable,
-                s.languages = $languages,
-                s.payment_terms = $payment_terms,
-                s.specialization = $specialization
-            """,
-            **{k: v for k, v in snp.items() if k != "categories"},
-        )
-
-        # Create SERVES relationships
-        for code in snp["categories"]:
-            session.run(
-                """
-                MATCH (s:SNP {id: $id}), (c:Category {code: $code})
-                MERGE (s)-[:SERVES]->(c)
-                """,
-                id=snp["id"],
-                code=code,
-            )
-
-
-def create_indexes(session):
-    """Create indexes for optimized query performance"""
-    indexes = [
-        "CREATE INDEX mse_city IF NOT EXISTS FOR (m:MSE) ON (m.city)",
-        "CREATE INDEX mse_id IF NOT EXISTS FOR (m:MSE) ON (m.id)",
-        "CREATE INDEX snp_city IF NOT EXISTS FOR (s:SNP) ON (s.city)",
-        "CREATE INDEX snp_id IF NOT EXISTS FOR (s:SNP) ON (s.id)",
-        "CREATE INDEX cat_code IF NOT EXISTS FOR (c:Category) ON (c.code)",
-        "CREATE INDEX cat_sector IF NOT EXISTS FOR (c:Category) ON (c.sector)",
-    ]
-    for index_query in indexes:
-        session.run(index_query)
+    # One UNWIND write per batch: properties and SERVES edges together
+    failed = [r for r in save_snps_bulk(driver, snps) if not r[1]]
+    for snp_id, _, message in failed:
+        print(f"   ⚠️  Failed to seed {snp_id}: {message}")
 
 
 def main():
@@ -1182,15 +1148,15 @@ def main():
         cfg["NEO4J_URI"], auth=(cfg["NEO4J_USER"], cfg["NEO4J_PASSWORD"])
     )
 
-    with driver.session() as session:
-        print("🔧 Creating database indexes...")
-        create_indexes(session)
+    print("🔧 Applying schema migrations (constraints & indexes)...")
+    apply_migrations(driver)
 
+    with driver.session() as session:
         print("📂 Seeding categories...")
         seed_categories(session)
 
-        print("🏢 Seeding SNPs...")
-        seed_snps(session)
+    print("🏢 Seeding SNPs...")
+    seed_snps(driver)
 
     driver.close()
 
@@ -1200,7 +1166,7 @@ def main():
     print("\n📊 Summary:")
     print("   • 35 Categories with ONDC L1/L2/L3 mapping")
     print("   • 25 SNPs with rich metadata")
-    print("   • 6 Database indexes for performance")
+    print("   • Uniqueness constraints plus range and point indexes")
     print("\n🌟 Key Features:")
     print("   • Multilingual keywords (Hindi + English)")
     print("   • SNP certifications & specializations")